@@ -0,0 +1 @@
+"""Benchmarks for the Breathe HR MCP server"""
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""Benchmark date-range and overlap queries against the local absence store
+
+Loads generated absences into ``AbsenceStore`` and times the queries the
+absence tools answer locally (who is off on a day, an employee's absences
+in a month, a quarter-long report range) against a linear scan of the same
+records, which is the best an unindexed in-memory list can do. Upstream
+round-trips, which the store replaces entirely, cost milliseconds to
+seconds per query and are not measured here.
+
+Usage:
+    python benchmarks/bench_absences.py [--absences 20000] [--employees 2000]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import date
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from benchmarks.fixtures import absence
+from breathe_hr_mcp.absences import AbsenceStore
+from breathe_hr_mcp.occupancy import absence_employee_id
+
+
+def per_call(fn, repeat):
+    fn()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat
+
+
+def scan(records, start, end, employee_id=None):
+    first, last = start.isoformat(), end.isoformat()
+    return [
+        record for record in records
+        if record["start_date"] <= last and record["end_date"] >= first
+        and (employee_id is None or absence_employee_id(record) == employee_id)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--absences", type=int, default=20000)
+    parser.add_argument("--employees", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    records = [
+        absence(i + 1, rng.randrange(1, args.employees + 1), rng) for i in range(args.absences)
+    ]
+    store = AbsenceStore()
+    started = time.perf_counter()
+    store.load(records, (date(2024, 1, 1), date(2024, 12, 31)))
+    print(f"load: {args.absences} absences in {(time.perf_counter() - started) * 1000:.1f} ms")
+
+    queries = [
+        ("who is off on a day", (date(2024, 6, 3), date(2024, 6, 3)), None),
+        ("one employee, one month", (date(2024, 6, 1), date(2024, 6, 30)), 42),
+        ("one employee, whole year", (date(2024, 1, 1), date(2024, 12, 31)), 42),
+        ("everyone, one quarter", (date(2024, 4, 1), date(2024, 6, 30)), None),
+    ]
+    print(f"{'query':<26} {'matches':>8} {'store us':>10} {'scan us':>10} {'speedup':>8}")
+    for name, (start, end), employee_id in queries:
+        matches = store.query(start, end, employee_id=employee_id)
+        assert len(matches) == len(scan(records, start, end, employee_id))
+        indexed = per_call(lambda: store.query(start, end, employee_id=employee_id), args.repeat)
+        linear = per_call(lambda: scan(records, start, end, employee_id), max(1, args.repeat // 10))
+        print(
+            f"{name:<26} {len(matches):>8} {indexed * 1e6:>10.1f} {linear * 1e6:>10.1f}"
+            f" {linear / indexed:>7.0f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
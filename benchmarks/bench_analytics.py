@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""Benchmark headcount queries on the columnar employee snapshot
+
+Compares ``EmployeeColumns`` against the same queries done over the
+list-of-dicts employee records that ``list_all_employees`` returns, for
+generated employees. It reports time per query and the memory held by each
+representation. Record memory is measured with ``tracemalloc`` while the
+records are generated. Column memory is the size of the column arrays
+plus their label lists.
+
+Usage:
+    python benchmarks/bench_analytics.py [--employees 10000] [--repeat 20]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+import tracemalloc
+from collections import Counter
+from datetime import date
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from benchmarks.fixtures import employee
+from breathe_hr_mcp.analytics import EmployeeColumns
+
+
+def per_call_ms(fn, repeat):
+    fn()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--employees", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    tracemalloc.start()
+    records = [employee(i + 1, rng) for i in range(args.employees)]
+    records_bytes, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    started = time.perf_counter()
+    columns = EmployeeColumns.from_records(records)
+    build_ms = (time.perf_counter() - started) * 1000
+    labels_bytes = sum(len(label) for labels in columns.labels.values() for label in labels)
+    print(f"{args.employees} employees")
+    print(f"records: {records_bytes / 1e6:.1f} MB")
+    print(f"columns: {(columns.nbytes() + labels_bytes) / 1e6:.2f} MB, built in {build_ms:.0f} ms")
+
+    quarter = (date(2020, 1, 1), date(2020, 3, 31))
+    quarter_iso = tuple(day.isoformat() for day in quarter)
+
+    def dicts_by_department_status():
+        return Counter((r["department"]["name"], r["status"]) for r in records)
+
+    def dicts_starters_by_department():
+        return Counter(
+            r["department"]["name"] for r in records
+            if r["status"] == "Current employee" and quarter_iso[0] <= r["join_date"] <= quarter_iso[1]
+        )
+
+    def columns_by_department_status():
+        return columns.group_count(["department", "status"])
+
+    def columns_starters_by_department():
+        mask = columns.select(
+            {"status": "Current employee"}, joined_from=quarter[0], joined_to=quarter[1]
+        )
+        return columns.group_count(["department"], mask)
+
+    print(f"{'query':<34} {'dicts ms':>9} {'columns ms':>11}")
+    for name, dicts, cols in (
+        ("headcount by department, status", dicts_by_department_status, columns_by_department_status),
+        ("current starters in a quarter", dicts_starters_by_department, columns_starters_by_department),
+    ):
+        assert sum(dicts().values()) == sum(row["count"] for row in cols())
+        print(f"{name:<34} {per_call_ms(dicts, args.repeat):>9.2f} {per_call_ms(cols, args.repeat):>11.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""Benchmark the per-request cost of API key authentication
+
+Times ``KeyRing`` on its own (hash, lookup and quota bookkeeping for a
+valid key and for an unknown one). It then sends MCP ``tools/list``
+requests, whose responses are streamed as server-sent events, to the
+mounted FastMCP HTTP app served in-process over ASGI. The app is built
+the way ``create_app`` builds it, with:
+
+- no authentication
+- the auth check in ``@app.middleware("http")``, i.e. Starlette's
+  ``BaseHTTPMiddleware``, as the server did before ``AuthMiddleware``
+- ``AuthMiddleware``, the pure ASGI middleware the server uses now
+
+Every client uses its own key, out of ``--keys`` configured tenants.
+
+Usage:
+    python benchmarks/bench_auth.py [--keys 1000] [--requests 2000] [--concurrency 16]
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+import httpx
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from breathe_hr_mcp.auth import AuthError, AuthMiddleware, KeyRing
+
+LIST_TOOLS = b'{"jsonrpc": "2.0", "id": 1, "method": "tools/list"}'
+
+
+def make_keyring(keys):
+    # Quotas are high enough never to reject, but their bookkeeping still runs
+    spec = ",".join(f"tenant{i}:key-{i:08d}" for i in range(keys))
+    return KeyRing.parse(spec, concurrency=1000, rate=1e9)
+
+
+def per_call_us(fn, repeat):
+    fn()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def base_http_middleware(keyring):
+    """The auth check as the server ran it before, in ``BaseHTTPMiddleware``"""
+    from starlette.responses import JSONResponse
+
+    async def middleware(request, call_next):
+        if not request.url.path.startswith("/mcp"):
+            return await call_next(request)
+        try:
+            principal = keyring.authenticate(request.headers.get("authorization"))
+            keyring.acquire(principal)
+        except AuthError as exc:
+            return JSONResponse({"detail": exc.detail}, status_code=exc.status, headers=exc.headers)
+        request.state.principal = principal
+        try:
+            return await call_next(request)
+        finally:
+            keyring.release(principal)
+
+    return middleware
+
+
+def build_app(variant, keys):
+    from fastapi import FastAPI
+    from breathe_hr_mcp.server import mcp
+
+    mcp_app = mcp.http_app(path="/", stateless_http=True)
+    app = FastAPI(lifespan=mcp_app.lifespan)
+    if variant == "base_http":
+        app.middleware("http")(base_http_middleware(make_keyring(keys)))
+    elif variant == "asgi":
+        app.add_middleware(AuthMiddleware, keyring=make_keyring(keys))
+    app.mount("/mcp", mcp_app)
+    return app
+
+
+async def run(app, keys, count, concurrency):
+    """Send ``count`` requests from ``concurrency`` clients; return latencies and wall time"""
+    latencies = []
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            async def call(i):
+                headers = {
+                    "Authorization": f"Bearer key-{i % keys:08d}",
+                    "Accept": "application/json, text/event-stream",
+                    "Content-Type": "application/json",
+                }
+                started = time.perf_counter()
+                response = await client.post("/mcp/", content=LIST_TOOLS, headers=headers)
+                assert response.status_code == 200, response.text
+                assert b"create_leave_request" in response.content
+                latencies.append(time.perf_counter() - started)
+
+            async def worker(offset):
+                for i in range(offset, count, concurrency):
+                    await call(i)
+
+            for i in range(concurrency):
+                await call(i)
+            latencies.clear()
+            started = time.perf_counter()
+            await asyncio.gather(*(worker(offset) for offset in range(concurrency)))
+            return latencies, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--keys", type=int, default=1000)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    args = parser.parse_args()
+
+    keyring = make_keyring(args.keys)
+    header = f"Bearer key-{args.keys // 2:08d}"
+
+    def valid():
+        principal = keyring.authenticate(header)
+        keyring.acquire(principal)
+        keyring.release(principal)
+
+    def unknown():
+        try:
+            keyring.authenticate("Bearer not-a-key")
+        except AuthError:
+            pass
+
+    print(f"{args.keys} keys")
+    print(f"{'operation':<30} {'us/call':>8}")
+    print(f"{'keyring: valid key + quota':<30} {per_call_us(valid, 100000):>8.2f}")
+    print(f"{'keyring: unknown key':<30} {per_call_us(unknown, 100000):>8.2f}")
+    print()
+    print(f"tools/list over the mounted FastMCP app, {args.requests} requests, "
+          f"concurrency {args.concurrency}")
+    print(f"{'middleware':<30} {'req/s':>8} {'p50 ms':>8} {'p99 ms':>8}")
+    for name, variant in (
+        ("none", None),
+        ('@app.middleware("http")', "base_http"),
+        ("AuthMiddleware (ASGI)", "asgi"),
+    ):
+        app = build_app(variant, args.keys)
+        latencies, wall = asyncio.run(run(app, args.keys, args.requests, args.concurrency))
+        quantiles = statistics.quantiles(latencies, n=100)
+        print(
+            f"{name:<30} {len(latencies) / wall:>8.0f} {quantiles[49] * 1000:>8.2f}"
+            f" {quantiles[98] * 1000:>8.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""Benchmark JSON decoding and encoding of large payloads
+
+Compares the previous path (``httpx.Response.json()``, which decodes the
+body to ``str`` before parsing with the standard library) against each
+backend in ``breathe_hr_mcp.jsoncodec`` decoding straight from bytes, and
+times encoding the same payload as an MCP tool result. Peak allocations are
+measured with ``tracemalloc``, which only sees memory allocated through
+Python's allocator; buffers allocated natively by ``pydantic_core`` are not
+counted.
+
+Usage:
+    python benchmarks/bench_json.py [--absences 20000] [--repeat 10]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+import httpx
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from benchmarks.fixtures import absences_page
+from breathe_hr_mcp import jsoncodec
+
+
+def measure(fn, repeat):
+    """Return (seconds per call, peak bytes allocated by one call)"""
+    fn()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    seconds = (time.perf_counter() - start) / repeat
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return seconds, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--absences", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    body = absences_page(args.absences)
+    content = json.dumps(body).encode()
+    print(f"payload: {args.absences} absences, {len(content) / 1e6:.1f} MB")
+    print(f"{'operation':<34} {'ms/op':>9} {'peak MB':>9}")
+
+    def report(name, fn):
+        seconds, peak = measure(fn, args.repeat)
+        print(f"{name:<34} {seconds * 1000:>9.1f} {peak / 1e6:>9.1f}")
+
+    # Encoding is set explicitly so httpx does not run charset detection
+    response = httpx.Response(200, content=content, headers={"Content-Type": "application/json"})
+    report("decode: response.json() (before)", response.json)
+    for name, (loads, _) in jsoncodec.available_backends().items():
+        report(f"decode: {name} from bytes", lambda loads=loads: loads(content))
+
+    report("encode: json.dumps (stdlib)", lambda: json.dumps(body))
+    for name, (_, dumps) in jsoncodec.available_backends().items():
+        report(f"encode: {name}", lambda dumps=dumps: dumps(body))
+
+    print(f"active backend: {jsoncodec.BACKEND}")
+
+
+if __name__ == "__main__":
+    main()
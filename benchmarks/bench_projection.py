@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""Benchmark response slimming on realistic payloads
+
+Measures serialized size and the time to shape and serialize employee and
+absence list pages with no slimming, the default compact profile, and a
+field projection.
+
+Usage:
+    python benchmarks/bench_projection.py [--records 100] [--repeat 200]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from benchmarks.fixtures import absences_page, employees_page
+from breathe_hr_mcp.projection import shape_response
+
+
+def measure(body, collection_key, repeat, **options):
+    """Return (bytes, seconds per shape+serialize)"""
+    payload = json.dumps(shape_response(body, collection_key, **options))
+    start = time.perf_counter()
+    for _ in range(repeat):
+        json.dumps(shape_response(body, collection_key, **options))
+    return len(payload.encode()), (time.perf_counter() - start) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--records", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    cases = [
+        ("employees", employees_page(args.records), ["first_name", "last_name", "email", "department.name"]),
+        ("absences", absences_page(args.records), ["employee.id", "type", "start_date", "end_date", "status"]),
+    ]
+    print(f"{'payload':<10} {'profile':<8} {'bytes':>9} {'saved':>7} {'ms/op':>8}")
+    for collection_key, body, fields in cases:
+        profiles = [
+            ("raw", {"compact_profile": False}),
+            ("compact", {}),
+            ("fields", {"fields": fields}),
+        ]
+        baseline = None
+        for name, options in profiles:
+            size, seconds = measure(body, collection_key, args.repeat, **options)
+            baseline = baseline or size
+            saved = 1 - size / baseline
+            print(f"{collection_key:<10} {name:<8} {size:>9} {saved:>6.0%} {seconds * 1000:>8.3f}")
+
+
+if __name__ == "__main__":
+    main()
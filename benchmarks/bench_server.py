@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""End-to-end benchmark of the MCP server against a local mock Breathe HR API
+
+Starts ``benchmarks/mock_api.py`` and the HTTP server (``breathe_hr_mcp.server:app``)
+as subprocesses on free local ports, then calls tools through the FastMCP
+HTTP transport at ``/mcp`` from concurrent clients. For each scenario it
+reports p50/p95/p99 latency, throughput and errors, then the server's
+resident memory and the number of upstream requests the mock received.
+Everything runs on localhost, so it works offline.
+
+Usage:
+    python benchmarks/bench_server.py [--concurrency 16] [--requests 200]
+        [--latency-ms 30] [--rate-limit-ratio 0.05] [--no-cache] [--scenario get_employee]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+from typing import Any, Callable, Dict, List, Tuple
+
+import httpx
+from fastmcp import Client
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+# Leave requests submitted per create_leave_requests call
+LEAVE_BATCH = 20
+
+
+def leave_item(rng: random.Random, employees: int) -> Dict[str, Any]:
+    day = f"2030-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}"
+    return {
+        "employee_id": rng.randint(1, employees),
+        "start_date": day,
+        "end_date": day,
+        "absence_type": "holiday",
+    }
+
+
+# name -> (tool, argument factory)
+SCENARIOS: Dict[str, Tuple[str, Callable[[random.Random, int], Dict[str, Any]]]] = {
+    "get_employee": ("get_employee", lambda rng, n: {"employee_id": rng.randint(1, n)}),
+    "list_employees": ("list_employees", lambda rng, n: {"page": rng.randint(1, max(1, n // 50))}),
+    "search_employees": ("search_employees", lambda rng, n: {"query": rng.choice(["alex", "sam", "smith", "jones"])}),
+    "get_departments": ("get_departments", lambda rng, n: {}),
+    "list_all_employees": ("list_all_employees", lambda rng, n: {}),
+    "get_whos_out": ("get_whos_out", lambda rng, n: {"start_date": f"2024-{rng.randint(1, 12):02d}-10"}),
+    "create_leave_request": ("create_leave_request", leave_item),
+    "create_leave_requests": (
+        "create_leave_requests",
+        lambda rng, n: {"requests": [leave_item(rng, n) for _ in range(LEAVE_BATCH)]},
+    ),
+}
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_until_up(url: str, process: subprocess.Popen, timeout: float = 30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"{url} exited with code {process.returncode}")
+        try:
+            httpx.get(url, timeout=1.0)
+            return
+        except httpx.HTTPError:
+            time.sleep(0.1)
+    raise RuntimeError(f"{url} did not start within {timeout:.0f}s")
+
+
+def memory_kb(pid: int) -> Dict[str, int]:
+    """Current and peak resident memory of a process, from /proc (Linux only)"""
+    values = {}
+    try:
+        with open(f"/proc/{pid}/status") as status:
+            for line in status:
+                key, _, value = line.partition(":")
+                if key in ("VmRSS", "VmHWM"):
+                    values[key] = int(value.split()[0])
+    except OSError:
+        pass
+    return values
+
+
+def percentile(samples: List[float], fraction: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def run_scenario(url: str, tool: str, arguments, args) -> Dict[str, Any]:
+    """Call ``tool`` ``args.requests`` times from ``args.concurrency`` clients"""
+    rng = random.Random(args.seed)
+    remaining = args.requests
+    latencies: List[float] = []
+    errors = 0
+
+    async def worker():
+        nonlocal remaining, errors
+        async with Client(url, timeout=120) as client:
+            while remaining > 0:
+                remaining -= 1
+                started = time.perf_counter()
+                try:
+                    await client.call_tool(tool, arguments(rng, args.employees))
+                except Exception:
+                    errors += 1
+                latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+    elapsed = time.perf_counter() - started
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p95_ms": percentile(latencies, 0.95) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+        "throughput": len(latencies) / elapsed if elapsed else 0.0,
+    }
+
+
+def start_processes(args):
+    mock_port, server_port = free_port(), free_port()
+    mock = subprocess.Popen([
+        sys.executable, os.path.join(ROOT, "benchmarks", "mock_api.py"),
+        "--port", str(mock_port),
+        "--employees", str(args.employees),
+        "--absences", str(args.absences),
+        "--latency-ms", str(args.latency_ms),
+        "--jitter-ms", str(args.jitter_ms),
+        "--rate-limit-ratio", str(args.rate_limit_ratio),
+        "--padding-bytes", str(args.padding_bytes),
+    ], cwd=ROOT)
+    env = {
+        **os.environ,
+        "BREATHE_HR_API_KEY": "benchmark",
+        "BREATHE_HR_BASE_URL": f"http://127.0.0.1:{mock_port}/v1",
+        "BREATHE_HR_CACHE_ENABLED": "false" if args.no_cache else "true",
+        "BREATHE_HR_DIRECTORY_REFRESH": "900" if args.directory else "0",
+        "MCP_API_KEY": "",
+    }
+    env.pop("USE_SANDBOX_URL", None)
+    server = subprocess.Popen([
+        sys.executable, "-m", "uvicorn", "breathe_hr_mcp.server:app",
+        "--host", "127.0.0.1", "--port", str(server_port), "--log-level", "warning",
+    ], cwd=ROOT, env=env)
+    try:
+        wait_until_up(f"http://127.0.0.1:{mock_port}/_stats", mock)
+        wait_until_up(f"http://127.0.0.1:{server_port}/", server)
+    except Exception:
+        stop_processes(mock, server)
+        raise
+    return mock, mock_port, server, server_port
+
+
+def stop_processes(*processes: subprocess.Popen):
+    for process in processes:
+        process.terminate()
+    for process in processes:
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS),
+                        help="Scenario to run (repeatable; default: all)")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=200, help="Tool calls per scenario")
+    parser.add_argument("--employees", type=int, default=500)
+    parser.add_argument("--absences", type=int, default=2000)
+    parser.add_argument("--latency-ms", type=float, default=30.0)
+    parser.add_argument("--jitter-ms", type=float, default=10.0)
+    parser.add_argument("--rate-limit-ratio", type=float, default=0.0)
+    parser.add_argument("--padding-bytes", type=int, default=0)
+    parser.add_argument("--no-cache", action="store_true", help="Disable the response cache")
+    parser.add_argument("--directory", action="store_true",
+                        help="Enable the background employee directory sync")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    parser.add_argument("--seed", type=int, default=0)
+    return parser.parse_args(argv)
+
+
+async def run(args) -> List[Dict[str, Any]]:
+    mock, mock_port, server, server_port = start_processes(args)
+    url = f"http://127.0.0.1:{server_port}/mcp/"
+    results = []
+    try:
+        async with httpx.AsyncClient() as http:
+            for name in args.scenario or list(SCENARIOS):
+                tool, arguments = SCENARIOS[name]
+                before = (await http.get(f"http://127.0.0.1:{mock_port}/_stats")).json()
+                result = await run_scenario(url, tool, arguments, args)
+                after = (await http.get(f"http://127.0.0.1:{mock_port}/_stats")).json()
+                memory = memory_kb(server.pid)
+                result.update(
+                    scenario=name,
+                    upstream_requests=after["requests"] - before["requests"],
+                    upstream_429s=after["rate_limited"] - before["rate_limited"],
+                    upstream_304s=after["not_modified"] - before["not_modified"],
+                    rss_mb=memory.get("VmRSS", 0) / 1024,
+                    peak_rss_mb=memory.get("VmHWM", 0) / 1024,
+                )
+                results.append(result)
+    finally:
+        stop_processes(server, mock)
+    return results
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    results = asyncio.run(run(args))
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(
+        f"{'scenario':<20} {'calls':>6} {'err':>4} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+        f"{'calls/s':>8} {'upstream':>8} {'429s':>5} {'304s':>5} {'rss MB':>7} {'peak MB':>8}"
+    )
+    for row in results:
+        print(
+            f"{row['scenario']:<20} {row['requests']:>6} {row['errors']:>4} "
+            f"{row['p50_ms']:>8.1f} {row['p95_ms']:>8.1f} {row['p99_ms']:>8.1f} "
+            f"{row['throughput']:>8.1f} {row['upstream_requests']:>8} {row['upstream_429s']:>5} {row['upstream_304s']:>5} "
+            f"{row['rss_mb']:>7.1f} {row['peak_rss_mb']:>8.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""Benchmark import time and stdio startup latency against a budget
+
+Desktop MCP clients spawn ``python -m breathe_hr_mcp`` once per session, so
+everything the process does before answering ``initialize`` is delay the
+user sees. Each run starts a fresh interpreter and measures:
+
+- import: wall time of ``import breathe_hr_mcp.server``, plus the packages
+  that take longest to import according to ``python -X importtime``
+- startup: spawn to the ``initialize`` response over stdio, then the first
+  ``tools/list`` round trip
+
+The upstream base URL points at a closed local port, so it runs offline and
+never touches the real API. Exits with status 1 if the median startup time
+exceeds ``--budget-ms``, so it can guard against regressions in CI.
+
+Usage:
+    python benchmarks/bench_startup.py [--runs 5] [--budget-ms 2800] [--top 10]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, List, Tuple
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+# Modules the stdio path should never load
+HTTP_ONLY_MODULES = ("fastapi",)
+
+IMPORT_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import breathe_hr_mcp.server
+elapsed = time.perf_counter() - start
+print(json.dumps({"seconds": elapsed, "loaded": [m for m in %r if m in sys.modules]}))
+""" % (HTTP_ONLY_MODULES,)
+
+
+def child_env() -> Dict[str, str]:
+    env = dict(os.environ)
+    env.update(
+        BREATHE_HR_API_KEY="bench",
+        BREATHE_HR_BASE_URL="http://127.0.0.1:9/v1",
+        PYTHONPATH=ROOT + os.pathsep + env.get("PYTHONPATH", ""),
+    )
+    env.pop("USE_SANDBOX_URL", None)
+    return env
+
+
+def measure_import() -> Tuple[float, List[str]]:
+    result = subprocess.run(
+        [sys.executable, "-c", IMPORT_PROBE],
+        cwd=ROOT, env=child_env(), capture_output=True, text=True, check=True,
+    )
+    probe = json.loads(result.stdout.strip().splitlines()[-1])
+    return probe["seconds"], probe["loaded"]
+
+
+def slowest_packages(top: int) -> List[Tuple[str, float]]:
+    """Top-level packages by total self import time, slowest first"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import breathe_hr_mcp.server"],
+        cwd=ROOT, env=child_env(), capture_output=True, text=True, check=True,
+    )
+    totals: Dict[str, float] = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, _, name = line[len("import time:"):].split("|")
+        package = name.strip().split(".")[0]
+        totals[package] = totals.get(package, 0.0) + int(self_us) / 1e6
+    return sorted(totals.items(), key=lambda item: item[1], reverse=True)[:top]
+
+
+def send(process: subprocess.Popen, message: Dict) -> None:
+    process.stdin.write(json.dumps(message) + "\n")
+    process.stdin.flush()
+
+
+def receive(process: subprocess.Popen, request_id: int) -> Dict:
+    while True:
+        line = process.stdout.readline()
+        if not line:
+            raise RuntimeError(f"server exited with code {process.wait()} before replying")
+        message = json.loads(line)
+        if message.get("id") == request_id:
+            return message
+
+
+def measure_startup() -> Tuple[float, float]:
+    """Return (seconds to the initialize response, seconds for tools/list)"""
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "breathe_hr_mcp"],
+        cwd=ROOT, env=child_env(), text=True,
+        stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+    )
+    try:
+        send(process, {
+            "jsonrpc": "2.0", "id": 1, "method": "initialize",
+            "params": {
+                "protocolVersion": "2025-06-18",
+                "capabilities": {},
+                "clientInfo": {"name": "bench_startup", "version": "0"},
+            },
+        })
+        receive(process, 1)
+        initialized = time.perf_counter() - start
+        send(process, {"jsonrpc": "2.0", "method": "notifications/initialized"})
+        list_start = time.perf_counter()
+        send(process, {"jsonrpc": "2.0", "id": 2, "method": "tools/list"})
+        tools = receive(process, 2)
+        if "result" not in tools:
+            raise RuntimeError(f"tools/list failed: {tools}")
+        return initialized, time.perf_counter() - list_start
+    finally:
+        process.stdin.close()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    # About 10% above the median measured on a development machine (2.5 s)
+    parser.add_argument("--budget-ms", type=float, default=2800.0,
+                        help="maximum median time to the initialize response")
+    parser.add_argument("--top", type=int, default=10, help="slowest packages to list")
+    args = parser.parse_args()
+
+    imports, loaded = [], set()
+    for _ in range(args.runs):
+        seconds, modules = measure_import()
+        imports.append(seconds)
+        loaded.update(modules)
+    startups = [measure_startup() for _ in range(args.runs)]
+    initialize = statistics.median(s[0] for s in startups)
+    tools_list = statistics.median(s[1] for s in startups)
+
+    print(f"{'phase':<28} {'median ms':>10} {'min ms':>10}")
+    print(f"{'import server':<28} {statistics.median(imports) * 1000:>10.0f} {min(imports) * 1000:>10.0f}")
+    print(f"{'spawn -> initialize':<28} {initialize * 1000:>10.0f} {min(s[0] for s in startups) * 1000:>10.0f}")
+    print(f"{'tools/list':<28} {tools_list * 1000:>10.1f} {min(s[1] for s in startups) * 1000:>10.1f}")
+
+    print("\nslowest packages (self import time):")
+    for name, seconds in slowest_packages(args.top):
+        print(f"  {name:<40} {seconds * 1000:>8.0f} ms")
+
+    if loaded:
+        print(f"\nHTTP-only modules imported on the stdio path: {', '.join(sorted(loaded))}")
+    verdict = "within" if initialize * 1000 <= args.budget_ms else "OVER"
+    print(f"\nstartup {initialize * 1000:.0f} ms is {verdict} the {args.budget_ms:.0f} ms budget")
+    if verdict == "OVER" or loaded:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""Benchmark the per-call cost of tracing
+
+Times a bare span, and a GET through an ``httpx.AsyncClient`` on an
+in-process mock transport with tracing off and on. With tracing on, each GET
+runs inside an upstream span, the client carries the tracer's event hooks,
+and the span goes to the slow-call log. The mock transport skips the
+network, so the difference is the tracing overhead a real upstream call
+would pay on top of its round-trip.
+
+Usage:
+    python benchmarks/bench_tracing.py [--requests 20000]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+import httpx
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from breathe_hr_mcp.tracing import SlowCallLog, Tracer, params_shape
+
+PARAMS = {"page": 1, "per_page": 100}
+
+
+async def per_call_us(fn, repeat):
+    await fn()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        await fn()
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=20000)
+    args = parser.parse_args()
+
+    def handler(request):
+        return httpx.Response(200, content=b'{"employees": []}')
+
+    async def run():
+        transport = httpx.MockTransport(handler)
+        off = Tracer(enabled=False)
+        on = Tracer(exporters=[SlowCallLog(threshold=1.0)])
+        results = {}
+
+        async def bare_span():
+            with on.span("upstream", endpoint="employees", params=params_shape(PARAMS)):
+                pass
+
+        results["span only"] = await per_call_us(bare_span, args.requests)
+        for name, tracer in (("GET, tracing off", off), ("GET, tracing on", on)):
+            async with httpx.AsyncClient(transport=transport, event_hooks=tracer.event_hooks()) as client:
+                async def get():
+                    with tracer.span("upstream", endpoint="employees", params=params_shape(PARAMS)):
+                        await client.get("https://api.example.com/v1/employees", params=PARAMS)
+
+                results[name] = await per_call_us(get, args.requests)
+        return results
+
+    print(f"{'operation':<20} {'us/call':>8}")
+    for name, us in asyncio.run(run()).items():
+        print(f"{name:<20} {us:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""Realistic Breathe HR payloads for benchmarks
+
+Records mirror the shape of the upstream API: dozens of fields per employee,
+many of them null or empty, with nested department, location and contact
+objects.
+"""
+
+import random
+from datetime import date, timedelta
+from typing import Any, Dict, List
+
+DEPARTMENTS = [
+    "Engineering", "Sales", "Marketing", "Finance", "Operations",
+    "People", "Support", "Product", "Legal", "Data",
+]
+FIRST_NAMES = ["Alex", "Sam", "Jordan", "Taylor", "Morgan", "Casey", "Jamie", "Robin", "Avery", "Quinn"]
+LAST_NAMES = ["Smith", "Jones", "Taylor", "Brown", "Williams", "Wilson", "Evans", "Thomas", "Roberts", "Walker"]
+ABSENCE_TYPES = ["holiday", "sick", "training", "compassionate", "unpaid"]
+
+
+def employee(employee_id: int, rng: random.Random) -> Dict[str, Any]:
+    first = rng.choice(FIRST_NAMES)
+    last = rng.choice(LAST_NAMES)
+    department_id = employee_id % len(DEPARTMENTS)
+    start = date(2015, 1, 1) + timedelta(days=rng.randrange(3650))
+    return {
+        "id": employee_id,
+        "company_id": 1,
+        "ref": f"EMP{employee_id:05d}",
+        "first_name": first,
+        "middle_name": None,
+        "last_name": last,
+        "known_as": None,
+        "email": f"{first.lower()}.{last.lower()}{employee_id}@example.com",
+        "personal_email": None,
+        "title": rng.choice([None, "Mr", "Ms", "Mx", "Dr"]),
+        "job_title": rng.choice(["Engineer", "Manager", "Analyst", "Associate", "Lead"]),
+        "status": rng.choice(["Current employee"] * 9 + ["Former employee"]),
+        "employment_type": rng.choice(["full_time", "part_time"]),
+        "join_date": start.isoformat(),
+        "leaving_date": None,
+        "probation_end_date": (start + timedelta(days=180)).isoformat(),
+        "dob": None,
+        "gender": None,
+        "ni_number": None,
+        "phone": None,
+        "mobile": None,
+        "extension": "",
+        "photo": None,
+        "notes": "",
+        "holiday_allowance": 25,
+        "holiday_allowance_unit": "days",
+        "full_or_part_time": "Full Time",
+        "working_pattern": {"id": 1, "name": "Standard", "monday": True, "saturday": False},
+        "department": {"id": department_id, "name": DEPARTMENTS[department_id], "manager": None},
+        "division": None,
+        "location": {"id": 1, "name": "HQ", "address": None, "postcode": None},
+        "line_manager": {"id": max(1, employee_id // 10), "first_name": None, "last_name": None},
+        "emergency_contact": {"name": None, "relationship": None, "phone": None},
+        "bank_details": None,
+        "custom_fields": [],
+        "created_at": "2020-01-01T09:00:00Z",
+        "updated_at": "2024-01-01T09:00:00Z",
+    }
+
+
+def employees_page(count: int = 100, seed: int = 0, offset: int = 0) -> Dict[str, Any]:
+    rng = random.Random(seed)
+    return {
+        "employees": [employee(offset + i + 1, rng) for i in range(count)],
+        "pagination": {"page": 1, "per_page": count, "total": count},
+    }
+
+
+def absence(absence_id: int, employee_id: int, rng: random.Random, year: int = 2024) -> Dict[str, Any]:
+    first = date(year, 1, 1) + timedelta(days=rng.randrange(365))
+    last = first + timedelta(days=rng.randrange(10))
+    return {
+        "id": absence_id,
+        "employee": {"id": employee_id, "first_name": None, "last_name": None},
+        "type": rng.choice(ABSENCE_TYPES),
+        "leave_reason": None,
+        "status": rng.choice(["approved"] * 8 + ["pending", "cancelled"]),
+        "start_date": first.isoformat(),
+        "end_date": last.isoformat(),
+        "half_start": False,
+        "half_end": False,
+        "half_day": False,
+        "deducted": float((last - first).days + 1),
+        "notes": None,
+        "approved_by": None,
+        "cancelled": False,
+        "created_at": "2024-01-01T09:00:00Z",
+        "updated_at": "2024-01-01T09:00:00Z",
+    }
+
+
+def absences_page(count: int = 100, employees: int = 2000, seed: int = 0) -> Dict[str, Any]:
+    rng = random.Random(seed)
+    return {
+        "absences": [absence(i + 1, rng.randrange(1, employees + 1), rng) for i in range(count)],
+        "pagination": {"page": 1, "per_page": count, "total": count},
+    }
+
+
+def absence_list(count: int, employees: int = 2000, seed: int = 0) -> List[Dict[str, Any]]:
+    return absences_page(count, employees, seed)["absences"]
@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""Local stand-in for the Breathe HR API
+
+Serves generated employees, absences, departments and account data with the
+same paths, collection keys and pagination headers (``Total``,
+``Per-Page``, ``Link``) as the real API. List pages carry an ``ETag`` and
+honor ``If-None-Match`` with ``304 Not Modified``. Latency, page limits, 429 injection
+and payload size are configurable so benchmarks can exercise the server's
+pagination, retry and caching paths without network access.
+
+Usage:
+    python benchmarks/mock_api.py [--port 8900] [--latency-ms 30] [--rate-limit-ratio 0.05]
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+from dataclasses import dataclass
+from typing import Any, Dict, List
+
+import uvicorn
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from benchmarks.fixtures import DEPARTMENTS, absence, employee
+
+
+@dataclass
+class MockConfig:
+    employees: int = 500
+    absences: int = 2000
+    max_per_page: int = 100
+    latency_ms: float = 30.0
+    jitter_ms: float = 10.0
+    rate_limit_ratio: float = 0.0
+    retry_after: float = 0.0
+    padding_bytes: int = 0
+    seed: int = 0
+
+
+class MockBreatheHR:
+    """Generated dataset plus the Starlette app that serves it"""
+
+    def __init__(self, config: MockConfig):
+        self.config = config
+        self.rng = random.Random(config.seed)
+        padding = "x" * config.padding_bytes
+        self.employees = [employee(i + 1, self.rng) for i in range(config.employees)]
+        for record in self.employees:
+            if padding:
+                record["notes"] = padding
+        self.absences = [
+            absence(i + 1, self.rng.randrange(1, config.employees + 1), self.rng)
+            for i in range(config.absences)
+        ]
+        self.by_id = {record["id"]: record for record in self.employees}
+        self.stats: Dict[str, int] = {
+            "requests": 0, "rate_limited": 0, "created": 0, "not_modified": 0,
+        }
+        # Bumped by writes so list ETags change when the data does
+        self.version = 0
+        self.app = Starlette(routes=[
+            Route("/v1/account", self.account),
+            Route("/v1/departments", self.departments),
+            Route("/v1/employees", self.list_employees),
+            Route("/v1/employees/search", self.search_employees),
+            Route("/v1/employees/{id:int}", self.get_employee),
+            Route("/v1/employees/{id:int}/absences", self.employee_absences),
+            Route("/v1/absences", self.absences_endpoint, methods=["GET", "POST"]),
+            Route("/_stats", self.stats_endpoint),
+        ])
+
+    async def _delay(self) -> bool:
+        """Simulate upstream latency; returns True if this call should be rate limited"""
+        self.stats["requests"] += 1
+        config = self.config
+        delay = max(0.0, config.latency_ms + self.rng.uniform(-1, 1) * config.jitter_ms)
+        await asyncio.sleep(delay / 1000)
+        if config.rate_limit_ratio and self.rng.random() < config.rate_limit_ratio:
+            self.stats["rate_limited"] += 1
+            return True
+        return False
+
+    def _rate_limited(self) -> JSONResponse:
+        return JSONResponse(
+            {"error": "Too many requests"},
+            status_code=429,
+            headers={"Retry-After": f"{self.config.retry_after:g}"},
+        )
+
+    def _page(self, request: Request, key: str, records: List[Dict[str, Any]]) -> JSONResponse:
+        page = max(1, int(request.query_params.get("page", 1)))
+        per_page = int(request.query_params.get("per_page", 25))
+        per_page = max(1, min(per_page, self.config.max_per_page))
+        start = (page - 1) * per_page
+        last_page = max(1, -(-len(records) // per_page))
+        base = str(request.url.remove_query_params("page"))
+        separator = "&" if "?" in base else "?"
+        headers = {
+            "Total": str(len(records)),
+            "Per-Page": str(per_page),
+            "Link": f'<{base}{separator}page={last_page}>; rel="last"',
+            "ETag": f'W/"{self.version}-{hash(str(request.url)) & 0xffffffff:x}"',
+        }
+        if request.headers.get("If-None-Match") == headers["ETag"]:
+            self.stats["not_modified"] += 1
+            return Response(status_code=304, headers=headers)
+        return JSONResponse({key: records[start:start + per_page]}, headers=headers)
+
+    async def account(self, request: Request):
+        if await self._delay():
+            return self._rate_limited()
+        return JSONResponse({"account": {"id": 1, "name": "Benchmark Ltd", "employees": len(self.employees)}})
+
+    async def departments(self, request: Request):
+        if await self._delay():
+            return self._rate_limited()
+        return JSONResponse({"departments": [
+            {"id": index, "name": name} for index, name in enumerate(DEPARTMENTS)
+        ]})
+
+    async def list_employees(self, request: Request):
+        if await self._delay():
+            return self._rate_limited()
+        return self._page(request, "employees", self.employees)
+
+    async def search_employees(self, request: Request):
+        if await self._delay():
+            return self._rate_limited()
+        query = request.query_params.get("query", "").lower()
+        matches = [
+            record for record in self.employees
+            if query in f"{record['first_name']} {record['last_name']} {record['email']}".lower()
+        ]
+        return self._page(request, "employees", matches)
+
+    async def get_employee(self, request: Request):
+        if await self._delay():
+            return self._rate_limited()
+        record = self.by_id.get(request.path_params["id"])
+        if record is None:
+            return JSONResponse({"error": "Not found"}, status_code=404)
+        return JSONResponse(record)
+
+    async def employee_absences(self, request: Request):
+        if await self._delay():
+            return self._rate_limited()
+        employee_id = request.path_params["id"]
+        records = [item for item in self.absences if item["employee"]["id"] == employee_id]
+        return self._page(request, "absences", records)
+
+    async def absences_endpoint(self, request: Request):
+        if await self._delay():
+            return self._rate_limited()
+        if request.method == "POST":
+            body = await request.json()
+            self.stats["created"] += 1
+            self.version += 1
+            record = {**body, "id": len(self.absences) + 1, "status": "pending"}
+            self.absences.append(record)
+            return JSONResponse({"absences": [record]}, status_code=201)
+        start = request.query_params.get("start_date")
+        end = request.query_params.get("end_date")
+        records = self.absences
+        if start or end:
+            # Like Breathe HR, only absences wholly inside the range
+            records = [
+                item for item in records
+                if (not start or item["start_date"] >= start) and (not end or item["end_date"] <= end)
+            ]
+        return self._page(request, "absences", records)
+
+    async def stats_endpoint(self, request: Request):
+        return JSONResponse(self.stats)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--employees", type=int, default=500)
+    parser.add_argument("--absences", type=int, default=2000)
+    parser.add_argument("--max-per-page", type=int, default=100)
+    parser.add_argument("--latency-ms", type=float, default=30.0)
+    parser.add_argument("--jitter-ms", type=float, default=10.0)
+    parser.add_argument("--rate-limit-ratio", type=float, default=0.0,
+                        help="Fraction of requests answered with 429")
+    parser.add_argument("--retry-after", type=float, default=0.0,
+                        help="Retry-After seconds sent with injected 429s")
+    parser.add_argument("--padding-bytes", type=int, default=0,
+                        help="Extra bytes added to every employee record")
+    parser.add_argument("--seed", type=int, default=0)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    config = MockConfig(
+        employees=args.employees,
+        absences=args.absences,
+        max_per_page=args.max_per_page,
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        rate_limit_ratio=args.rate_limit_ratio,
+        retry_after=args.retry_after,
+        padding_bytes=args.padding_bytes,
+        seed=args.seed,
+    )
+    mock = MockBreatheHR(config)
+    uvicorn.run(mock.app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,14 @@
 """Breathe HR MCP Server"""
 
-from .server import app, mcp
-
 __version__ = "0.1.0"
-__all__ = ["app", "mcp"]
\ No newline at end of file
+__all__ = ["app", "mcp"]
+
+
+def __getattr__(name: str):
+    # Loaded on first access so importing a submodule (or running stdio via
+    # ``python -m breathe_hr_mcp``) doesn't build the HTTP app
+    if name in __all__:
+        from . import server
+
+        return getattr(server, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
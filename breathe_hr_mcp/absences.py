@@ -0,0 +1,309 @@
+"""Local absence store kept current by incremental sync
+
+The store holds every absence overlapping a rolling date window (by
+default the last 366 days and the next 365) and indexes them by start day,
+both globally and per employee, in sorted lists. An absence overlaps
+``[start, end]`` when it starts by ``end`` and ends on or after ``start``;
+since no stored absence is longer than the longest one seen, only entries
+starting in ``[start - longest, end]`` need checking, which two bisects
+find. "Who is off on D" and "does this overlap" are answered in
+microseconds without an upstream round-trip.
+
+The first ``sync`` loads the whole window. Later syncs are incremental:
+
+- the window slides forward, dropping absences that ended before its new
+  start and fetching only the days that entered it at the far end
+- the weeks around today, where approvals and cancellations cluster, are
+  re-fetched on every pass
+- one further chunk of the window is re-fetched per pass in rotation, so
+  changes to distant absences are picked up within a full cycle
+
+The upstream ``start_date``/``end_date`` filter only returns absences lying
+wholly inside the range, so every fetch is widened by ``overlap_days`` (or
+the longest stored absence, if longer) on each side. Re-fetched ranges are
+diffed against the store. New and changed records (including status
+changes) are replaced. Records inside the fetched range that are no longer
+returned are dropped as deleted upstream. Records that only cross its edges
+were never asked for, so they are kept.
+"""
+
+import math
+import time
+from bisect import bisect_left, insort
+from datetime import date, timedelta
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from .occupancy import absence_employee_id, parse_date
+from .pagination import paginate
+
+# (first day ordinal, absence id, last day ordinal, record). The ID is
+# unique, so entries sort by start day and never compare past the ID.
+_Entry = Tuple[int, int, int, Dict[str, Any]]
+
+
+def _matches(value: Any, wanted: Optional[str]) -> bool:
+    if not wanted:
+        return True
+    if isinstance(value, dict):
+        value = value.get("name")
+    return str(value or "").lower() == wanted.lower()
+
+
+class AbsenceStore:
+    """Interval index over absences in a rolling date window"""
+
+    def __init__(
+        self,
+        past_days: int = 366,
+        future_days: int = 365,
+        chunk_days: int = 31,
+        max_age: float = 600.0,
+        overlap_days: int = 31,
+        clock: Callable[[], float] = time.monotonic,
+        today: Callable[[], date] = date.today,
+    ):
+        self.past_days = past_days
+        self.future_days = future_days
+        self.chunk_days = max(1, chunk_days)
+        self.max_age = max_age
+        self.overlap_days = max(0, overlap_days)
+        self._clock = clock
+        self._today = today
+        self._records: Dict[int, Dict[str, Any]] = {}
+        # absence id -> (first day ordinal, last day ordinal, employee id)
+        self._spans: Dict[int, Tuple[int, int, Optional[int]]] = {}
+        self._by_start: List[_Entry] = []
+        self._by_employee: Dict[int, List[_Entry]] = {}
+        self._longest = 0
+        self._next_chunk = 0
+        self.window: Optional[Tuple[date, date]] = None
+        self.synced_at: Optional[float] = None
+        self.full_syncs = 0
+        self.incremental_syncs = 0
+        self.changes = 0
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    @property
+    def age(self) -> Optional[float]:
+        """Seconds since the last sync, or ``None`` if never synced"""
+        if self.synced_at is None:
+            return None
+        return self._clock() - self.synced_at
+
+    def is_fresh(self) -> bool:
+        """Whether the store is loaded and recent enough to serve from"""
+        age = self.age
+        return age is not None and age <= self.max_age
+
+    def covers(self, start: date, end: date) -> bool:
+        """Whether queries over ``[start, end]`` can be answered locally"""
+        return (
+            self.window is not None
+            and self.is_fresh()
+            and self.window[0] <= start
+            and end <= self.window[1]
+        )
+
+    def fetch_range(self, start: date, end: date) -> Tuple[date, date]:
+        """The range to request upstream to see every absence overlapping ``[start, end]``"""
+        pad = timedelta(days=max(self.overlap_days, self._longest))
+        return start - pad, end + pad
+
+    def load(
+        self, records: Iterable[Dict[str, Any]], window: Tuple[date, date], age: float = 0.0
+    ) -> None:
+        """Replace the store contents with every absence in ``window``, fetched ``age`` seconds ago"""
+        self._records.clear()
+        self._spans.clear()
+        self._by_start.clear()
+        self._by_employee.clear()
+        self._longest = 0
+        for record in records:
+            self.upsert(record)
+        self.window = window
+        self.synced_at = self._clock() - age
+
+    def records(self) -> List[Dict[str, Any]]:
+        """Every stored absence, ordered by start date and ID"""
+        return [record for _, _, _, record in self._by_start]
+
+    def upsert(self, record: Dict[str, Any]) -> bool:
+        """Insert or replace one absence record
+
+        Returns:
+            Whether the store changed
+        """
+        absence_id = record.get("id")
+        start = parse_date(record.get("start_date"))
+        if absence_id is None or start is None:
+            return False
+        absence_id = int(absence_id)
+        if self._records.get(absence_id) == record:
+            return False
+        self.remove(absence_id)
+        end = parse_date(record.get("end_date")) or start
+        first, last = start.toordinal(), max(start, end).toordinal()
+        employee_id = absence_employee_id(record)
+        self._records[absence_id] = record
+        self._spans[absence_id] = (first, last, employee_id)
+        entry = (first, absence_id, last, record)
+        insort(self._by_start, entry)
+        if employee_id is not None:
+            insort(self._by_employee.setdefault(employee_id, []), entry)
+        self._longest = max(self._longest, last - first)
+        return True
+
+    def remove(self, absence_id: int) -> bool:
+        """Drop one absence; returns whether it was stored"""
+        span = self._spans.pop(absence_id, None)
+        if span is None:
+            return False
+        del self._records[absence_id]
+        first, _, employee_id = span
+        _discard(self._by_start, first, absence_id)
+        if employee_id is not None:
+            entries = self._by_employee[employee_id]
+            _discard(entries, first, absence_id)
+            if not entries:
+                del self._by_employee[employee_id]
+        return True
+
+    def query(
+        self,
+        start: date,
+        end: date,
+        employee_id: Optional[int] = None,
+        absence_type: Optional[str] = None,
+        status: Optional[str] = None,
+        within: bool = False,
+    ) -> List[Dict[str, Any]]:
+        """Absences overlapping ``[start, end]``, ordered by start date and ID
+
+        ``absence_type`` and ``status`` match case-insensitively, as the
+        upstream filters do. With ``within``, only absences lying wholly
+        inside the range are returned, as the upstream date filter does.
+        """
+        if employee_id is None:
+            entries = self._by_start
+        else:
+            entries = self._by_employee.get(int(employee_id), [])
+        first, last = start.toordinal(), end.toordinal()
+        lo = bisect_left(entries, (first if within else first - self._longest,))
+        hi = bisect_left(entries, (last + 1,))
+        if within:
+            results = [record for _, _, end_day, record in entries[lo:hi] if end_day <= last]
+        else:
+            results = [record for _, _, end_day, record in entries[lo:hi] if end_day >= first]
+        if absence_type or status:
+            results = [
+                record for record in results
+                if _matches(record.get("type"), absence_type) and _matches(record.get("status"), status)
+            ]
+        return results
+
+    def page(
+        self, start: date, end: date, page: int = 1, per_page: int = 50, **filters: Any
+    ) -> Dict[str, Any]:
+        """Query results shaped like the upstream ``absences`` response"""
+        results = self.query(start, end, **filters)
+        page = max(1, page)
+        offset = (page - 1) * per_page
+        return {
+            "absences": results[offset:offset + per_page],
+            "pagination": {"page": page, "per_page": per_page, "total": len(results)},
+        }
+
+    async def sync(self, request: Callable[..., Any], concurrency: int = 4) -> int:
+        """Bring the store up to date, loading it in full on the first call
+
+        Returns:
+            The number of absences stored
+        """
+        today = self._today()
+        window = (today - timedelta(days=self.past_days), today + timedelta(days=self.future_days))
+        old = self.window
+        if old is None or window[0] < old[0] or window[0] > old[1]:
+            records = await self._fetch(request, *self.fetch_range(*window), concurrency)
+            self.load(overlapping(records, *window), window)
+            self.full_syncs += 1
+            return len(self)
+
+        ranges = []
+        if window[1] > old[1]:
+            ranges.append((old[1] + timedelta(days=1), window[1]))
+        hot = timedelta(days=self.chunk_days)
+        ranges.append((max(window[0], today - hot), min(window[1], today + hot)))
+        chunks = math.ceil(((window[1] - window[0]).days + 1) / self.chunk_days)
+        chunk_start = window[0] + timedelta(days=(self._next_chunk % chunks) * self.chunk_days)
+        ranges.append((chunk_start, min(window[1], chunk_start + hot - timedelta(days=1))))
+        self._next_chunk += 1
+
+        self._drop_before(window[0])
+        for start, end in ranges:
+            start, end = self.fetch_range(start, end)
+            records = await self._fetch(request, start, end, concurrency)
+            self.changes += self._merge(overlapping(records, *window), start, end)
+        self.window = window
+        self.synced_at = self._clock()
+        self.incremental_syncs += 1
+        return len(self)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "absences": len(self),
+            "employees": len(self._by_employee),
+            "full_syncs": self.full_syncs,
+            "incremental_syncs": self.incremental_syncs,
+            "changes": self.changes,
+        }
+
+    async def _fetch(
+        self, request: Callable[..., Any], start: date, end: date, concurrency: int
+    ) -> List[Dict[str, Any]]:
+        records: List[Dict[str, Any]] = []
+        params = {"start_date": start.isoformat(), "end_date": end.isoformat()}
+        async for page in paginate(request, "absences", "absences", params=params, concurrency=concurrency):
+            records.extend(page)
+        return records
+
+    def _merge(self, records: List[Dict[str, Any]], start: date, end: date) -> int:
+        """Apply a fresh fetch of ``[start, end]``, returning the number of changes
+
+        Only records wholly inside the range can have been returned, so only
+        those are dropped when missing.
+        """
+        changed = 0
+        seen: Set[int] = set()
+        for record in records:
+            if record.get("id") is not None:
+                seen.add(int(record["id"]))
+            changed += self.upsert(record)
+        for record in self.query(start, end, within=True):
+            if int(record["id"]) not in seen:
+                changed += self.remove(int(record["id"]))
+        return changed
+
+    def _drop_before(self, day: date) -> None:
+        cutoff = day.toordinal()
+        for absence_id in [i for i, span in self._spans.items() if span[1] < cutoff]:
+            self.remove(absence_id)
+
+
+def overlapping(records: Iterable[Dict[str, Any]], start: date, end: date) -> List[Dict[str, Any]]:
+    """Records of absences that overlap ``[start, end]``"""
+    results = []
+    for record in records:
+        first = parse_date(record.get("start_date"))
+        if first is None or first > end:
+            continue
+        if (parse_date(record.get("end_date")) or first) >= start:
+            results.append(record)
+    return results
+
+
+def _discard(entries: List[_Entry], first: int, absence_id: int) -> None:
+    index = bisect_left(entries, (first, absence_id))
+    if index < len(entries) and entries[index][1] == absence_id:
+        del entries[index]
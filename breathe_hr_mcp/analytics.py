@@ -0,0 +1,168 @@
+"""Headcount analytics over a columnar employee snapshot
+
+``EmployeeColumns`` turns the employee directory into a handful of typed
+``array`` columns instead of one dict per employee. Each categorical field
+(department, status, location, employment type, job title) is
+dictionary-encoded: the distinct labels are stored once and every row
+holds a 2-byte code. Join and leaving dates are held as day ordinals. Ten
+thousand employees take a few hundred kilobytes, against tens of
+megabytes for the upstream records.
+
+Filters produce byte masks with one 0/1 entry per row. A category filter
+is a table lookup per row, a date filter a comparison per row. Masks are
+combined with a single big-integer AND. Group-by counts run
+``collections.Counter`` over the zipped code columns of the selected rows.
+Apart from building the date masks, every step runs in C, so a grouped
+count over 10k employees takes a few milliseconds.
+"""
+
+from array import array
+from collections import Counter
+from datetime import date
+from itertools import compress
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence
+
+from .occupancy import employee_department, parse_date
+
+GROUP_FIELDS = ("department", "status", "location", "employment_type", "job_title")
+
+UNKNOWN = "Unknown"
+
+
+def _label(record: Dict[str, Any], field: str, departments: Optional[Dict[int, str]]) -> str:
+    if field == "department":
+        return employee_department(record, departments)
+    value = record.get(field)
+    if isinstance(value, dict):
+        value = value.get("name")
+    return str(value) if value not in (None, "") else UNKNOWN
+
+
+class EmployeeColumns:
+    """Dictionary-encoded columns for the employee directory"""
+
+    def __init__(self):
+        self.size = 0
+        self.ids = array("q")
+        self.codes: Dict[str, array] = {field: array("H") for field in GROUP_FIELDS}
+        self.labels: Dict[str, List[str]] = {field: [] for field in GROUP_FIELDS}
+        self._label_codes: Dict[str, Dict[str, int]] = {field: {} for field in GROUP_FIELDS}
+        # Day ordinals; 0 when the date is unknown
+        self.joined = array("i")
+        self.left = array("i")
+
+    @classmethod
+    def from_records(
+        cls,
+        records: Iterable[Dict[str, Any]],
+        departments: Optional[Dict[int, str]] = None,
+    ) -> "EmployeeColumns":
+        """Build columns from employee records
+
+        Args:
+            records: Employee records, as returned by ``employees``
+            departments: Department names by ID, for records that only
+                carry a department ID
+        """
+        columns = cls()
+        for record in records:
+            if record.get("id") is None:
+                continue
+            columns.ids.append(int(record["id"]))
+            for field in GROUP_FIELDS:
+                columns.codes[field].append(columns._code(field, _label(record, field, departments)))
+            joined = parse_date(record.get("join_date") or record.get("start_date"))
+            left = parse_date(record.get("leaving_date") or record.get("leave_date"))
+            columns.joined.append(joined.toordinal() if joined else 0)
+            columns.left.append(left.toordinal() if left else 0)
+            columns.size += 1
+        return columns
+
+    def nbytes(self) -> int:
+        """Memory held by the column arrays"""
+        arrays = [self.ids, self.joined, self.left, *self.codes.values()]
+        return sum(column.itemsize * len(column) for column in arrays)
+
+    def select(
+        self,
+        filters: Optional[Mapping[str, Optional[str]]] = None,
+        joined_from: Optional[date] = None,
+        joined_to: Optional[date] = None,
+        left_from: Optional[date] = None,
+        left_to: Optional[date] = None,
+        employed_on: Optional[date] = None,
+    ) -> bytes:
+        """Mask of rows matching every given filter
+
+        Args:
+            filters: Labels to match by field, case-insensitively, e.g.
+                ``{"department": "Sales", "status": "Current employee"}``
+            joined_from, joined_to: Inclusive range of join dates
+            left_from, left_to: Inclusive range of leaving dates
+            employed_on: Joined on or before this date and not left before it
+
+        Returns:
+            One byte per row, 1 where the row matches
+        """
+        masks = []
+        for field, wanted in (filters or {}).items():
+            if field not in GROUP_FIELDS:
+                raise ValueError(f"Cannot filter on {field!r}; choose from {', '.join(GROUP_FIELDS)}")
+            if wanted:
+                masks.append(self._category_mask(field, wanted))
+        if joined_from or joined_to:
+            masks.append(self._date_mask(self.joined, joined_from, joined_to))
+        if left_from or left_to:
+            masks.append(self._date_mask(self.left, left_from, left_to))
+        if employed_on:
+            day = employed_on.toordinal()
+            masks.append(bytes(0 < joined <= day for joined in self.joined))
+            masks.append(bytes(not left or left >= day for left in self.left))
+
+        if not masks:
+            return b"\x01" * self.size
+        combined = int.from_bytes(masks[0], "little")
+        for mask in masks[1:]:
+            combined &= int.from_bytes(mask, "little")
+        return combined.to_bytes(self.size, "little")
+
+    def group_count(self, by: Sequence[str], mask: Optional[bytes] = None) -> List[Dict[str, Any]]:
+        """Rows per combination of ``by`` labels, largest groups first"""
+        for field in by:
+            if field not in GROUP_FIELDS:
+                raise ValueError(f"Cannot group by {field!r}; choose from {', '.join(GROUP_FIELDS)}")
+        if mask is None:
+            mask = b"\x01" * self.size
+        if not by:
+            return [{"count": mask.count(1)}]
+        columns = [compress(self.codes[field], mask) for field in by]
+        if len(by) > 1:
+            counts = Counter(zip(*columns))
+        else:
+            counts = {(code,): count for code, count in Counter(columns[0]).items()}
+        rows = []
+        for key, count in counts.items():
+            row: Dict[str, Any] = {field: self.labels[field][code] for field, code in zip(by, key)}
+            row["count"] = count
+            rows.append(row)
+        rows.sort(key=lambda row: (-row["count"], *(row[field] for field in by)))
+        return rows
+
+    def _code(self, field: str, label: str) -> int:
+        codes = self._label_codes[field]
+        code = codes.get(label)
+        if code is None:
+            code = codes[label] = len(self.labels[field])
+            self.labels[field].append(label)
+        return code
+
+    def _category_mask(self, field: str, wanted: str) -> bytes:
+        wanted = wanted.strip().lower()
+        table = bytes(label.lower() == wanted for label in self.labels[field])
+        return bytes(map(table.__getitem__, self.codes[field]))
+
+    @staticmethod
+    def _date_mask(column: array, start: Optional[date], end: Optional[date]) -> bytes:
+        lo = start.toordinal() if start else 1
+        hi = end.toordinal() if end else date.max.toordinal()
+        return bytes(lo <= day <= hi for day in column)
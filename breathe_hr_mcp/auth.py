@@ -0,0 +1,254 @@
+"""API key authentication and per-key quotas for the HTTP transport
+
+Keys are configured once at startup: ``MCP_API_KEY`` for a single key, and
+``MCP_API_KEYS`` for several named ones, given as comma-separated
+``name:key`` entries. A key may be given as ``sha256:<hex digest>`` instead
+of in plain text, so the secret itself never has to be stored in the
+environment. Every key is held only as its SHA-256 digest.
+
+A request's bearer token is hashed and looked up in a dict keyed by digest.
+The lookup compares digests, not the secret, so its timing says nothing
+about how much of a guessed key was right; the cost per request is one
+hash and one dict lookup, whatever the number of keys.
+
+Each key maps to a ``Principal`` that carries its name and quota state:
+
+- a concurrency cap, so one client cannot hold every worker slot. A
+  ``GET`` asking for ``text/event-stream`` opens a long-lived stream that
+  only waits for server messages, so it is counted separately instead
+- a token bucket, so one client cannot use up the upstream rate budget
+
+Both are plain counters updated on the event loop, with no locks or I/O.
+Requests over a quota are rejected with 429 and ``Retry-After`` rather
+than queued.
+"""
+
+import hashlib
+import json
+import math
+import os
+import time
+from typing import Any, Callable, Dict, Optional, Tuple, Union
+
+from .settings import env_float, env_int
+
+
+class AuthError(Exception):
+    """A request rejected with an HTTP status"""
+
+    def __init__(self, status: int, detail: str, headers: Optional[Dict[str, str]] = None):
+        super().__init__(detail)
+        self.status = status
+        self.detail = detail
+        self.headers = headers or {}
+
+
+class Principal:
+    """The client behind an API key, with its quota state"""
+
+    __slots__ = ("name", "in_flight", "streams", "tokens", "updated", "requests", "rejected")
+
+    def __init__(self, name: str, tokens: float, updated: float):
+        self.name = name
+        self.in_flight = 0
+        self.streams = 0
+        self.tokens = tokens
+        self.updated = updated
+        self.requests = 0
+        self.rejected = 0
+
+
+def hash_key(key: str) -> bytes:
+    """SHA-256 digest under which a key is stored and looked up"""
+    return hashlib.sha256(key.encode()).digest()
+
+
+def _parse_digest(key: str) -> bytes:
+    if key.startswith("sha256:"):
+        try:
+            digest = bytes.fromhex(key[len("sha256:"):])
+        except ValueError:
+            digest = b""
+        if len(digest) != hashlib.sha256().digest_size:
+            raise ValueError("A sha256: API key must be 64 hex characters")
+        return digest
+    return hash_key(key)
+
+
+class KeyRing:
+    """Hashed API keys and their per-key quotas
+
+    Args:
+        keys: Key digests by client name
+        concurrency: Requests a key may have in flight (0 for no limit)
+        rate: Requests per second a key may start (0 for no limit)
+        burst: Requests a key may start at once before ``rate`` applies
+    """
+
+    def __init__(
+        self,
+        keys: Optional[Dict[str, bytes]] = None,
+        concurrency: int = 0,
+        rate: float = 0.0,
+        burst: int = 0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.concurrency = concurrency
+        self.rate = rate
+        self.burst = burst or max(1, math.ceil(rate * 2))
+        self._clock = clock
+        self._principals: Dict[bytes, Principal] = {}
+        for name, digest in (keys or {}).items():
+            self.add(name, digest)
+        self.unauthorized = 0
+
+    @classmethod
+    def parse(cls, spec: str, single_key: Optional[str] = None, **quotas: Any) -> "KeyRing":
+        """Build a key ring from ``name:key`` entries and an optional unnamed key"""
+        keys = {}
+        if single_key:
+            keys["default"] = _parse_digest(single_key)
+        for item in filter(None, (part.strip() for part in spec.split(","))):
+            name, sep, key = item.partition(":")
+            if not sep or not name.strip() or not key:
+                raise ValueError(f"Invalid API key entry {name.strip()!r}; expected name:key")
+            if name.strip() in keys:
+                raise ValueError(f"Duplicate API key name {name.strip()!r}")
+            keys[name.strip()] = _parse_digest(key)
+        return cls(keys, **quotas)
+
+    @classmethod
+    def from_env(cls) -> "KeyRing":
+        """Read keys from ``MCP_API_KEY``/``MCP_API_KEYS`` and quotas from ``MCP_KEY_*``"""
+        return cls.parse(
+            os.getenv("MCP_API_KEYS", ""),
+            single_key=os.getenv("MCP_API_KEY"),
+            concurrency=env_int("MCP_KEY_CONCURRENCY", 0),
+            rate=env_float("MCP_KEY_RATE", 0.0),
+            burst=env_int("MCP_KEY_BURST", 0),
+        )
+
+    def __len__(self) -> int:
+        return len(self._principals)
+
+    def add(self, name: str, digest: bytes) -> Principal:
+        if digest in self._principals:
+            raise ValueError(f"API key {name!r} duplicates another key")
+        principal = Principal(name, float(self.burst), self._clock())
+        self._principals[digest] = principal
+        return principal
+
+    def authenticate(self, authorization: Optional[str]) -> Principal:
+        """The principal for an ``Authorization`` header, or ``AuthError`` 401"""
+        if not authorization or not authorization.startswith("Bearer "):
+            self.unauthorized += 1
+            raise AuthError(401, "Missing or invalid authorization header", {"WWW-Authenticate": "Bearer"})
+        principal = self._principals.get(hash_key(authorization[7:].strip()))
+        if principal is None:
+            self.unauthorized += 1
+            raise AuthError(401, "Invalid API key", {"WWW-Authenticate": "Bearer"})
+        return principal
+
+    def acquire(self, principal: Principal, stream: bool = False) -> None:
+        """Admit a request for ``principal``, or raise ``AuthError`` 429
+
+        A ``stream`` counts against the rate but not the concurrency cap.
+        Every admitted request must be followed by ``release`` with the
+        same ``stream``.
+        """
+        if self.concurrency and not stream and principal.in_flight >= self.concurrency:
+            principal.rejected += 1
+            raise AuthError(429, "Too many concurrent requests for this API key", {"Retry-After": "1"})
+        if self.rate > 0:
+            now = self._clock()
+            principal.tokens = min(self.burst, principal.tokens + (now - principal.updated) * self.rate)
+            principal.updated = now
+            if principal.tokens < 1:
+                principal.rejected += 1
+                retry_after = math.ceil((1 - principal.tokens) / self.rate)
+                raise AuthError(
+                    429, "Rate limit exceeded for this API key", {"Retry-After": str(retry_after)}
+                )
+            principal.tokens -= 1
+        if stream:
+            principal.streams += 1
+        else:
+            principal.in_flight += 1
+        principal.requests += 1
+
+    def release(self, principal: Principal, stream: bool = False) -> None:
+        if stream:
+            principal.streams -= 1
+        else:
+            principal.in_flight -= 1
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Request counters by client name"""
+        return {
+            principal.name: {
+                "in_flight": principal.in_flight,
+                "streams": principal.streams,
+                "requests": principal.requests,
+                "rejected": principal.rejected,
+            }
+            for principal in self._principals.values()
+        }
+
+
+class AuthMiddleware:
+    """ASGI middleware enforcing ``keyring`` on paths under ``prefix``
+
+    ``prefix`` may be a tuple to protect several path prefixes.
+
+    Written against raw ASGI rather than ``@app.middleware("http")`` so
+    requests pass straight through to the app: streamed MCP responses
+    are not copied through a queue and no extra task is spawned per
+    request. A key's concurrency slot is held until the response, stream
+    included, has finished; a ``GET`` for an event stream takes no slot,
+    since it may stay open for the whole session. The authenticated ``Principal`` is set in the
+    request state, where handlers read it as ``request.state.principal``.
+    """
+
+    def __init__(self, app, keyring: KeyRing, prefix: Union[str, Tuple[str, ...]] = "/mcp"):
+        self.app = app
+        self.keyring = keyring
+        self.prefix = prefix
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] not in ("http", "websocket") or not scope["path"].startswith(self.prefix):
+            await self.app(scope, receive, send)
+            return
+        authorization = None
+        accept = b""
+        for name, value in scope["headers"]:
+            if name == b"authorization":
+                authorization = value.decode("latin-1")
+            elif name == b"accept":
+                accept = value
+        stream = scope.get("method") == "GET" and b"text/event-stream" in accept
+        try:
+            principal = self.keyring.authenticate(authorization)
+            self.keyring.acquire(principal, stream)
+        except AuthError as exc:
+            await _reject(scope, send, exc)
+            return
+        scope.setdefault("state", {})["principal"] = principal
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.keyring.release(principal, stream)
+
+
+async def _reject(scope, send, exc: AuthError) -> None:
+    if scope["type"] == "websocket":
+        # Policy violation; the handshake is refused
+        await send({"type": "websocket.close", "code": 1008})
+        return
+    body = json.dumps({"detail": exc.detail}).encode()
+    headers = [
+        (b"content-type", b"application/json"),
+        (b"content-length", str(len(body)).encode()),
+    ]
+    headers.extend((name.lower().encode(), value.encode()) for name, value in exc.headers.items())
+    await send({"type": "http.response.start", "status": exc.status, "headers": headers})
+    await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,198 @@
+"""In-process response cache for read-only Breathe HR endpoints
+
+Entries are keyed on the endpoint and its normalized query parameters, expire
+after a per-endpoint TTL and are evicted least-recently-used once the entry
+count or (optional) byte budget is exceeded.
+"""
+
+import re
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from . import jsoncodec
+from .settings import env_bool, env_float, env_int
+
+# TTLs in seconds, keyed by endpoint pattern (numeric path segments -> "{id}").
+# Endpoints not listed here are never cached.
+DEFAULT_TTLS: Dict[str, float] = {
+    "account": 3600.0,
+    "departments": 3600.0,
+    "employees": 300.0,
+    "employees/{id}": 300.0,
+    "employees/search": 60.0,
+    "employees/{id}/absences": 60.0,
+    "absences": 60.0,
+}
+
+_ID_SEGMENT = re.compile(r"(?<=/)\d+(?=/|$)|^\d+(?=/|$)")
+
+CacheKey = Tuple[str, Tuple[Tuple[str, str], ...]]
+
+
+def endpoint_pattern(endpoint: str) -> str:
+    """Collapse numeric path segments, e.g. ``employees/42`` -> ``employees/{id}``"""
+    return _ID_SEGMENT.sub("{id}", endpoint.strip("/"))
+
+
+def make_key(endpoint: str, params: Optional[Dict[str, Any]] = None) -> CacheKey:
+    """Build a hashable cache key from an endpoint and its query parameters"""
+    normalized = tuple(
+        sorted((str(k), str(v)) for k, v in (params or {}).items() if v is not None)
+    )
+    return endpoint.strip("/"), normalized
+
+
+def covers(endpoint: str, key_endpoint: str) -> bool:
+    """Whether invalidating ``endpoint`` affects entries for ``key_endpoint``
+
+    ``employees/42`` covers itself and ``employees/42/absences`` but not
+    ``employees/420``.
+    """
+    endpoint = endpoint.strip("/")
+    return key_endpoint == endpoint or key_endpoint.startswith(endpoint + "/")
+
+
+class ResponseCache:
+    """TTL + LRU cache for upstream JSON responses
+
+    Cached values are shared between callers and must not be mutated.
+
+    ``generation`` is bumped by every invalidation. Callers that fetch a
+    value and store it afterwards should pass the generation they saw before
+    fetching to ``set``, so a response that raced an invalidation is dropped
+    instead of caching pre-invalidation data.
+    """
+
+    def __init__(
+        self,
+        ttls: Optional[Dict[str, float]] = None,
+        max_entries: int = 1024,
+        max_bytes: int = 0,
+        ttl_scale: float = 1.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.ttls = dict(DEFAULT_TTLS if ttls is None else ttls)
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_scale = ttl_scale
+        self._clock = clock
+        # key -> (expires_at, size, value)
+        self._entries: "OrderedDict[Hashable, Tuple[float, int, Any]]" = OrderedDict()
+        self._bytes = 0
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @classmethod
+    def from_env(cls) -> "ResponseCache":
+        """Build a cache sized by ``BREATHE_HR_CACHE_*`` environment variables"""
+        enabled = env_bool("BREATHE_HR_CACHE_ENABLED", True)
+        return cls(
+            ttls=None if enabled else {},
+            max_entries=env_int("BREATHE_HR_CACHE_MAX_ENTRIES", 1024),
+            max_bytes=env_int("BREATHE_HR_CACHE_MAX_BYTES", 0),
+            ttl_scale=env_float("BREATHE_HR_CACHE_TTL_SCALE", 1.0),
+        )
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def ttl_for(self, endpoint: str) -> float:
+        """TTL in seconds for an endpoint, or 0 if it is not cacheable"""
+        return self.ttls.get(endpoint_pattern(endpoint), 0.0) * self.ttl_scale
+
+    def is_cacheable(self, endpoint: str) -> bool:
+        return self.ttl_for(endpoint) > 0
+
+    def get(self, endpoint: str, params: Optional[Dict[str, Any]] = None) -> Optional[Any]:
+        """Return a fresh cached value, or ``None`` on a miss"""
+        key = make_key(endpoint, params)
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        expires_at, _, value = entry
+        if expires_at <= self._clock():
+            self._remove(key)
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(
+        self,
+        endpoint: str,
+        params: Optional[Dict[str, Any]],
+        value: Any,
+        generation: Optional[int] = None,
+        ttl: Optional[float] = None,
+    ) -> None:
+        """Store a value if the endpoint is cacheable
+
+        Args:
+            generation: ``self.generation`` as seen before the value was
+                fetched; the value is discarded if an invalidation has
+                happened since
+            ttl: Lifetime of this entry in seconds, instead of the
+                endpoint's TTL
+        """
+        endpoint_ttl = self.ttl_for(endpoint)
+        if endpoint_ttl <= 0 or value is None:
+            return
+        if ttl is None:
+            ttl = endpoint_ttl
+        if generation is not None and generation != self.generation:
+            return
+        key = make_key(endpoint, params)
+        size = len(jsoncodec.dumps_bytes(value)) if self.max_bytes else 0
+        if self.max_bytes and size > self.max_bytes:
+            return
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = (self._clock() + ttl, size, value)
+        self._bytes += size
+        self._evict()
+
+    def invalidate(self, endpoint: str) -> int:
+        """Drop entries for an endpoint and anything nested beneath it
+
+        ``invalidate("employees/42")`` removes ``employees/42`` and
+        ``employees/42/absences`` but not ``employees/420``.
+        """
+        self.generation += 1
+        stale = [key for key in self._entries if covers(endpoint, key[0])]
+        for key in stale:
+            self._remove(key)
+        return len(stale)
+
+    def clear(self) -> None:
+        self.generation += 1
+        self._entries.clear()
+        self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
+
+    def _remove(self, key: Hashable) -> None:
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+
+    def _evict(self) -> None:
+        while self._entries and (
+            len(self._entries) > self.max_entries
+            or (self.max_bytes and self._bytes > self.max_bytes)
+        ):
+            key = next(iter(self._entries))
+            self._remove(key)
+            self.evictions += 1
@@ -0,0 +1,78 @@
+"""Shared HTTP client for the Breathe HR API
+
+A single pooled ``httpx.AsyncClient`` is reused across tool calls so that
+connections to the upstream API stay alive between requests instead of
+paying for a new TCP and TLS handshake every time.
+"""
+
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from .settings import env_bool, env_float, env_int
+
+
+@dataclass(frozen=True)
+class ClientSettings:
+    """Connection pool configuration for the upstream client"""
+
+    max_connections: int = 20
+    max_keepalive_connections: int = 10
+    keepalive_expiry: float = 30.0
+    timeout: float = 30.0
+    connect_timeout: float = 5.0
+    http2: bool = False
+
+    @classmethod
+    def from_env(cls) -> "ClientSettings":
+        """Build settings from ``BREATHE_HR_*`` environment variables"""
+        return cls(
+            max_connections=env_int("BREATHE_HR_MAX_CONNECTIONS", cls.max_connections),
+            max_keepalive_connections=env_int(
+                "BREATHE_HR_MAX_KEEPALIVE_CONNECTIONS", cls.max_keepalive_connections
+            ),
+            keepalive_expiry=env_float(
+                "BREATHE_HR_KEEPALIVE_EXPIRY", cls.keepalive_expiry
+            ),
+            timeout=env_float("BREATHE_HR_TIMEOUT", cls.timeout),
+            connect_timeout=env_float("BREATHE_HR_CONNECT_TIMEOUT", cls.connect_timeout),
+            http2=env_bool("BREATHE_HR_HTTP2", cls.http2),
+        )
+
+
+def create_http_client(
+    settings: Optional[ClientSettings] = None,
+    event_hooks: Optional[Dict[str, List[Any]]] = None,
+) -> httpx.AsyncClient:
+    """Create a pooled client for talking to the Breathe HR API
+
+    Args:
+        settings: Pool configuration (default: read from the environment)
+        event_hooks: httpx ``request``/``response`` hooks, e.g. for tracing
+
+    Returns:
+        A new ``httpx.AsyncClient``; the caller is responsible for closing it
+    """
+    settings = settings or ClientSettings.from_env()
+
+    if settings.http2:
+        try:
+            import h2  # noqa: F401
+        except ImportError:
+            raise RuntimeError(
+                "BREATHE_HR_HTTP2 is enabled but the 'h2' package is not installed. "
+                "Install it with: pip install 'breathe-hr-mcp[http2]'"
+            )
+
+    limits = httpx.Limits(
+        max_connections=settings.max_connections,
+        max_keepalive_connections=settings.max_keepalive_connections,
+        keepalive_expiry=settings.keepalive_expiry,
+    )
+    return httpx.AsyncClient(
+        limits=limits,
+        timeout=httpx.Timeout(settings.timeout, connect=settings.connect_timeout),
+        http2=settings.http2,
+        event_hooks=event_hooks,
+    )
@@ -0,0 +1,114 @@
+"""Conditional GETs against the Breathe HR API
+
+Keeps the ``ETag`` and ``Last-Modified`` validators of recent GET responses,
+together with their decoded bodies, keyed on endpoint and query parameters.
+Repeat requests send ``If-None-Match``/``If-Modified-Since``; when the API
+answers ``304 Not Modified`` the stored body is returned as-is, skipping
+both the download and JSON parsing. Unlike the response cache this has no
+TTL: the upstream decides on every request whether the body is current.
+"""
+
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Hashable, Mapping, Optional
+
+from .settings import env_bool, env_int
+
+
+@dataclass(frozen=True)
+class Validated:
+    """A decoded response body and the validators it was served with"""
+
+    etag: Optional[str]
+    last_modified: Optional[str]
+    body: Any
+    size: int = 0
+
+
+class ValidatorCache:
+    """LRU map of request keys to validated response bodies
+
+    Stored bodies are shared between callers and must not be mutated.
+    """
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, Validated]" = OrderedDict()
+        self.requests = 0
+        self.not_modified = 0
+        self.bytes_saved = 0
+
+    @classmethod
+    def from_env(cls) -> "ValidatorCache":
+        """Build a cache sized by ``BREATHE_HR_CONDITIONAL_*`` environment variables"""
+        enabled = env_bool("BREATHE_HR_CONDITIONAL_REQUESTS", True)
+        return cls(max_entries=env_int("BREATHE_HR_CONDITIONAL_MAX_ENTRIES", 256) if enabled else 0)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def headers_for(self, key: Hashable) -> Dict[str, str]:
+        """Conditional request headers for ``key``, empty if nothing is stored"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return {}
+        headers = {}
+        if entry.etag:
+            headers["If-None-Match"] = entry.etag
+        if entry.last_modified:
+            headers["If-Modified-Since"] = entry.last_modified
+        self.requests += 1
+        return headers
+
+    def store(
+        self,
+        key: Hashable,
+        headers: Mapping[str, str],
+        body: Any,
+        size: int = 0,
+    ) -> bool:
+        """Remember ``body`` if the response carried validators
+
+        Returns:
+            Whether the body was stored
+        """
+        if self.max_entries <= 0 or not isinstance(headers, Mapping):
+            return False
+        etag = headers.get("ETag")
+        last_modified = headers.get("Last-Modified")
+        if not (etag or last_modified):
+            return False
+        self._entries.pop(key, None)
+        self._entries[key] = Validated(etag, last_modified, body, size)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return True
+
+    def revalidated(self, key: Hashable) -> Optional[Validated]:
+        """Record a ``304`` for ``key`` and return the stored entry"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        self._entries.move_to_end(key)
+        self.not_modified += 1
+        self.bytes_saved += entry.size
+        return entry
+
+    def peek(self, key: Hashable) -> Optional[Validated]:
+        """The stored entry for ``key``, without counting it as a 304"""
+        return self._entries.get(key)
+
+    def discard(self, key: Hashable) -> None:
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._entries),
+            "conditional_requests": self.requests,
+            "not_modified": self.not_modified,
+            "bytes_saved": self.bytes_saved,
+            "hit_ratio": self.not_modified / self.requests if self.requests else 0.0,
+        }
@@ -0,0 +1,220 @@
+"""In-memory employee directory for fast local lookups
+
+The directory holds every employee record, loaded by a paginated bulk sync,
+and indexes the lowercase tokens of each employee's name, email, department
+and ID. Queries match tokens by prefix through a sorted token list, so
+``search`` and ``get`` are answered without an upstream round-trip.
+``upsert`` keeps the index current between full syncs as individual records
+are fetched.
+
+A directory restored from an on-disk snapshot with ``restore`` may be served
+until it is ``max_stale`` seconds old, giving the first sync after a restart
+time to revalidate it.
+"""
+
+import re
+import time
+from bisect import bisect_left, insort
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set
+
+from .pagination import paginate
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+
+def _department_name(record: Dict[str, Any]) -> str:
+    department = record.get("department")
+    if isinstance(department, dict):
+        return str(department.get("name") or "")
+    return str(department or "")
+
+
+def record_tokens(record: Dict[str, Any]) -> Set[str]:
+    """Lowercase search tokens for an employee record"""
+    tokens: Set[str] = set()
+    for field in ("first_name", "last_name", "known_as", "name", "email"):
+        value = record.get(field)
+        if value:
+            tokens.update(_TOKEN.findall(str(value).lower()))
+    email = record.get("email")
+    if email:
+        tokens.add(str(email).lower())
+    tokens.update(_TOKEN.findall(_department_name(record).lower()))
+    if record.get("id") is not None:
+        tokens.add(str(record["id"]))
+    return tokens
+
+
+class EmployeeDirectory:
+    """Token index over the employee directory"""
+
+    def __init__(
+        self,
+        max_age: float = 1800.0,
+        clock: Callable[[], float] = time.monotonic,
+        max_stale: float = 0.0,
+    ):
+        self.max_age = max_age
+        self.max_stale = max_stale
+        self._clock = clock
+        self._records: Dict[int, Dict[str, Any]] = {}
+        self._record_tokens: Dict[int, Set[str]] = {}
+        self._token_ids: Dict[str, Set[int]] = {}
+        self._sorted_tokens: List[str] = []
+        self.synced_at: Optional[float] = None
+        self.restored = False
+        # Bumped on every change, so derived views know when to rebuild
+        self.version = 0
+        # IDs of the employees added, changed or removed by the last load
+        self.changed: Set[int] = set()
+        # Records as of the last load. ``upsert`` may swap in the detailed
+        # record from ``employees/{id}``, which has more fields than the list
+        # sync returns, so changes are found by comparing list records only
+        self._loaded: Dict[int, Dict[str, Any]] = {}
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    @property
+    def age(self) -> Optional[float]:
+        """Seconds since the last full sync, or ``None`` if never synced"""
+        if self.synced_at is None:
+            return None
+        return self._clock() - self.synced_at
+
+    def is_fresh(self) -> bool:
+        """Whether the directory is loaded and recent enough to serve from"""
+        age = self.age
+        if age is None:
+            return False
+        limit = max(self.max_age, self.max_stale) if self.restored else self.max_age
+        return age <= limit
+
+    def load(self, records: Iterable[Dict[str, Any]], age: float = 0.0) -> None:
+        """Replace the directory contents with a full set of records fetched ``age`` seconds ago"""
+        previous = self._loaded
+        self._records = {}
+        self._record_tokens.clear()
+        self._token_ids.clear()
+        for record in records:
+            if record.get("id") is not None:
+                self._add(record)
+        self.changed = {
+            employee_id
+            for employee_id in previous.keys() | self._records.keys()
+            if previous.get(employee_id) != self._records.get(employee_id)
+        }
+        self._loaded = dict(self._records)
+        self._sorted_tokens = sorted(self._token_ids)
+        self.synced_at = self._clock() - age
+        self.restored = False
+        self.version += 1
+
+    def restore(self, records: Iterable[Dict[str, Any]], age: float) -> None:
+        """Load records from a snapshot that was taken ``age`` seconds ago"""
+        self.load(records, age)
+        self.restored = True
+
+    def upsert(self, record: Dict[str, Any]) -> None:
+        """Insert or refresh a single employee record"""
+        if record.get("id") is None:
+            return
+        employee_id = int(record["id"])
+        if employee_id in self._records:
+            self._remove(employee_id)
+        for token in self._add(record):
+            insort(self._sorted_tokens, token)
+        self.version += 1
+
+    def records(self) -> List[Dict[str, Any]]:
+        """Every employee record currently in the directory"""
+        return list(self._records.values())
+
+    def get(self, employee_id: int) -> Optional[Dict[str, Any]]:
+        return self._records.get(int(employee_id))
+
+    def search(self, query: str) -> List[Dict[str, Any]]:
+        """Employees matching every token of ``query`` by prefix
+
+        Results are ordered with exact token matches first, then by name.
+        """
+        terms = _TOKEN.findall(query.lower())
+        if "@" in query:
+            terms = [query.strip().lower()]
+        if not terms:
+            return []
+
+        matched: Optional[Set[int]] = None
+        for term in terms:
+            ids = self._prefix_ids(term)
+            matched = ids if matched is None else matched & ids
+            if not matched:
+                return []
+
+        def rank(employee_id: int):
+            tokens = self._record_tokens[employee_id]
+            exact = sum(1 for term in terms if term in tokens)
+            record = self._records[employee_id]
+            return (
+                -exact,
+                str(record.get("last_name") or "").lower(),
+                str(record.get("first_name") or "").lower(),
+                employee_id,
+            )
+
+        return [self._records[employee_id] for employee_id in sorted(matched, key=rank)]
+
+    def search_page(self, query: str, page: int = 1, per_page: int = 20) -> Dict[str, Any]:
+        """Search results shaped like the upstream ``employees/search`` response"""
+        results = self.search(query)
+        page = max(1, page)
+        start = (page - 1) * per_page
+        return {
+            "employees": results[start:start + per_page],
+            "pagination": {"page": page, "per_page": per_page, "total": len(results)},
+        }
+
+    async def sync(self, request: Callable[..., Any], concurrency: int = 4) -> int:
+        """Reload the whole directory through paginated upstream requests
+
+        Returns:
+            The number of employees loaded
+        """
+        records: List[Dict[str, Any]] = []
+        async for page in paginate(request, "employees", "employees", concurrency=concurrency):
+            records.extend(page)
+        self.load(records)
+        return len(records)
+
+    def _add(self, record: Dict[str, Any]) -> List[str]:
+        employee_id = int(record["id"])
+        tokens = record_tokens(record)
+        self._records[employee_id] = record
+        self._record_tokens[employee_id] = tokens
+        new_tokens = []
+        for token in tokens:
+            ids = self._token_ids.get(token)
+            if ids is None:
+                ids = self._token_ids[token] = set()
+                new_tokens.append(token)
+            ids.add(employee_id)
+        return new_tokens
+
+    def _remove(self, employee_id: int) -> None:
+        self._records.pop(employee_id, None)
+        for token in self._record_tokens.pop(employee_id, ()):
+            ids = self._token_ids[token]
+            ids.discard(employee_id)
+            if not ids:
+                del self._token_ids[token]
+                index = bisect_left(self._sorted_tokens, token)
+                if index < len(self._sorted_tokens) and self._sorted_tokens[index] == token:
+                    del self._sorted_tokens[index]
+
+    def _prefix_ids(self, prefix: str) -> Set[int]:
+        ids: Set[int] = set()
+        index = bisect_left(self._sorted_tokens, prefix)
+        while index < len(self._sorted_tokens) and self._sorted_tokens[index].startswith(prefix):
+            ids |= self._token_ids[self._sorted_tokens[index]]
+            index += 1
+        return ids
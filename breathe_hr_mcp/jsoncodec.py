@@ -0,0 +1,100 @@
+"""Pluggable JSON codec for upstream responses and tool results
+
+Upstream bodies are decoded straight from the response bytes, skipping the
+intermediate ``str`` that ``httpx.Response.json()`` builds. The backend is
+chosen once at import:
+
+- ``orjson``: fastest, used when installed (``pip install 'breathe-hr-mcp[fast-json]'``)
+- ``pydantic``: the Rust parser in ``pydantic_core``, always available
+- ``json``: the standard library
+
+Set ``BREATHE_HR_JSON_BACKEND`` to force one; the default ``auto`` picks the
+first that is available.
+"""
+
+import json
+import os
+from typing import Any, Callable, Dict, Tuple, Union
+
+import pydantic_core
+
+try:
+    import orjson
+except ImportError:  # optional dependency
+    orjson = None
+
+# Longest slice of an upstream body quoted in an error message
+ERROR_BODY_LIMIT = 500
+
+Codec = Tuple[Callable[[Union[bytes, str]], Any], Callable[[Any], bytes]]
+
+
+def _orjson_codec() -> Codec:
+    options = orjson.OPT_NON_STR_KEYS
+
+    def dumps(value: Any) -> bytes:
+        return orjson.dumps(value, default=str, option=options)
+
+    return orjson.loads, dumps
+
+
+def _pydantic_codec() -> Codec:
+    def dumps(value: Any) -> bytes:
+        return pydantic_core.to_json(value, fallback=str)
+
+    return pydantic_core.from_json, dumps
+
+
+def _json_codec() -> Codec:
+    def dumps(value: Any) -> bytes:
+        return json.dumps(value, separators=(",", ":"), default=str).encode()
+
+    return json.loads, dumps
+
+
+def available_backends() -> Dict[str, Codec]:
+    """Codecs that can be used in this environment, fastest first"""
+    backends = {}
+    if orjson is not None:
+        backends["orjson"] = _orjson_codec()
+    backends["pydantic"] = _pydantic_codec()
+    backends["json"] = _json_codec()
+    return backends
+
+
+def select_backend(name: str = "auto") -> Tuple[str, Codec]:
+    """Resolve a backend name to ``(name, codec)``"""
+    backends = available_backends()
+    if name in ("", "auto"):
+        name = next(iter(backends))
+    if name not in backends:
+        raise RuntimeError(
+            f"BREATHE_HR_JSON_BACKEND={name!r} is not available; "
+            f"choose one of: auto, {', '.join(backends)}"
+        )
+    return name, backends[name]
+
+
+BACKEND, (_loads, _dumps) = select_backend(os.getenv("BREATHE_HR_JSON_BACKEND", "auto").lower())
+
+
+def loads(data: Union[bytes, str]) -> Any:
+    """Decode JSON from bytes or text, raising ``ValueError`` if invalid"""
+    return _loads(data)
+
+
+def dumps_bytes(value: Any) -> bytes:
+    """Encode a value as compact UTF-8 JSON; unknown types are stringified"""
+    return _dumps(value)
+
+
+def dumps(value: Any) -> str:
+    return _dumps(value).decode()
+
+
+def excerpt(body: bytes, limit: int = ERROR_BODY_LIMIT) -> str:
+    """A bounded, printable excerpt of a response body for error messages"""
+    text = body[:limit].decode("utf-8", errors="replace")
+    if len(body) > limit:
+        text += f"... ({len(body)} bytes)"
+    return text
@@ -0,0 +1,166 @@
+"""Validation and overlap detection for bulk leave requests
+
+Each item of a bulk submission is parsed into a ``LeaveRequest`` before
+anything is sent upstream, so malformed dates and inconsistent half-day
+settings are reported per item instead of failing halfway through. Valid
+items are then checked for overlaps with each other and with the
+employee's existing absences.
+
+Two absences overlap when their date ranges share a day, unless both are
+half days on the same date in different periods (morning and afternoon).
+"""
+
+from bisect import bisect_right
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import date
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+
+from .occupancy import absence_employee_id, is_active, parse_date
+
+HALF_DAY_PERIODS = ("morning", "afternoon")
+
+
+@dataclass(frozen=True)
+class LeaveRequest:
+    """A validated leave request, ready to submit"""
+
+    employee_id: int
+    start: date
+    end: date
+    absence_type: str
+    reason: Optional[str] = None
+    half_day: bool = False
+    half_day_period: Optional[str] = None
+
+    def payload(self) -> Dict[str, Any]:
+        """Request body for ``POST absences``"""
+        data = {
+            "employee_id": self.employee_id,
+            "start_date": self.start.isoformat(),
+            "end_date": self.end.isoformat(),
+            "type": self.absence_type,
+            "half_day": self.half_day,
+        }
+        if self.reason:
+            data["reason"] = self.reason
+        if self.half_day_period:
+            data["half_day_period"] = self.half_day_period
+        return data
+
+
+def _strict_date(item: Mapping[str, Any], field: str) -> date:
+    value = item.get(field)
+    parsed = parse_date(value) if isinstance(value, str) and len(value) == 10 else None
+    if parsed is None:
+        raise ValueError(f"{field} must be a date in YYYY-MM-DD format")
+    return parsed
+
+
+def parse_leave_request(item: Mapping[str, Any]) -> LeaveRequest:
+    """Validate one bulk item, raising ``ValueError`` with the first problem
+
+    Items use the same fields as ``create_leave_request``: ``employee_id``,
+    ``start_date``, ``end_date``, ``absence_type`` and optionally
+    ``reason``, ``half_day`` and ``half_day_period``.
+    """
+    if not isinstance(item, Mapping):
+        raise ValueError("Each leave request must be an object")
+    try:
+        employee_id = int(item["employee_id"])
+    except (KeyError, TypeError, ValueError):
+        raise ValueError("employee_id must be an integer")
+    start = _strict_date(item, "start_date")
+    end = _strict_date(item, "end_date")
+    if end < start:
+        raise ValueError("end_date must not be before start_date")
+    absence_type = str(item.get("absence_type") or "").strip()
+    if not absence_type:
+        raise ValueError("absence_type is required")
+
+    half_day = item.get("half_day", False)
+    if not isinstance(half_day, bool):
+        raise ValueError("half_day must be true or false")
+    period = item.get("half_day_period")
+    if half_day:
+        if start != end:
+            raise ValueError("A half-day absence must start and end on the same date")
+        if period not in HALF_DAY_PERIODS:
+            raise ValueError("half_day_period must be 'morning' or 'afternoon' for a half day")
+    elif period is not None:
+        raise ValueError("half_day_period is only allowed when half_day is true")
+
+    reason = item.get("reason")
+    return LeaveRequest(
+        employee_id=employee_id,
+        start=start,
+        end=end,
+        absence_type=absence_type,
+        reason=str(reason) if reason else None,
+        half_day=half_day,
+        half_day_period=period,
+    )
+
+
+# (start, end, half-day period or None for whole days, description)
+_Span = Tuple[date, date, Optional[str], str]
+
+
+def _overlaps(a: _Span, b: _Span) -> bool:
+    if a[0] > b[1] or b[0] > a[1]:
+        return False
+    # Morning and afternoon of the same day can both be taken
+    return not (a[2] and b[2] and a[2] != b[2])
+
+
+def _existing_spans(absences: Iterable[Dict[str, Any]]) -> Dict[int, List[_Span]]:
+    spans: Dict[int, List[_Span]] = defaultdict(list)
+    for absence in absences:
+        if not isinstance(absence, dict) or not is_active(absence):
+            continue
+        employee_id = absence_employee_id(absence)
+        start = parse_date(absence.get("start_date"))
+        end = parse_date(absence.get("end_date")) or start
+        if employee_id is None or start is None:
+            continue
+        # An existing half day of unknown period blocks the whole day
+        period = absence.get("half_day_period") if absence.get("half_day") else None
+        label = "an existing absence"
+        if absence.get("id") is not None:
+            label = f"existing absence {absence['id']}"
+        spans[employee_id].append((start, end, period, label))
+    for employee_spans in spans.values():
+        employee_spans.sort(key=lambda span: span[:2])
+    return spans
+
+
+def find_conflicts(
+    requests: Mapping[int, LeaveRequest], existing: Iterable[Dict[str, Any]]
+) -> Dict[int, str]:
+    """Items that overlap an existing absence or an earlier item in the batch
+
+    Args:
+        requests: Validated requests keyed by their position in the batch
+        existing: Absence records already in Breathe HR
+
+    Returns:
+        Messages keyed by the position of each conflicting item
+    """
+    existing_spans = _existing_spans(existing)
+    conflicts: Dict[int, str] = {}
+    accepted: Dict[int, List[_Span]] = defaultdict(list)
+    for index in sorted(requests):
+        request = requests[index]
+        span = (request.start, request.end, request.half_day_period, f"item {index}")
+        spans = existing_spans.get(request.employee_id, [])
+        # Spans are sorted by start, so only those starting by our end can overlap
+        candidates = spans[:bisect_right(spans, (request.end, date.max), key=lambda span: span[:2])]
+        clash = next(
+            (other for other in candidates + accepted[request.employee_id] if _overlaps(span, other)),
+            None,
+        )
+        if clash is not None:
+            conflicts[index] = f"Overlaps {clash[3]} ({clash[0].isoformat()} to {clash[1].isoformat()})"
+        else:
+            accepted[request.employee_id].append(span)
+    return conflicts
@@ -0,0 +1,236 @@
+"""Server-side auto-pagination over Breathe HR list endpoints
+
+``paginate`` is an async generator that yields one page of records at a
+time. Once the first page reveals the total page count, the remaining pages
+are prefetched concurrently through a bounded sliding window while still
+being yielded in order. Without a page count it falls back to fetching
+sequentially until a short or empty page is returned.
+
+The page count is read from a ``pagination`` block in the response body.
+Breathe HR's v1 list endpoints report totals in ``Total``/``Per-Page``/
+``Link`` response headers rather than the body, so ``breathe_hr_request``
+folds any such headers into the body with ``pagination_from_headers``
+before it reaches this module. Both sources are honored; if neither is
+present pages are fetched sequentially.
+"""
+
+import asyncio
+import math
+import re
+from collections import deque
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Deque,
+    Dict,
+    List,
+    Mapping,
+    Optional,
+)
+from urllib.parse import parse_qs, urlsplit
+
+Request = Callable[..., Awaitable[Any]]
+
+MAX_PER_PAGE = 100
+
+_LINK_LAST = re.compile(r'<([^>]*)>\s*;[^,]*\brel="?last"?', re.IGNORECASE)
+
+
+def _header_int(headers: Mapping[str, str], *names: str) -> Optional[int]:
+    for name in names:
+        value = headers.get(name)
+        if value is not None:
+            try:
+                return int(value)
+            except (TypeError, ValueError):
+                return None
+    return None
+
+
+def pagination_from_headers(
+    headers: Any, params: Optional[Dict[str, Any]] = None
+) -> Optional[Dict[str, int]]:
+    """Build a ``pagination`` block from upstream pagination headers
+
+    Understands ``Total``/``X-Total-Count``, ``Per-Page``/``X-Per-Page`` and
+    the ``rel="last"`` entry of a ``Link`` header.
+
+    Returns:
+        Dict with whichever of ``page``, ``per_page``, ``total`` and
+        ``total_pages`` could be determined, or ``None`` if the headers
+        carry no pagination information
+    """
+    if not isinstance(headers, Mapping):
+        return None
+    params = params or {}
+    pagination: Dict[str, int] = {}
+
+    total = _header_int(headers, "Total", "X-Total-Count", "X-Total")
+    per_page = _header_int(headers, "Per-Page", "X-Per-Page")
+    if per_page is None and params.get("per_page") is not None:
+        per_page = int(params["per_page"])
+    if total is not None:
+        pagination["total"] = total
+    if per_page is not None:
+        pagination["per_page"] = per_page
+
+    match = _LINK_LAST.search(headers.get("Link") or "")
+    if match:
+        last = parse_qs(urlsplit(match.group(1)).query).get("page")
+        if last and last[0].isdigit():
+            pagination["total_pages"] = int(last[0])
+    if "total_pages" not in pagination and total is not None and per_page:
+        pagination["total_pages"] = max(1, math.ceil(total / per_page))
+
+    if not pagination:
+        return None
+    pagination["page"] = int(params.get("page", 1))
+    return pagination
+
+
+def clamp_max_records(max_records: int, ceiling: int) -> int:
+    """Validate a caller-supplied record limit against the server ceiling"""
+    if max_records < 1:
+        raise ValueError("max_records must be at least 1")
+    return min(max_records, ceiling)
+
+
+def page_records(body: Any, collection_key: str) -> List[Dict[str, Any]]:
+    """Extract the list of records from a page response"""
+    if isinstance(body, list):
+        return body
+    if isinstance(body, dict):
+        records = body.get(collection_key)
+        if isinstance(records, list):
+            return records
+    return []
+
+
+def total_pages(body: Any, per_page: int) -> Optional[int]:
+    """Read the total page count from a page response, if it reports one"""
+    if not isinstance(body, dict):
+        return None
+    pagination = body.get("pagination")
+    if not isinstance(pagination, dict):
+        return None
+    if pagination.get("total_pages") is not None:
+        return int(pagination["total_pages"])
+    total = pagination.get("total", pagination.get("total_count"))
+    if total is not None:
+        return max(1, math.ceil(int(total) / per_page))
+    return None
+
+
+async def paginate(
+    request: Request,
+    endpoint: str,
+    collection_key: str,
+    params: Optional[Dict[str, Any]] = None,
+    per_page: int = MAX_PER_PAGE,
+    concurrency: int = 4,
+    max_records: Optional[int] = None,
+) -> AsyncIterator[List[Dict[str, Any]]]:
+    """Yield pages of records from a paginated endpoint
+
+    Args:
+        request: Coroutine used to fetch a page, e.g. ``breathe_hr_request``
+        endpoint: List endpoint to page through
+        collection_key: Key holding the records in each response body
+        params: Extra query parameters sent with every page
+        per_page: Page size to request (clamped to the API maximum)
+        concurrency: Maximum number of pages fetched at once
+        max_records: Stop after this many records have been yielded
+
+    Yields:
+        Lists of records, one per page, in page order
+    """
+    per_page = max(1, min(per_page, MAX_PER_PAGE))
+    base_params = dict(params or {})
+    emitted = 0
+
+    async def fetch(page: int) -> Any:
+        return await request(
+            endpoint, params={**base_params, "page": page, "per_page": per_page}
+        )
+
+    def take(records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        nonlocal emitted
+        if max_records is not None:
+            records = records[: max_records - emitted]
+        emitted += len(records)
+        return records
+
+    def exhausted() -> bool:
+        return max_records is not None and emitted >= max_records
+
+    first = await fetch(1)
+    records = page_records(first, collection_key)
+    yield take(records)
+
+    pages = total_pages(first, per_page)
+    if pages is None:
+        page = 1
+        while len(records) >= per_page and not exhausted():
+            page += 1
+            records = page_records(await fetch(page), collection_key)
+            if not records:
+                break
+            yield take(records)
+        return
+
+    last_page = pages
+    if max_records is not None:
+        last_page = min(last_page, math.ceil(max_records / per_page))
+
+    pending: Deque["asyncio.Future[Any]"] = deque()
+    next_page = 2
+    try:
+        while (next_page <= last_page or pending) and not exhausted():
+            while next_page <= last_page and len(pending) < concurrency:
+                pending.append(asyncio.ensure_future(fetch(next_page)))
+                next_page += 1
+            yield take(page_records(await pending.popleft(), collection_key))
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+async def fetch_all(
+    request: Request,
+    endpoint: str,
+    collection_key: str,
+    params: Optional[Dict[str, Any]] = None,
+    concurrency: int = 4,
+    max_records: int = 5000,
+) -> Dict[str, Any]:
+    """Collect every record from a paginated endpoint into one response
+
+    Returns:
+        Dict with the records under ``collection_key``, a ``count`` and a
+        ``truncated`` flag set when ``max_records`` cut the result short
+    """
+    records: List[Dict[str, Any]] = []
+    pages = 0
+    # Ask for one extra record so truncation can be detected exactly
+    async for page in paginate(
+        request,
+        endpoint,
+        collection_key,
+        params=params,
+        concurrency=concurrency,
+        max_records=max_records + 1,
+    ):
+        records.extend(page)
+        pages += 1
+
+    truncated = len(records) > max_records
+    if truncated:
+        del records[max_records:]
+    return {
+        collection_key: records,
+        "count": len(records),
+        "pages": pages,
+        "truncated": truncated,
+    }
@@ -0,0 +1,105 @@
+"""Response slimming for MCP tool results
+
+Upstream employee and absence records carry dozens of fields, many of them
+null or empty. ``shape_response`` applies an optional field projection and a
+compact profile that strips those empty values before a result is
+serialized for the MCP transport. Inputs are never mutated, since they may
+be shared through the response cache.
+"""
+
+from typing import Any, Dict, Iterable, List, Optional
+
+
+def compact(value: Any) -> Any:
+    """Recursively drop null and empty values from dicts and lists"""
+    if isinstance(value, dict):
+        slim = {}
+        for key, item in value.items():
+            if item is None or item == "":
+                continue
+            if type(item) is dict or type(item) is list:
+                item = compact(item)
+                if not item:
+                    continue
+            slim[key] = item
+        return slim
+    if isinstance(value, list):
+        slim_list = []
+        for item in value:
+            if item is None or item == "":
+                continue
+            if type(item) is dict or type(item) is list:
+                item = compact(item)
+                if not item:
+                    continue
+            slim_list.append(item)
+        return slim_list
+    return value
+
+
+def _field_tree(fields: Iterable[str]) -> Dict[str, Any]:
+    """Turn dotted paths into a nested tree, e.g. ``department.name``"""
+    tree: Dict[str, Any] = {}
+    for field in fields:
+        node = tree
+        parts = [part for part in field.strip().split(".") if part]
+        for index, part in enumerate(parts):
+            if index == len(parts) - 1:
+                node[part] = True
+            else:
+                child = node.get(part)
+                if child is True:
+                    break
+                node = node.setdefault(part, {})
+    return tree
+
+
+def _project(value: Any, tree: Dict[str, Any]) -> Any:
+    if isinstance(value, list):
+        return [_project(item, tree) for item in value]
+    if not isinstance(value, dict):
+        return value
+    projected = {}
+    for key, subtree in tree.items():
+        if key in value:
+            projected[key] = value[key] if subtree is True else _project(value[key], subtree)
+    return projected
+
+
+def project(record: Any, fields: Iterable[str]) -> Any:
+    """Keep only ``fields`` (dotted paths allowed) of a record or list of records"""
+    return _project(record, _field_tree(fields))
+
+
+def shape_response(
+    body: Any,
+    collection_key: Optional[str] = None,
+    fields: Optional[List[str]] = None,
+    compact_profile: bool = True,
+) -> Any:
+    """Project and compact a tool result
+
+    Args:
+        body: Upstream response body
+        collection_key: Key holding the list of records (e.g. ``employees``);
+            other top-level keys such as ``pagination`` are kept as-is
+        fields: Fields to keep on each record; ``id`` is always included
+        compact_profile: Drop null and empty values
+
+    Returns:
+        A new, slimmed copy of ``body``
+    """
+    if not fields and not compact_profile:
+        return body
+    tree = _field_tree(["id", *fields]) if fields else None
+
+    def shape(record: Any) -> Any:
+        if tree is not None:
+            record = _project(record, tree)
+        return compact(record) if compact_profile else record
+
+    if collection_key and isinstance(body, dict) and isinstance(body.get(collection_key), list):
+        shaped = dict(body)
+        shaped[collection_key] = [shape(record) for record in body[collection_key]]
+        return shaped
+    return shape(body)
@@ -0,0 +1,196 @@
+"""Client-side rate limiting for upstream Breathe HR calls
+
+A process-wide token bucket paces requests to a configured budget. When the
+API answers 429 the bucket pauses every caller until ``Retry-After`` has
+passed and halves its rate, then creeps back up towards the configured rate
+as requests succeed again (additive increase, multiplicative decrease).
+Waits are capped at ``backoff_cap``: a ``Retry-After`` longer than that
+fails the call instead of stalling every caller in the process.
+
+With a ``SharedRateBudget`` the bucket lives in a database shared by every
+worker process, so several workers together stay within one budget.
+"""
+
+import asyncio
+import random
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Dict, Optional
+
+from .settings import env_float, env_int
+
+if TYPE_CHECKING:
+    from .shared import SharedRateBudget
+
+
+def parse_retry_after(value: Any, now: Optional[datetime] = None) -> Optional[float]:
+    """Parse a ``Retry-After`` header given in seconds or as an HTTP date"""
+    if not isinstance(value, str) or not value.strip():
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    now = now or datetime.now(timezone.utc)
+    return max(0.0, (when - now).total_seconds())
+
+
+class RateLimiter:
+    """Adaptive token bucket shared by all upstream requests"""
+
+    def __init__(
+        self,
+        rate: float = 10.0,
+        burst: int = 20,
+        max_retries: int = 3,
+        min_rate: float = 0.5,
+        backoff_base: float = 0.5,
+        backoff_cap: float = 30.0,
+        decrease_window: float = 1.0,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], Awaitable[None]] = asyncio.sleep,
+        budget: Optional["SharedRateBudget"] = None,
+    ):
+        self.max_rate = rate
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.max_retries = max(0, max_retries)
+        self.min_rate = min(min_rate, rate) if rate > 0 else 0.0
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.decrease_window = decrease_window
+        self._clock = clock
+        self._sleep = sleep
+        self.budget = budget
+        self._tokens = float(self.burst)
+        self._updated = clock()
+        self._blocked_until = 0.0
+        self._decrease_until = 0.0
+        self._lock: Optional[asyncio.Lock] = None
+        self._lock_loop: Optional[asyncio.AbstractEventLoop] = None
+        self.throttled = 0
+        self.retries = 0
+        self.waits = 0
+
+    @classmethod
+    def from_env(cls, budget: Optional["SharedRateBudget"] = None) -> "RateLimiter":
+        """Build a limiter from ``BREATHE_HR_RATE_*`` environment variables"""
+        return cls(
+            rate=env_float("BREATHE_HR_RATE_LIMIT", 10.0),
+            burst=env_int("BREATHE_HR_RATE_BURST", 20),
+            max_retries=max(0, env_int("BREATHE_HR_MAX_RETRIES", 3)),
+            backoff_cap=env_float("BREATHE_HR_MAX_RETRY_WAIT", 30.0),
+            budget=budget,
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_rate > 0
+
+    async def acquire(self) -> None:
+        """Wait until a request may be sent"""
+        if self.budget is not None:
+            delay, self.rate = await asyncio.to_thread(
+                self.budget.reserve, self.max_rate, self.burst, self.enabled
+            )
+            if delay > 0:
+                self.waits += 1
+                await self._sleep(delay)
+            return
+        # Created lazily so the limiter can be built outside an event loop
+        loop = asyncio.get_running_loop()
+        if self._lock is None or self._lock_loop is not loop:
+            self._lock = asyncio.Lock()
+            self._lock_loop = loop
+        async with self._lock:
+            while True:
+                delay = self._blocked_until - self._clock()
+                if delay <= 0:
+                    break
+                self.waits += 1
+                await self._sleep(delay)
+            if not self.enabled:
+                return
+            # Reserve a token up front and sleep off any debt, so the wait is
+            # computed once rather than re-checked against float round-off
+            self._refill(self._clock())
+            self._tokens -= 1
+            if self._tokens < 0:
+                self.waits += 1
+                await self._sleep(-self._tokens / self.rate)
+
+    async def on_success(self) -> None:
+        """Recover the request rate after a successful call"""
+        if self.enabled and self.rate < self.max_rate:
+            if self.budget is not None:
+                # The shared budget is a SQLite transaction that may wait on
+                # other workers, so it runs off the event loop
+                self.rate = await asyncio.to_thread(
+                    self.budget.recover, self.max_rate * 0.05, self.max_rate
+                )
+                return
+            self.rate = min(self.max_rate, self.rate + self.max_rate * 0.05)
+
+    async def on_rate_limited(self, retry_after: Optional[float] = None) -> None:
+        """Pause all callers and shrink the rate after a 429
+
+        Concurrent requests throttled by the same event all report back at
+        roughly the same time, so the rate is halved at most once per window.
+        """
+        self.throttled += 1
+        if retry_after is not None:
+            retry_after = min(retry_after, self.backoff_cap)
+        if self.budget is not None:
+            self.rate = await asyncio.to_thread(
+                self.budget.rate_limited,
+                retry_after, self.max_rate, self.burst, self.min_rate, self.decrease_window,
+            )
+            return
+        now = self._clock()
+        if retry_after:
+            self._blocked_until = max(self._blocked_until, now + retry_after)
+        if self.enabled:
+            self._refill(now)
+            self._tokens = min(self._tokens, 0.0)
+            if now >= self._decrease_until:
+                self.rate = max(self.min_rate, self.rate / 2)
+                self._decrease_until = now + max(retry_after or 0.0, self.decrease_window)
+
+    def can_wait(self, retry_after: Optional[float]) -> bool:
+        """Whether a ``Retry-After`` is short enough to wait out and retry"""
+        return retry_after is None or retry_after <= self.backoff_cap
+
+    def backoff_delay(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """Jittered delay before retry number ``attempt`` (starting at 0), at most ``backoff_cap``"""
+        if retry_after is not None:
+            return min(self.backoff_cap, retry_after + random.uniform(0, self.backoff_base))
+        ceiling = min(self.backoff_cap, self.backoff_base * (2 ** attempt))
+        return random.uniform(ceiling / 2, ceiling)
+
+    async def wait_before_retry(self, attempt: int, retry_after: Optional[float] = None) -> None:
+        """Sleep for the backoff delay before retrying a throttled request"""
+        self.retries += 1
+        await self._sleep(self.backoff_delay(attempt, retry_after))
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "rate": self.rate,
+            "max_rate": self.max_rate,
+            "tokens": self._tokens,
+            "throttled": self.throttled,
+            "retries": self.retries,
+            "waits": self.waits,
+        }
+
+    def _refill(self, now: float) -> None:
+        elapsed = max(0.0, now - self._updated)
+        self._updated = now
+        self._tokens = min(float(self.burst), self._tokens + elapsed * self.rate)
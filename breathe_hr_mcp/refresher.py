@@ -0,0 +1,202 @@
+"""Stale-while-revalidate refresher for hot reference data
+
+Departments, account info and the employee directory are read constantly
+but change rarely. Each is registered as a dataset with a soft TTL. Reads
+are answered from memory. A read past the soft TTL returns the current value
+straight away and starts a background refresh, so callers never wait on the
+network once a dataset has loaded. Only a dataset that has never loaded, or
+is older than ``max_stale``, makes the caller wait for a fetch.
+
+``run`` is started in the server lifespan. On a jittered interval it
+refreshes every dataset that is past its soft TTL, so workers started
+together don't refresh in lockstep. A failed refresh keeps the old value and
+backs off exponentially (with jitter) before the next attempt.
+
+A dataset may be registered with an ``on_change`` callback, awaited after a
+refresh returns a value different from the one it replaces.
+"""
+
+import asyncio
+import random
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from .settings import env_float
+
+
+class Dataset:
+    """One in-memory dataset and its refresh state"""
+
+    def __init__(
+        self,
+        name: str,
+        fetch: Callable[[], Awaitable[Any]],
+        soft_ttl: float,
+        on_change: Optional[Callable[[Any], Awaitable[None]]] = None,
+    ):
+        self.name = name
+        self.fetch = fetch
+        self.soft_ttl = soft_ttl
+        self.on_change = on_change
+        self.value: Any = None
+        self.loaded = False
+        self.fetched_at: Optional[float] = None
+        # Set for values restored from a snapshot, which are revalidated on
+        # the first pass even if they are within the soft TTL
+        self.revalidate = False
+        self.failures = 0
+        self.last_error: Optional[str] = None
+        self.next_attempt = 0.0
+        self.refreshes = 0
+        self.task: "Optional[asyncio.Future[Any]]" = None
+
+    def age(self, now: float) -> Optional[float]:
+        """Seconds since the value was fetched, or ``None`` if never loaded"""
+        return None if self.fetched_at is None else now - self.fetched_at
+
+    def is_stale(self, now: float) -> bool:
+        age = self.age(now)
+        return age is None or self.revalidate or age > self.soft_ttl
+
+    def is_due(self, now: float) -> bool:
+        """Whether a background refresh should start now"""
+        refreshing = self.task is not None and not self.task.done()
+        return self.is_stale(now) and not refreshing and now >= self.next_attempt
+
+
+class BackgroundRefresher:
+    """Serve registered datasets from memory and refresh them in the background"""
+
+    def __init__(
+        self,
+        interval: float = 30.0,
+        jitter: float = 0.1,
+        backoff_base: float = 5.0,
+        backoff_max: float = 300.0,
+        max_stale: float = 86400.0,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], Awaitable[None]] = asyncio.sleep,
+        rng: Optional[random.Random] = None,
+    ):
+        self.interval = interval
+        self.jitter = jitter
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.max_stale = max_stale
+        self._clock = clock
+        self._sleep = sleep
+        self._rng = rng or random.Random()
+        self._datasets: Dict[str, Dataset] = {}
+
+    @classmethod
+    def from_env(cls) -> "BackgroundRefresher":
+        """Build a refresher tuned by ``BREATHE_HR_REFRESH_*`` environment variables"""
+        return cls(
+            interval=env_float("BREATHE_HR_REFRESH_INTERVAL", 30.0),
+            jitter=env_float("BREATHE_HR_REFRESH_JITTER", 0.1),
+            backoff_max=env_float("BREATHE_HR_REFRESH_BACKOFF_MAX", 300.0),
+            max_stale=env_float("BREATHE_HR_REFRESH_MAX_STALE", 86400.0),
+        )
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._datasets
+
+    def register(
+        self,
+        name: str,
+        fetch: Callable[[], Awaitable[Any]],
+        soft_ttl: float,
+        on_change: Optional[Callable[[Any], Awaitable[None]]] = None,
+    ) -> Dataset:
+        """Keep the result of ``fetch`` in memory, refreshing it after ``soft_ttl`` seconds
+
+        ``on_change`` is awaited with the new value whenever a refresh
+        replaces a loaded value with a different one.
+        """
+        dataset = self._datasets[name] = Dataset(name, fetch, soft_ttl, on_change)
+        return dataset
+
+    def restore(self, name: str, value: Any, age: float) -> None:
+        """Seed a dataset with a value fetched ``age`` seconds ago, to be revalidated"""
+        dataset = self._datasets[name]
+        dataset.value = value
+        dataset.loaded = True
+        dataset.fetched_at = self._clock() - age
+        dataset.revalidate = True
+
+    async def get(self, name: str) -> Any:
+        """Return a dataset's value, refreshing it in the background if stale
+
+        Waits for a fetch only if the dataset has never loaded or is older
+        than ``max_stale``; the fetch's error is raised if that fails.
+        """
+        dataset = self._datasets[name]
+        now = self._clock()
+        age = dataset.age(now)
+        if not dataset.loaded or age is None or age > self.max_stale:
+            return await asyncio.shield(self.refresh(name))
+        if dataset.is_due(now):
+            self.refresh(name)
+        return dataset.value
+
+    def refresh(self, name: str) -> "asyncio.Future[Any]":
+        """Start refreshing a dataset, or return the refresh already in flight"""
+        dataset = self._datasets[name]
+        if dataset.task is None or dataset.task.done():
+            dataset.task = asyncio.ensure_future(self._refresh(dataset))
+            # Failures are recorded on the dataset; nothing else awaits
+            # background refreshes
+            dataset.task.add_done_callback(lambda task: task.cancelled() or task.exception())
+        return dataset.task
+
+    async def refresh_due(self) -> None:
+        """Refresh every dataset that is stale and not backing off"""
+        now = self._clock()
+        due = [self.refresh(d.name) for d in self._datasets.values() if d.is_due(now)]
+        await asyncio.gather(*due, return_exceptions=True)
+
+    async def run(self) -> None:
+        """Refresh due datasets forever, on a jittered interval"""
+        while True:
+            await self.refresh_due()
+            await self._sleep(self._jittered(self.interval))
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Freshness of each dataset, keyed by name"""
+        now = self._clock()
+        return {
+            name: {
+                "age": dataset.age(now),
+                "stale": dataset.is_stale(now),
+                "refreshes": dataset.refreshes,
+                "failures": dataset.failures,
+                "last_error": dataset.last_error,
+                "retry_in": max(0.0, dataset.next_attempt - now),
+            }
+            for name, dataset in self._datasets.items()
+        }
+
+    async def _refresh(self, dataset: Dataset) -> Any:
+        try:
+            value = await dataset.fetch()
+        except Exception as exc:
+            dataset.failures += 1
+            dataset.last_error = f"{type(exc).__name__}: {exc}"
+            delay = min(self.backoff_max, self.backoff_base * 2 ** (dataset.failures - 1))
+            dataset.next_attempt = self._clock() + self._jittered(delay)
+            raise
+        changed = dataset.loaded and value != dataset.value
+        dataset.value = value
+        dataset.loaded = True
+        dataset.fetched_at = self._clock()
+        dataset.revalidate = False
+        dataset.failures = 0
+        dataset.last_error = None
+        dataset.next_attempt = 0.0
+        dataset.refreshes += 1
+        if changed and dataset.on_change is not None:
+            await dataset.on_change(value)
+        return value
+
+    def _jittered(self, delay: float) -> float:
+        return max(0.0, delay * (1 + self.jitter * (2 * self._rng.random() - 1)))
@@ -0,0 +1,278 @@
+"""Fail-fast and tail-latency controls for upstream calls
+
+- ``CircuitBreaker`` watches recent upstream outcomes. When too many calls
+  fail or are slow, it opens and rejects new calls immediately for a cool-off
+  period instead of letting tool calls pile up behind a struggling API. After
+  the cool-off, a single probe call decides whether it closes again.
+- ``Hedger`` sends a second copy of an idempotent request once the first
+  has been outstanding longer than the endpoint's recent p95 latency, and
+  uses whichever answers first.
+- ``EndpointTimeouts`` holds per-endpoint connect/read timeout overrides.
+"""
+
+import asyncio
+import os
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Hashable, Optional, TypeVar
+
+import httpx
+
+from .settings import env_bool, env_float, env_int
+
+T = TypeVar("T")
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling upstream while the circuit is open"""
+
+
+class CircuitBreaker:
+    """Open after a high failure or slow-call ratio, then probe to recover
+
+    A call counts against the upstream if it raised a transport error, got a
+    5xx response, or took at least ``slow_call`` seconds. The ratio is taken
+    over the last ``window`` calls once at least ``min_calls`` are recorded.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        failure_ratio: float = 0.5,
+        window: int = 20,
+        min_calls: int = 10,
+        slow_call: float = 10.0,
+        reset_timeout: float = 30.0,
+        enabled: bool = True,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.failure_ratio = failure_ratio
+        self.min_calls = min_calls
+        self.slow_call = slow_call
+        self.reset_timeout = reset_timeout
+        self.enabled = enabled
+        self._clock = clock
+        self._outcomes: Deque[bool] = deque(maxlen=window)
+        self._opened_at: Optional[float] = None
+        self._probing = False
+        self.opened = 0
+        self.rejected = 0
+
+    @classmethod
+    def from_env(cls) -> "CircuitBreaker":
+        """Build a breaker tuned by ``BREATHE_HR_BREAKER_*`` environment variables"""
+        return cls(
+            failure_ratio=env_float("BREATHE_HR_BREAKER_FAILURE_RATIO", 0.5),
+            window=env_int("BREATHE_HR_BREAKER_WINDOW", 20),
+            min_calls=env_int("BREATHE_HR_BREAKER_MIN_CALLS", 10),
+            slow_call=env_float("BREATHE_HR_BREAKER_SLOW_CALL", 10.0),
+            reset_timeout=env_float("BREATHE_HR_BREAKER_RESET_TIMEOUT", 30.0),
+            enabled=env_bool("BREATHE_HR_BREAKER_ENABLED", True),
+        )
+
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return self.CLOSED
+        if self._clock() - self._opened_at < self.reset_timeout:
+            return self.OPEN
+        return self.HALF_OPEN
+
+    def before_call(self) -> None:
+        """Admit a call, or raise ``CircuitOpenError`` to fail fast"""
+        if not self.enabled:
+            return
+        state = self.state
+        if state == self.CLOSED:
+            return
+        if state == self.HALF_OPEN and not self._probing:
+            self._probing = True
+            return
+        self.rejected += 1
+        retry_in = max(1.0, self.reset_timeout - (self._clock() - self._opened_at))
+        raise CircuitOpenError(
+            f"Breathe HR API is failing or slow; requests are paused for {retry_in:.0f}s"
+        )
+
+    def record(self, ok: bool, duration: float) -> None:
+        """Record the outcome of an admitted call"""
+        if not self.enabled:
+            return
+        failed = not ok or duration >= self.slow_call
+        if self._opened_at is not None:
+            if self._probing:
+                self._probing = False
+                if failed:
+                    self._open()
+                else:
+                    self._opened_at = None
+                    self._outcomes.clear()
+            return
+        self._outcomes.append(failed)
+        if (
+            len(self._outcomes) >= self.min_calls
+            and sum(self._outcomes) / len(self._outcomes) >= self.failure_ratio
+        ):
+            self._open()
+
+    def release(self) -> None:
+        """Forget an admitted call that ended without an upstream outcome
+
+        Called when the call is cancelled or raises something other than an
+        HTTP error, so a half-open breaker admits another probe.
+        """
+        self._probing = False
+
+    def stats(self) -> Dict[str, Any]:
+        state = self.state
+        return {
+            "open": int(state == self.OPEN),
+            "half_open": int(state == self.HALF_OPEN),
+            "failure_ratio": sum(self._outcomes) / len(self._outcomes) if self._outcomes else 0.0,
+            "opened": self.opened,
+            "rejected": self.rejected,
+        }
+
+    def _open(self) -> None:
+        self._opened_at = self._clock()
+        self._outcomes.clear()
+        self.opened += 1
+
+
+class Hedger:
+    """Race a second copy of slow idempotent requests
+
+    The hedge delay for a key is the ``quantile`` of its last ``window``
+    latencies (at least ``min_delay``). Nothing is hedged until
+    ``min_samples`` latencies have been seen for the key.
+    """
+
+    def __init__(
+        self,
+        enabled: bool = False,
+        quantile: float = 0.95,
+        window: int = 100,
+        min_samples: int = 20,
+        min_delay: float = 0.05,
+    ):
+        self.enabled = enabled
+        self.quantile = quantile
+        self.window = window
+        self.min_samples = min_samples
+        self.min_delay = min_delay
+        self._latencies: Dict[Hashable, Deque[float]] = {}
+        self.hedged = 0
+        self.hedge_wins = 0
+
+    @classmethod
+    def from_env(cls) -> "Hedger":
+        """Build a hedger tuned by ``BREATHE_HR_HEDGE_*`` environment variables"""
+        return cls(
+            enabled=env_bool("BREATHE_HR_HEDGE_ENABLED", False),
+            quantile=env_float("BREATHE_HR_HEDGE_QUANTILE", 0.95),
+            min_delay=env_float("BREATHE_HR_HEDGE_MIN_DELAY", 0.05),
+        )
+
+    def observe(self, key: Hashable, seconds: float) -> None:
+        samples = self._latencies.get(key)
+        if samples is None:
+            samples = self._latencies[key] = deque(maxlen=self.window)
+        samples.append(seconds)
+
+    def delay(self, key: Hashable) -> Optional[float]:
+        """Seconds to wait before hedging, or ``None`` to not hedge"""
+        samples = self._latencies.get(key)
+        if not self.enabled or samples is None or len(samples) < self.min_samples:
+            return None
+        ordered = sorted(samples)
+        index = min(len(ordered) - 1, int(self.quantile * len(ordered)))
+        return max(self.min_delay, ordered[index])
+
+    async def run(
+        self,
+        key: Hashable,
+        send: Callable[[], Awaitable[T]],
+        before_hedge: Optional[Callable[[], Awaitable[Any]]] = None,
+    ) -> T:
+        """Await ``send()``, racing a second call if it outlasts the hedge delay
+
+        ``before_hedge`` is awaited before the second call is sent, e.g. to
+        take a token from the rate limiter. The first call to succeed wins
+        and the other is cancelled; an error is raised only if both fail.
+        """
+        started = time.perf_counter()
+        delay = self.delay(key)
+        first = asyncio.ensure_future(send())
+        tasks = {first}
+        try:
+            if delay is not None:
+                done, _ = await asyncio.wait(tasks, timeout=delay)
+                if not done and before_hedge is not None:
+                    await before_hedge()
+                if not first.done():
+                    self.hedged += 1
+                    tasks.add(asyncio.ensure_future(send()))
+            pending = set(tasks)
+            while True:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                winner = next((task for task in done if task.exception() is None), None)
+                if winner is None and pending:
+                    continue
+                if winner is None:
+                    # Both failed; raise the original call's error
+                    return first.result()
+                if winner is not first:
+                    self.hedge_wins += 1
+                self.observe(key, time.perf_counter() - started)
+                return winner.result()
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    def stats(self) -> Dict[str, int]:
+        return {"hedged": self.hedged, "hedge_wins": self.hedge_wins}
+
+
+class EndpointTimeouts:
+    """Per-endpoint timeout overrides, keyed by endpoint pattern
+
+    Configured as comma-separated ``pattern=read`` or
+    ``pattern=connect:read`` items, e.g.
+    ``absences=60,employees/{id}=2:10``.
+    """
+
+    def __init__(self, overrides: Optional[Dict[str, httpx.Timeout]] = None):
+        self.overrides = dict(overrides or {})
+
+    @classmethod
+    def parse(cls, spec: str, connect: float) -> "EndpointTimeouts":
+        """Parse an override spec; ``connect`` applies where none is given"""
+        overrides = {}
+        for item in filter(None, (part.strip() for part in spec.split(","))):
+            pattern, sep, value = item.partition("=")
+            if not sep or not pattern.strip():
+                raise ValueError(f"Invalid endpoint timeout {item!r}; expected pattern=seconds")
+            connect_value, _, read_value = value.rpartition(":")
+            try:
+                read = float(read_value)
+                connect_timeout = float(connect_value) if connect_value else connect
+            except ValueError:
+                raise ValueError(f"Invalid endpoint timeout {item!r}; expected pattern=seconds")
+            overrides[pattern.strip().strip("/")] = httpx.Timeout(read, connect=connect_timeout)
+        return cls(overrides)
+
+    @classmethod
+    def from_env(cls) -> "EndpointTimeouts":
+        """Read overrides from ``BREATHE_HR_ENDPOINT_TIMEOUTS``"""
+        return cls.parse(
+            os.getenv("BREATHE_HR_ENDPOINT_TIMEOUTS", ""),
+            connect=env_float("BREATHE_HR_CONNECT_TIMEOUT", 5.0),
+        )
+
+    def for_endpoint(self, pattern: str) -> Optional[httpx.Timeout]:
+        """The override for an endpoint pattern, or ``None`` for the client default"""
+        return self.overrides.get(pattern)
@@ -4,15 +4,40 @@ This module provides a Model Context Protocol (MCP) server for Breathe HR,
 enabling AI assistants to access employee data, absence records, and account information.
 """
 
+import asyncio
 import os
-from typing import Dict, List, Optional, Any
+import time
+from contextlib import asynccontextmanager
+from typing import TYPE_CHECKING, Dict, List, Optional, Set, Tuple, Any
 import httpx
-from fastapi import FastAPI, Request, Depends, HTTPException, status
-from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from fastapi.responses import RedirectResponse
 from fastmcp import FastMCP
+from fastmcp.server.middleware import Middleware, MiddlewareContext
 from dotenv import load_dotenv
 
+from .absences import AbsenceStore, overlapping
+from .auth import AuthMiddleware, KeyRing
+from .cache import ResponseCache, covers, endpoint_pattern, make_key
+from .client import create_http_client
+from .conditional import ValidatorCache
+from .directory import EmployeeDirectory
+from . import jsoncodec, occupancy
+from .leave import LeaveRequest, find_conflicts, parse_leave_request
+from .metrics import CONTENT_TYPE, Registry
+from .pagination import clamp_max_records, fetch_all, pagination_from_headers
+from .projection import shape_response
+from .ratelimit import RateLimiter, parse_retry_after
+from .refresher import BackgroundRefresher
+from .resilience import CircuitBreaker, CircuitOpenError, EndpointTimeouts, Hedger
+from .settings import env_bool, env_float, env_int
+from .singleflight import SingleFlight
+from .snapshot import SnapshotStore
+from .subscriptions import Subscriptions
+from .tracing import Tracer, current_span, params_shape
+
+if TYPE_CHECKING:
+    from .analytics import EmployeeColumns
+    from .shared import SharedCache, SharedDatasets, SharedLease
+
 # Load environment variables
 load_dotenv()
 
@@ -23,36 +48,511 @@ if use_sandbox:
     BREATHE_HR_BASE_URL = "https://api.sandbox.breathehr.info/v1"
 else:
     BREATHE_HR_BASE_URL = os.getenv("BREATHE_HR_BASE_URL", "https://api.breathehr.com/v1")
-MCP_API_KEY = os.getenv("MCP_API_KEY")
+PAGINATION_CONCURRENCY = env_int("BREATHE_HR_PAGINATION_CONCURRENCY", 4)
+MAX_RECORDS_LIMIT = env_int("BREATHE_HR_MAX_RECORDS", 10000)
+BATCH_CONCURRENCY = env_int("BREATHE_HR_BATCH_CONCURRENCY", 8)
+MAX_BATCH_SIZE = env_int("BREATHE_HR_MAX_BATCH_SIZE", 200)
+MAX_REPORT_DAYS = env_int("BREATHE_HR_MAX_REPORT_DAYS", 366)
+COMPACT_RESPONSES = env_bool("BREATHE_HR_COMPACT_RESPONSES", True)
+SHARED_STATE_PATH = os.getenv("BREATHE_HR_SHARED_STATE_PATH")
+# Workers behind one port can't share MCP sessions, so multi-worker mode
+# serves every HTTP request without session state by default
+STATELESS_HTTP = env_bool("BREATHE_HR_STATELESS_HTTP", bool(SHARED_STATE_PATH))
+# Longest a worker keeps a shared response in its own cache, bounding how
+# long it can miss another worker's invalidation
+SHARED_LOCAL_TTL = env_float("BREATHE_HR_SHARED_LOCAL_TTL", 5.0)
+DIRECTORY_REFRESH_INTERVAL = env_float("BREATHE_HR_DIRECTORY_REFRESH", 900.0)
+ABSENCE_SYNC_INTERVAL = env_float("BREATHE_HR_ABSENCE_SYNC", 300.0)
+METRICS_ENABLED = env_bool("BREATHE_HR_METRICS_ENABLED", True)
+
+# Responses persisted by the snapshot store, besides the employee directory
+SNAPSHOT_ENDPOINTS = ("account", "departments")
+# Endpoints served from memory by ``reference_data`` and refreshed in the
+# background once they are older than their cache TTL
+REFERENCE_ENDPOINTS = ("account", "departments")
+# How long a restored snapshot older than its cache TTL is served while it
+# is revalidated
+SNAPSHOT_STALE_TTL = 60.0
+# MCP resources mirroring the reference endpoints and employee directory
+EMPLOYEES_URI = "breathe://employees"
+REFERENCE_URIS = {"account": "breathe://account", "departments": "breathe://departments"}
 
 # Security
-security = HTTPBearer(auto_error=False)
+# Hashed MCP API keys and per-key quotas; empty when auth is off
+api_keys = KeyRing.from_env()
+
+# Cache for read-only upstream responses
+response_cache = ResponseCache.from_env()
+
+# Second-level cache shared by worker processes (multi-worker mode only)
+shared_cache: "Optional[SharedCache]" = None
+
+# Elects the one worker that runs the background sync, and holds the
+# datasets it publishes for the others (multi-worker mode only)
+refresher_lease: "Optional[SharedLease]" = None
+shared_datasets: "Optional[SharedDatasets]" = None
+
+# Validators and bodies for conditional GETs
+upstream_validators = ValidatorCache.from_env()
+
+# Coalesces concurrent identical GETs into a single upstream call
+upstream_flight = SingleFlight()
+
+# Paces upstream calls and retries requests rejected with 429
+upstream_limiter = RateLimiter.from_env()
+
+# Fails fast while the upstream is erroring or slow
+upstream_breaker = CircuitBreaker.from_env()
+
+# Races a second copy of GETs slower than their recent p95 (off by default)
+upstream_hedger = Hedger.from_env()
+
+# Per-endpoint connect/read timeout overrides
+upstream_timeouts = EndpointTimeouts.from_env()
+
+# Optional on-disk snapshots that keep restarts warm
+snapshot_store = SnapshotStore.from_env()
+
+# Local employee index used by search_employees and get_employee
+employee_directory = EmployeeDirectory(
+    max_age=env_float("BREATHE_HR_DIRECTORY_MAX_AGE", 2 * DIRECTORY_REFRESH_INTERVAL),
+    max_stale=snapshot_store.max_stale if snapshot_store else 0.0,
+)
+
+# Local absence index used by the absence tools and reports
+absence_store = AbsenceStore(
+    past_days=env_int("BREATHE_HR_ABSENCE_WINDOW_PAST", 366),
+    future_days=env_int("BREATHE_HR_ABSENCE_WINDOW_FUTURE", 365),
+    max_age=env_float("BREATHE_HR_ABSENCE_MAX_AGE", 2 * ABSENCE_SYNC_INTERVAL),
+    overlap_days=env_int("BREATHE_HR_ABSENCE_OVERLAP_DAYS", 31),
+)
+
+# Hot reference data served from memory and refreshed in the background
+reference_data = BackgroundRefresher.from_env()
+
+# Sessions subscribed to resource update notifications
+resource_subscriptions = Subscriptions()
+
+# Spans for tool calls and upstream requests, and the slow-call log
+tracer = Tracer.from_env()
 
-async def authenticate_request(request):
-    """Authenticate requests if MCP API key is configured"""
-    if not MCP_API_KEY:
+# Shared upstream client, reused across tool calls
+_http_client: Optional[httpx.AsyncClient] = None
+
+# Metrics served at /metrics
+metrics = Registry()
+tool_latency = metrics.histogram(
+    "breathe_hr_tool_duration_seconds", "MCP tool call latency", ["tool", "status"]
+)
+tools_in_flight = metrics.gauge(
+    "breathe_hr_tools_in_flight", "MCP tool calls currently running", ["tool"]
+)
+upstream_latency = metrics.histogram(
+    "breathe_hr_upstream_duration_seconds",
+    "Breathe HR API request latency, per attempt",
+    ["endpoint", "method", "status"],
+)
+upstream_in_flight = metrics.gauge(
+    "breathe_hr_upstream_in_flight", "Breathe HR API requests currently in flight"
+)
+upstream_errors = metrics.counter(
+    "breathe_hr_upstream_errors_total",
+    "Breathe HR API requests that ended in an error, by reason",
+    ["endpoint", "reason"],
+)
+cache_gauge = metrics.gauge(
+    "breathe_hr_cache", "Response cache statistics", ["stat"]
+)
+shared_cache_gauge = metrics.gauge(
+    "breathe_hr_shared_cache", "Cross-worker response cache statistics", ["stat"]
+)
+singleflight_gauge = metrics.gauge(
+    "breathe_hr_singleflight", "Upstream request coalescing statistics", ["stat"]
+)
+rate_limit_gauge = metrics.gauge(
+    "breathe_hr_rate_limiter", "Upstream rate limiter statistics", ["stat"]
+)
+pool_gauge = metrics.gauge(
+    "breathe_hr_upstream_connections", "Pooled upstream connections by state", ["state"]
+)
+conditional_requests = metrics.counter(
+    "breathe_hr_conditional_requests_total",
+    "GETs sent with If-None-Match/If-Modified-Since",
+    ["endpoint"],
+)
+not_modified_responses = metrics.counter(
+    "breathe_hr_not_modified_total",
+    "Conditional GETs answered 304 Not Modified",
+    ["endpoint"],
+)
+not_modified_bytes = metrics.counter(
+    "breathe_hr_not_modified_bytes_total",
+    "Response bytes not downloaded thanks to 304 Not Modified",
+    ["endpoint"],
+)
+breaker_gauge = metrics.gauge(
+    "breathe_hr_circuit_breaker", "Upstream circuit breaker state and counters", ["stat"]
+)
+hedge_gauge = metrics.gauge("breathe_hr_hedged_requests", "Hedged upstream GETs", ["stat"])
+stale_responses = metrics.counter(
+    "breathe_hr_stale_responses_total",
+    "Stale bodies served while the circuit breaker was open",
+    ["endpoint"],
+)
+reference_age = metrics.gauge(
+    "breathe_hr_reference_age_seconds",
+    "Seconds since each reference dataset was last refreshed",
+    ["dataset"],
+)
+reference_failures = metrics.gauge(
+    "breathe_hr_reference_refresh_failures",
+    "Consecutive failed refreshes of each reference dataset",
+    ["dataset"],
+)
+client_gauge = metrics.gauge(
+    "breathe_hr_client_requests", "Requests per MCP API key", ["client", "stat"]
+)
+unauthorized_gauge = metrics.gauge(
+    "breathe_hr_unauthorized_requests", "Requests rejected for a missing or unknown API key"
+)
+conditional_gauge = metrics.gauge(
+    "breathe_hr_conditional", "Conditional request statistics", ["stat"]
+)
+absence_store_gauge = metrics.gauge(
+    "breathe_hr_absence_store", "Local absence store statistics", ["stat"]
+)
+subscription_gauge = metrics.gauge(
+    "breathe_hr_resource_subscriptions", "Resource subscription statistics", ["stat"]
+)
+
+def _set_stats(gauge, stats: Dict[str, Any]):
+    for name, value in stats.items():
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            gauge.set(value, stat=name)
+
+def _connection_pool_stats() -> Dict[str, int]:
+    """Count the shared client's pooled connections by state
+    
+    httpx does not expose its pool publicly, so this reads the default
+    transport's httpcore pool and reports nothing if that is unavailable.
+    """
+    pool = getattr(getattr(_http_client, "_transport", None), "_pool", None)
+    connections = list(getattr(pool, "connections", None) or [])
+    counts = {"active": 0, "idle": 0}
+    for connection in connections:
+        counts["idle" if connection.is_idle() else "active"] += 1
+    return counts
+
+def collect_metrics():
+    """Refresh gauges that mirror component statistics at scrape time"""
+    _set_stats(cache_gauge, response_cache.stats())
+    if shared_cache is not None:
+        _set_stats(shared_cache_gauge, shared_cache.stats())
+    _set_stats(singleflight_gauge, upstream_flight.stats())
+    _set_stats(rate_limit_gauge, upstream_limiter.stats())
+    _set_stats(conditional_gauge, upstream_validators.stats())
+    _set_stats(breaker_gauge, upstream_breaker.stats())
+    _set_stats(hedge_gauge, upstream_hedger.stats())
+    _set_stats(absence_store_gauge, absence_store.stats())
+    _set_stats(subscription_gauge, resource_subscriptions.stats())
+    for client, counts in api_keys.stats().items():
+        for stat, value in counts.items():
+            client_gauge.set(value, client=client, stat=stat)
+    unauthorized_gauge.set(api_keys.unauthorized)
+    for state, count in _connection_pool_stats().items():
+        pool_gauge.set(count, state=state)
+    for name, freshness in reference_data.stats().items():
+        if freshness["age"] is not None:
+            reference_age.set(freshness["age"], dataset=name)
+        reference_failures.set(freshness["failures"], dataset=name)
+
+metrics.add_collector(collect_metrics)
+
+class ToolMetricsMiddleware(Middleware):
+    """Record latency and in-flight counts for every MCP tool call"""
+    
+    async def on_call_tool(self, context: MiddlewareContext, call_next):
+        tool = context.message.name
+        status = "error"
+        tools_in_flight.inc(tool=tool)
+        started = time.perf_counter()
+        try:
+            result = await call_next(context)
+            status = "ok"
+            return result
+        finally:
+            tools_in_flight.dec(tool=tool)
+            tool_latency.observe(time.perf_counter() - started, tool=tool, status=status)
+
+class TracingMiddleware(Middleware):
+    """Record a span for every MCP tool call"""
+    
+    async def on_call_tool(self, context: MiddlewareContext, call_next):
+        if not tracer.enabled:
+            return await call_next(context)
+        with tracer.span("tool", tool=context.message.name):
+            return await call_next(context)
+
+def get_http_client() -> httpx.AsyncClient:
+    """Return the shared Breathe HR client, creating it on first use"""
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = create_http_client(event_hooks=tracer.event_hooks())
+    return _http_client
+
+async def close_http_client():
+    """Close the shared Breathe HR client and release its connections"""
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
+def open_shared_state():
+    """Open the state shared with other workers, if ``SHARED_STATE_PATH`` is set
+    
+    Called from the lifespan rather than at import, so a single-process
+    server never loads the shared-state module.
+    """
+    global shared_cache, refresher_lease, shared_datasets
+    if not SHARED_STATE_PATH or shared_cache is not None:
         return
+    from .shared import SharedCache, SharedDatasets, SharedLease, SharedRateBudget
     
-    auth_header = request.headers.get("Authorization")
-    if not auth_header or not auth_header.startswith("Bearer "):
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Missing or invalid authorization header",
-            headers={"WWW-Authenticate": "Bearer"},
+    shared_cache = SharedCache.from_env()
+    refresher_lease = SharedLease.from_env()
+    shared_datasets = SharedDatasets.from_env()
+    upstream_limiter.budget = SharedRateBudget.from_env()
+
+def close_shared_state():
+    """Close everything ``open_shared_state`` opened"""
+    global shared_cache, refresher_lease, shared_datasets
+    for store in (shared_cache, upstream_limiter.budget, refresher_lease, shared_datasets):
+        if store is not None:
+            store.close()
+    shared_cache = refresher_lease = shared_datasets = None
+    upstream_limiter.budget = None
+
+def is_refresher() -> bool:
+    """Whether this worker fetches the background datasets upstream
+    
+    Always true with a single worker. With several, only the holder of
+    ``refresher_lease`` does; the others load what it publishes.
+    """
+    return refresher_lease is None or refresher_lease.held
+
+async def hold_refresher_lease():
+    """Renew ``refresher_lease`` every third of its TTL, taking it over if its holder stops"""
+    while True:
+        await asyncio.sleep(refresher_lease.ttl / 3)
+        await asyncio.to_thread(refresher_lease.renew)
+
+async def publish_dataset(name: str, value: Any):
+    """Share a freshly synced dataset with the other workers"""
+    if shared_datasets is not None:
+        await asyncio.to_thread(shared_datasets.publish, name, value)
+
+async def published_dataset(name: str) -> Optional[Tuple[Any, float]]:
+    """The refreshing worker's latest ``(value, age)`` for a dataset, if any"""
+    if shared_datasets is None:
+        return None
+    return await asyncio.to_thread(shared_datasets.fetch, name)
+
+async def sync_employee_directory() -> int:
+    """Reload ``employee_directory`` from the API and snapshot it
+    
+    Run by ``reference_data`` every ``DIRECTORY_REFRESH_INTERVAL`` seconds.
+    A failed sync leaves the previous index in place; once it goes stale the
+    tools fall back to the upstream API. Subscribers are notified of the
+    employees that changed since the previous load. Workers other than the
+    refresher load the directory it published instead.
+    """
+    loaded = employee_directory.synced_at is not None
+    if is_refresher():
+        count = await employee_directory.sync(breathe_hr_request, concurrency=PAGINATION_CONCURRENCY)
+        records = employee_directory.records()
+        await save_snapshot("employees", records)
+        await publish_dataset("employees", records)
+    else:
+        published = await published_dataset("employees")
+        if published is None:
+            raise RuntimeError("The employee directory has not been published by the refreshing worker yet")
+        employee_directory.load(*published)
+        count = len(employee_directory)
+    if loaded and employee_directory.changed:
+        changed = sorted(employee_directory.changed)
+        await resource_subscriptions.notify(
+            [EMPLOYEES_URI, *(employee_uri(employee_id) for employee_id in changed)]
         )
+    return count
+
+async def sync_absence_store() -> int:
+    """Bring ``absence_store`` up to date with the API
+    
+    Run by ``reference_data`` every ``ABSENCE_SYNC_INTERVAL`` seconds. The
+    first run loads the whole window; later runs only re-fetch the ranges
+    most likely to have changed. Workers other than the refresher load the
+    store it published instead.
+    """
+    if is_refresher():
+        count = await absence_store.sync(breathe_hr_request, concurrency=PAGINATION_CONCURRENCY)
+        start, end = absence_store.window
+        await publish_dataset(
+            "absences",
+            {"window": [start.isoformat(), end.isoformat()], "absences": absence_store.records()},
+        )
+        return count
+    published = await published_dataset("absences")
+    if published is None:
+        raise RuntimeError("The absence store has not been published by the refreshing worker yet")
+    value, age = published
+    window = tuple(occupancy.parse_date(day) for day in value["window"])
+    absence_store.load(value["absences"], window, age)
+    return len(absence_store)
+
+async def refresh_reference(endpoint: str) -> Any:
+    """Fetch a reference endpoint upstream for ``reference_data``
+    
+    Skips the local cache, whose entry may be a restored snapshot, but still
+    revalidates conditionally and shares in-flight requests. Workers other
+    than the refresher use the value it published, once there is one.
+    """
+    if not BREATHE_HR_API_KEY:
+        raise RuntimeError("BREATHE_HR_API_KEY environment variable is required")
+    if not is_refresher():
+        published = await published_dataset(endpoint)
+        if published is not None:
+            return published[0]
+    value = await upstream_flight.do(
+        make_key(endpoint), lambda: _fetch_and_cache(endpoint, None)
+    )
+    if is_refresher():
+        await publish_dataset(endpoint, value)
+    return value
+
+async def get_reference(endpoint: str) -> Any:
+    """Read a reference endpoint from memory, falling back to a normal request"""
+    if endpoint in reference_data:
+        return await reference_data.get(endpoint)
+    return await breathe_hr_request(endpoint)
+
+def employee_uri(employee_id: int) -> str:
+    return f"{EMPLOYEES_URI}/{employee_id}"
+
+async def notify_reference_changed(endpoint: str):
+    """Tell subscribers that a reference endpoint's resource changed"""
+    if endpoint in REFERENCE_URIS:
+        await resource_subscriptions.notify([REFERENCE_URIS[endpoint]])
+
+def register_reference_data(refresher: BackgroundRefresher):
+    """Register the reference endpoints, employee directory and absence store with ``refresher``"""
+    for endpoint in REFERENCE_ENDPOINTS:
+        soft_ttl = response_cache.ttl_for(endpoint)
+        if soft_ttl > 0:
+            refresher.register(
+                endpoint,
+                lambda endpoint=endpoint: refresh_reference(endpoint),
+                soft_ttl,
+                on_change=lambda value, endpoint=endpoint: notify_reference_changed(endpoint),
+            )
+    if DIRECTORY_REFRESH_INTERVAL > 0:
+        refresher.register("employees", sync_employee_directory, DIRECTORY_REFRESH_INTERVAL)
+    if ABSENCE_SYNC_INTERVAL > 0:
+        refresher.register("absences", sync_absence_store, ABSENCE_SYNC_INTERVAL)
+
+register_reference_data(reference_data)
+
+async def save_snapshot(key: str, value: Any, headers: Optional[httpx.Headers] = None):
+    """Persist a response to ``snapshot_store`` without blocking the event loop"""
+    if snapshot_store is None:
+        return
+    headers = headers or {}
+    await asyncio.to_thread(
+        snapshot_store.save,
+        key,
+        value,
+        etag=headers.get("ETag"),
+        last_modified=headers.get("Last-Modified"),
+    )
+
+def restore_snapshots() -> List[str]:
+    """Warm the directory and response cache from ``snapshot_store``
+    
+    Restored cache entries keep their remaining TTL, or get
+    ``SNAPSHOT_STALE_TTL`` if already expired so they can be served while
+    they are revalidated.
     
-    token = auth_header.split(" ")[1]
-    if token != MCP_API_KEY:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid API key",
-            headers={"WWW-Authenticate": "Bearer"},
+    Returns:
+        The snapshot keys that were restored
+    """
+    if snapshot_store is None:
+        return []
+    restored = []
+    snapshot = snapshot_store.load("employees")
+    if snapshot is not None and isinstance(snapshot.value, list):
+        employee_directory.restore(snapshot.value, snapshot.age())
+        if "employees" in reference_data:
+            reference_data.restore("employees", len(snapshot.value), snapshot.age())
+        restored.append("employees")
+    for endpoint in SNAPSHOT_ENDPOINTS:
+        snapshot = snapshot_store.load(endpoint)
+        if snapshot is None:
+            continue
+        remaining = response_cache.ttl_for(endpoint) - snapshot.age()
+        response_cache.set(endpoint, None, snapshot.value, ttl=max(remaining, SNAPSHOT_STALE_TTL))
+        # Lets the revalidation be a conditional GET
+        validators = {"ETag": snapshot.etag, "Last-Modified": snapshot.last_modified}
+        upstream_validators.store(
+            make_key(endpoint), {k: v for k, v in validators.items() if v}, snapshot.value
         )
+        if endpoint in reference_data:
+            reference_data.restore(endpoint, snapshot.value, snapshot.age())
+        restored.append(endpoint)
+    return restored
+
+@asynccontextmanager
+async def lifespan(server: FastMCP):
+    """Open the shared upstream client and any shared state for the lifetime of the server
+    
+    When an API key is configured, ``reference_data`` loads the reference
+    endpoints, employee directory and absence store in the background and
+    keeps them fresh. Snapshots restored from disk are served straight away and
+    revalidated on its first pass. With several workers, only the holder of
+    ``refresher_lease`` fetches them upstream.
+    """
+    open_shared_state()
+    get_http_client()
+    tasks = []
+    restore_snapshots()
+    if BREATHE_HR_API_KEY:
+        if refresher_lease is not None:
+            await asyncio.to_thread(refresher_lease.renew)
+            tasks.append(asyncio.create_task(hold_refresher_lease()))
+        tasks.append(asyncio.create_task(reference_data.run()))
+    try:
+        yield {}
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await close_http_client()
+        if refresher_lease is not None:
+            await asyncio.to_thread(refresher_lease.release)
+        if snapshot_store is not None:
+            snapshot_store.close()
+        close_shared_state()
 
 # Initialize MCP server
 mcp = FastMCP(
     name="Breathe HR MCP",
+    lifespan=lifespan,
+    tool_serializer=jsoncodec.dumps,
 )
+if METRICS_ENABLED:
+    mcp.add_middleware(ToolMetricsMiddleware())
+# Installed even while tracing is off, so the tracer can be swapped or
+# enabled later without rebuilding the server
+mcp.add_middleware(TracingMiddleware())
+resource_subscriptions.install(mcp)
 
 async def breathe_hr_request(
     endpoint: str,
@@ -60,49 +560,295 @@ async def breathe_hr_request(
     params: Optional[Dict[str, Any]] = None,
     json_data: Optional[Dict[str, Any]] = None
 ) -> Dict[str, Any]:
-    """Make authenticated requests to Breathe HR API"""
+    """Make authenticated requests to Breathe HR API
+    
+    GET requests to read-only endpoints are served from ``response_cache``
+    while the cached entry is fresh, and concurrent identical GETs share a
+    single upstream call through ``upstream_flight``. GETs whose earlier
+    response carried an ``ETag`` or ``Last-Modified`` are sent conditionally,
+    and a ``304`` reuses the previously decoded body.
+    """
     if not BREATHE_HR_API_KEY:
         raise RuntimeError("BREATHE_HR_API_KEY environment variable is required")
     
+    cacheable = method == "GET" and response_cache.is_cacheable(endpoint)
+    if cacheable:
+        cached = response_cache.get(endpoint, params)
+        if cached is not None:
+            return cached
+    
+    if method != "GET":
+        return await _send_request(endpoint, method, params, json_data)
+    
+    return await upstream_flight.do(
+        make_key(endpoint, params), lambda: _fetch_and_cache(endpoint, params)
+    )
+
+async def _fetch_and_cache(endpoint: str, params: Optional[Dict[str, Any]]) -> Any:
+    """GET an endpoint upstream and store the result in the cache and snapshots
+    
+    In multi-worker mode the shared cache is consulted first, so a response
+    fetched by any worker is reused by the others.
+    """
+    generation = response_cache.generation
+    ttl = response_cache.ttl_for(endpoint)
+    local_ttl = None
+    if shared_cache is not None and ttl > 0:
+        local_ttl = min(ttl, SHARED_LOCAL_TTL)
+        hit = await asyncio.to_thread(shared_cache.get, endpoint, params)
+        if hit is not None:
+            data, remaining = hit
+            response_cache.set(
+                endpoint, params, data, generation=generation, ttl=min(remaining, local_ttl)
+            )
+            return data
+    
+    key = make_key(endpoint, params)
+    conditional_headers = upstream_validators.headers_for(key)
+    if conditional_headers:
+        conditional_requests.inc(endpoint=endpoint_pattern(endpoint))
+    with _upstream_span(endpoint, "GET", params, conditional=bool(conditional_headers)):
+        try:
+            response = await _upstream_response(endpoint, "GET", params, None, conditional_headers)
+        except CircuitOpenError:
+            # Serve the last known body rather than failing while the API is down
+            stale = upstream_validators.peek(key)
+            if stale is None:
+                raise
+            stale_responses.inc(endpoint=endpoint_pattern(endpoint))
+            return stale.body
+        
+        validated = upstream_validators.revalidated(key) if response.status_code == 304 else None
+        if validated is not None:
+            not_modified_responses.inc(endpoint=endpoint_pattern(endpoint))
+            not_modified_bytes.inc(validated.size, endpoint=endpoint_pattern(endpoint))
+            data = validated.body
+        else:
+            if response.status_code == 304:
+                # The stored body was evicted while the request was in flight
+                response = await _upstream_response(endpoint, "GET", params, None)
+            data = _decode_response(endpoint, response, params)
+            upstream_validators.store(key, response.headers, data, size=len(response.content))
+    
+    response_cache.set(endpoint, params, data, generation=generation, ttl=local_ttl)
+    if local_ttl is not None and generation == response_cache.generation:
+        await asyncio.to_thread(shared_cache.set, endpoint, params, data, ttl)
+    if not params and endpoint in SNAPSHOT_ENDPOINTS:
+        await save_snapshot(endpoint, data, response.headers)
+    return data
+
+async def invalidate_cached(endpoint: str):
+    """Drop cached responses for an endpoint after a write
+    
+    In-flight GETs for the endpoint are detached as well, so later callers
+    fetch fresh data instead of joining a request sent before the write. In
+    multi-worker mode the shared cache is invalidated too; other workers
+    hold shared responses for at most ``SHARED_LOCAL_TTL`` seconds.
+    """
+    response_cache.invalidate(endpoint)
+    if shared_cache is not None:
+        await asyncio.to_thread(shared_cache.invalidate, endpoint)
+    upstream_flight.detach(lambda key: covers(endpoint, key[0]))
+
+async def _send_request(
+    endpoint: str,
+    method: str,
+    params: Optional[Dict[str, Any]],
+    json_data: Optional[Dict[str, Any]]
+) -> Any:
+    """Send a request upstream and decode the JSON response"""
+    with _upstream_span(endpoint, method, params):
+        response = await _upstream_response(endpoint, method, params, json_data)
+        return _decode_response(endpoint, response, params)
+
+def _upstream_span(endpoint: str, method: str, params: Optional[Dict[str, Any]], **attributes: Any):
+    """Span covering one upstream call, from the rate limiter to the decoded body"""
+    return tracer.span(
+        "upstream",
+        endpoint=endpoint_pattern(endpoint),
+        method=method,
+        params=params_shape(params),
+        **attributes,
+    )
+
+async def _upstream_response(
+    endpoint: str,
+    method: str,
+    params: Optional[Dict[str, Any]],
+    json_data: Optional[Dict[str, Any]],
+    extra_headers: Optional[Dict[str, str]] = None
+) -> httpx.Response:
+    """Send a request upstream, raising for error responses
+    
+    Every attempt waits on ``upstream_limiter`` first; 429 responses are
+    retried with jittered exponential backoff that honors ``Retry-After``.
+    A ``304 Not Modified`` is returned to the caller, which must have sent
+    conditional headers in ``extra_headers``.
+    
+    Attempts are refused with ``CircuitOpenError`` while ``upstream_breaker``
+    is open, and GETs may be hedged by ``upstream_hedger``. Time spent queued
+    on the limiter and backing off is added to the current span's phases;
+    each request sent, hedged duplicates included, gets a child ``attempt``
+    span with its own connection phases.
+    """
     url = f"{BREATHE_HR_BASE_URL.rstrip('/')}/{endpoint.lstrip('/')}"
     headers = {
         "X-API-KEY": f"{BREATHE_HR_API_KEY}",
         "Content-Type": "application/json",
-        "Accept": "application/json"
+        "Accept": "application/json",
+        **(extra_headers or {}),
     }
     
-    async with httpx.AsyncClient() as client:
-        response = await client.request(
+    client = get_http_client()
+    pattern = endpoint_pattern(endpoint)
+    timeout = upstream_timeouts.for_endpoint(pattern) or httpx.USE_CLIENT_DEFAULT
+    
+    sends = 0
+    
+    async def send() -> httpx.Response:
+        # Each request on the wire, including a hedged duplicate, gets its
+        # own span so their connection phases are not summed together
+        nonlocal sends
+        sends += 1
+        with tracer.span("attempt", number=sends) as attempt_span:
+            response = await client.request(
+                method=method,
+                url=url,
+                headers=headers,
+                params=params,
+                json=json_data,
+                timeout=timeout,
+            )
+            if attempt_span is not None:
+                attempt_span.set(status_code=response.status_code)
+            return response
+    
+    span = current_span()
+    for attempt in range(upstream_limiter.max_retries + 1):
+        queued = time.perf_counter()
+        await upstream_limiter.acquire()
+        if span is not None:
+            span.add_phase("queue", time.perf_counter() - queued)
+            span.set(attempts=attempt + 1)
+        upstream_breaker.before_call()
+        upstream_in_flight.inc()
+        started = time.perf_counter()
+        try:
+            if method == "GET" and upstream_breaker.state == CircuitBreaker.CLOSED:
+                response = await upstream_hedger.run(pattern, send, upstream_limiter.acquire)
+            else:
+                response = await send()
+        except httpx.HTTPError as exc:
+            elapsed = time.perf_counter() - started
+            upstream_breaker.record(False, elapsed)
+            upstream_latency.observe(elapsed, endpoint=pattern, method=method, status="error")
+            upstream_errors.inc(endpoint=pattern, reason=type(exc).__name__)
+            raise
+        except BaseException:
+            # Cancelled, or failed in a way that says nothing about the
+            # upstream; a half-open probe must not stay claimed forever
+            upstream_breaker.release()
+            raise
+        finally:
+            upstream_in_flight.dec()
+        elapsed = time.perf_counter() - started
+        if span is not None:
+            span.set(status_code=response.status_code)
+        upstream_breaker.record(response.status_code < 500, elapsed)
+        upstream_latency.observe(
+            elapsed,
+            endpoint=pattern,
             method=method,
-            url=url,
-            headers=headers,
-            params=params,
-            json=json_data,
-            timeout=30.0
+            status=response.status_code,
         )
+        if response.status_code != 429:
+            await upstream_limiter.on_success()
+            break
         
-        if response.status_code == 401:
-            raise RuntimeError("Authentication failed. Please check your Breathe HR API key.")
-        elif response.status_code == 403:
-            raise RuntimeError("Access forbidden. Please check your API permissions.")
-        elif response.status_code == 404:
-            raise RuntimeError(f"Resource not found: {endpoint}")
-        elif response.status_code == 429:
-            raise RuntimeError("Rate limit exceeded. Please try again later.")
-        elif not response.is_success:
-            error_message = "Unknown error"
-            try:
-                error_data = response.json()
-                error_message = error_data.get("message", error_data.get("error", str(error_data)))
-            except:
-                error_message = response.text or f"HTTP {response.status_code}"
-            
-            raise RuntimeError(f"Breathe HR API request failed: {response.status_code} - {error_message}")
-        
+        retry_after = parse_retry_after(response.headers.get("Retry-After"))
+        await upstream_limiter.on_rate_limited(retry_after)
+        if not upstream_limiter.can_wait(retry_after):
+            # Sleeping that long would hold up this call and every other one
+            break
+        if attempt < upstream_limiter.max_retries:
+            backoff = time.perf_counter()
+            await upstream_limiter.wait_before_retry(attempt, retry_after)
+            if span is not None:
+                span.add_phase("backoff", time.perf_counter() - backoff)
+    
+    if response.status_code >= 400:
+        upstream_errors.inc(endpoint=pattern, reason=response.status_code)
+    
+    if response.status_code == 304 and extra_headers:
+        return response
+    elif response.status_code == 401:
+        raise RuntimeError("Authentication failed. Please check your Breathe HR API key.")
+    elif response.status_code == 403:
+        raise RuntimeError("Access forbidden. Please check your API permissions.")
+    elif response.status_code == 404:
+        raise RuntimeError(f"Resource not found: {endpoint}")
+    elif response.status_code == 429:
+        if not upstream_limiter.can_wait(retry_after):
+            raise RuntimeError(
+                f"Rate limit exceeded. The Breathe HR API asked to wait {retry_after:.0f} seconds; "
+                "please try again later."
+            )
+        raise RuntimeError("Rate limit exceeded. Please try again later.")
+    elif not response.is_success:
+        error_message = None
         try:
-            return response.json()
+            error_data = jsoncodec.loads(response.content)
+            error_message = error_data.get("message", error_data.get("error"))
         except:
-            raise RuntimeError(f"Invalid JSON response from Breathe HR API: {response.text}")
+            pass
+        if error_message:
+            error_message = str(error_message)[:jsoncodec.ERROR_BODY_LIMIT]
+        else:
+            # Quote a bounded excerpt rather than copying a large body
+            error_message = jsoncodec.excerpt(response.content) or f"HTTP {response.status_code}"
+        
+        raise RuntimeError(f"Breathe HR API request failed: {response.status_code} - {error_message}")
+    return response
+
+def _decode_response(
+    endpoint: str,
+    response: httpx.Response,
+    params: Optional[Dict[str, Any]]
+) -> Any:
+    """Decode a successful upstream response, folding in pagination headers"""
+    started = time.perf_counter()
+    try:
+        data = jsoncodec.loads(response.content)
+    except (TypeError, ValueError):
+        upstream_errors.inc(endpoint=endpoint_pattern(endpoint), reason="invalid_json")
+        raise RuntimeError(
+            f"Invalid JSON response from Breathe HR API: {jsoncodec.excerpt(response.content)}"
+        )
+    span = current_span()
+    if span is not None:
+        span.add_phase("decode", time.perf_counter() - started)
+        span.set(response_bytes=len(response.content))
+    
+    # List endpoints report totals in headers; surface them with the body
+    if isinstance(data, dict) and "pagination" not in data:
+        pagination = pagination_from_headers(response.headers, params)
+        if pagination:
+            data["pagination"] = pagination
+    return data
+
+def _shape(
+    body: Any,
+    collection_key: Optional[str],
+    fields: Optional[List[str]],
+    compact: Optional[bool]
+) -> Any:
+    """Apply a tool's ``fields``/``compact`` options to an upstream response"""
+    return shape_response(
+        body,
+        collection_key,
+        fields=fields,
+        compact_profile=COMPACT_RESPONSES if compact is None else compact,
+    )
 
 # MCP Tools
 
@@ -111,7 +857,9 @@ async def list_employees(
     page: int = 1,
     per_page: int = 50,
     department: Optional[str] = None,
-    status: Optional[str] = None
+    status: Optional[str] = None,
+    fields: Optional[List[str]] = None,
+    compact: Optional[bool] = None
 ) -> Dict[str, Any]:
     """
     Get a list of employees from Breathe HR
@@ -121,6 +869,9 @@ async def list_employees(
         per_page: Number of employees per page (default: 50, max: 100)
         department: Filter by department name
         status: Filter by employment status (active, inactive, etc.)
+        fields: Only return these fields for each record (dotted paths such
+            as "department.name" are allowed; "id" is always included)
+        compact: Drop null and empty values (default: server setting, on)
     
     Returns:
         Dict containing employees list and pagination info
@@ -135,26 +886,119 @@ async def list_employees(
     if status:
         params["status"] = status
     
-    return await breathe_hr_request("employees", params=params)
+    result = await breathe_hr_request("employees", params=params)
+    return _shape(result, "employees", fields, compact)
 
 @mcp.tool
-async def get_employee(employee_id: int) -> Dict[str, Any]:
+async def list_all_employees(
+    department: Optional[str] = None,
+    status: Optional[str] = None,
+    max_records: int = 5000
+) -> Dict[str, Any]:
+    """
+    Get every employee from Breathe HR in one call, fetching all pages server-side
+    
+    Args:
+        department: Filter by department name
+        status: Filter by employment status (active, inactive, etc.)
+        max_records: Maximum number of employees to return (default: 5000,
+            capped by the server's BREATHE_HR_MAX_RECORDS limit)
+    
+    Returns:
+        Dict containing the employees list, count, and whether it was truncated
+    """
+    params = {}
+    
+    if department:
+        params["department"] = department
+    if status:
+        params["status"] = status
+    
+    return await fetch_all(
+        breathe_hr_request,
+        "employees",
+        "employees",
+        params=params,
+        concurrency=PAGINATION_CONCURRENCY,
+        max_records=clamp_max_records(max_records, MAX_RECORDS_LIMIT),
+    )
+
+async def _fetch_employee(employee_id: int) -> Dict[str, Any]:
+    """Look up one employee, preferring the local directory index"""
+    if employee_directory.is_fresh():
+        record = employee_directory.get(employee_id)
+        if record is not None:
+            return record
+    
+    result = await breathe_hr_request(f"employees/{employee_id}")
+    if isinstance(result, dict) and result.get("id") is not None:
+        employee_directory.upsert(result)
+    return result
+
+@mcp.tool
+async def get_employee(
+    employee_id: int,
+    fields: Optional[List[str]] = None,
+    compact: Optional[bool] = None
+) -> Dict[str, Any]:
     """
     Get detailed information for a specific employee
     
     Args:
         employee_id: The unique ID of the employee
+        fields: Only return these fields for each record (dotted paths such
+            as "department.name" are allowed; "id" is always included)
+        compact: Drop null and empty values (default: server setting, on)
     
     Returns:
         Dict containing detailed employee information
     """
-    return await breathe_hr_request(f"employees/{employee_id}")
+    result = await _fetch_employee(employee_id)
+    return _shape(result, "employees", fields, compact)
+
+@mcp.tool
+async def get_employees(employee_ids: List[int]) -> Dict[str, Any]:
+    """
+    Get detailed information for several employees in one call
+    
+    Args:
+        employee_ids: IDs of the employees to look up
+    
+    Returns:
+        Dict containing the employees found, in request order, and an
+        errors list for IDs that could not be fetched
+    """
+    unique_ids = list(dict.fromkeys(employee_ids))
+    if len(unique_ids) > MAX_BATCH_SIZE:
+        raise ValueError(f"At most {MAX_BATCH_SIZE} employee IDs can be requested at once")
+    
+    semaphore = asyncio.Semaphore(BATCH_CONCURRENCY)
+    
+    async def fetch(employee_id: int):
+        async with semaphore:
+            return await _fetch_employee(employee_id)
+    
+    results = await asyncio.gather(
+        *(fetch(employee_id) for employee_id in unique_ids), return_exceptions=True
+    )
+    
+    employees = []
+    errors = []
+    for employee_id, result in zip(unique_ids, results):
+        if isinstance(result, Exception):
+            errors.append({"employee_id": employee_id, "error": str(result)})
+        else:
+            employees.append(result)
+    
+    return {"employees": employees, "errors": errors, "count": len(employees)}
 
 @mcp.tool
 async def search_employees(
     query: str,
     page: int = 1,
-    per_page: int = 20
+    per_page: int = 20,
+    fields: Optional[List[str]] = None,
+    compact: Optional[bool] = None
 ) -> Dict[str, Any]:
     """
     Search employees by name, email, or other attributes
@@ -163,17 +1007,102 @@ async def search_employees(
         query: Search query string
         page: Page number for pagination (default: 1)
         per_page: Number of results per page (default: 20, max: 50)
+        fields: Only return these fields for each record (dotted paths such
+            as "department.name" are allowed; "id" is always included)
+        compact: Drop null and empty values (default: server setting, on)
     
     Returns:
         Dict containing matching employees and pagination info
     """
-    params = {
-        "query": query,
-        "page": page,
-        "per_page": min(per_page, 50)
-    }
+    per_page = min(per_page, 50)
+    if employee_directory.is_fresh():
+        result = employee_directory.search_page(query, page, per_page)
+    else:
+        params = {
+            "query": query,
+            "page": page,
+            "per_page": per_page
+        }
+        result = await breathe_hr_request("employees/search", params=params)
+    
+    return _shape(result, "employees", fields, compact)
+
+def _local_range(start_date: Optional[str], end_date: Optional[str]):
+    """The parsed date range if ``absence_store`` can answer it, else ``None``"""
+    start = occupancy.parse_date(start_date)
+    end = occupancy.parse_date(end_date)
+    if start is None or end is None or end < start or not absence_store.covers(start, end):
+        return None
+    return start, end
+
+async def _absences_between(
+    start, end, employee_id: Optional[int] = None
+) -> Tuple[List[Dict[str, Any]], bool]:
+    """Absences overlapping a date range, from the local store when it covers it
+    
+    The upstream date filter only returns absences lying wholly inside the
+    range, so an upstream lookup is widened by ``absence_store.fetch_range``
+    and then narrowed to the absences that overlap.
+    
+    Returns:
+        The absences, and whether they are complete; an upstream fetch is
+        cut short after ``MAX_RECORDS_LIMIT`` records
+    """
+    if absence_store.covers(start, end):
+        return absence_store.query(start, end, employee_id=employee_id), True
+    fetch_start, fetch_end = absence_store.fetch_range(start, end)
+    params = {"start_date": fetch_start.isoformat(), "end_date": fetch_end.isoformat()}
+    if employee_id is not None:
+        params["employee_id"] = employee_id
+    result = await fetch_all(
+        breathe_hr_request, "absences", "absences",
+        params=params,
+        concurrency=PAGINATION_CONCURRENCY, max_records=MAX_RECORDS_LIMIT,
+    )
+    return overlapping(result["absences"], start, end), not result["truncated"]
+
+async def _absences_by_employee(
+    requests: Dict[int, LeaveRequest]
+) -> Tuple[List[Dict[str, Any]], Set[int]]:
+    """Existing absences of each requesting employee over the dates they asked for
+    
+    Used when the batch's whole date range holds too many absences to fetch
+    at once.
+    
+    Returns:
+        The absences, and the IDs of employees whose absences were still
+        too many to fetch completely
+    """
+    spans: Dict[int, tuple] = {}
+    for request in requests.values():
+        start, end = spans.get(request.employee_id, (request.start, request.end))
+        spans[request.employee_id] = (min(start, request.start), max(end, request.end))
+    semaphore = asyncio.Semaphore(BATCH_CONCURRENCY)
+    
+    async def lookup(employee_id: int):
+        async with semaphore:
+            return await _absences_between(*spans[employee_id], employee_id=employee_id)
     
-    return await breathe_hr_request("employees/search", params=params)
+    lookups = await asyncio.gather(*(lookup(employee_id) for employee_id in spans))
+    existing: List[Dict[str, Any]] = []
+    incomplete: Set[int] = set()
+    for employee_id, (records, complete) in zip(spans, lookups):
+        if complete:
+            existing.extend(records)
+        else:
+            incomplete.add(employee_id)
+    return existing, incomplete
+
+def _store_created(result: Any):
+    """Add absences returned by a create request to ``absence_store``"""
+    if absence_store.window is None or not isinstance(result, dict):
+        return
+    records = result.get("absences")
+    if not isinstance(records, list):
+        records = [result.get("absence", result)]
+    for record in records:
+        if isinstance(record, dict):
+            absence_store.upsert(record)
 
 @mcp.tool
 async def list_absences(
@@ -183,7 +1112,9 @@ async def list_absences(
     start_date: Optional[str] = None,
     end_date: Optional[str] = None,
     absence_type: Optional[str] = None,
-    status: Optional[str] = None
+    status: Optional[str] = None,
+    fields: Optional[List[str]] = None,
+    compact: Optional[bool] = None
 ) -> Dict[str, Any]:
     """
     Get absence/leave records from Breathe HR
@@ -196,10 +1127,21 @@ async def list_absences(
         end_date: Filter absences ending before this date (YYYY-MM-DD)
         absence_type: Filter by absence type (holiday, sick, etc.)
         status: Filter by status (pending, approved, rejected)
+        fields: Only return these fields for each record (dotted paths such
+            as "department.name" are allowed; "id" is always included)
+        compact: Drop null and empty values (default: server setting, on)
     
     Returns:
         Dict containing absence records and pagination info
     """
+    local = _local_range(start_date, end_date)
+    if local is not None:
+        result = absence_store.page(
+            *local, page=page, per_page=min(per_page, 100), employee_id=employee_id,
+            absence_type=absence_type, status=status, within=True,
+        )
+        return _shape(result, "absences", fields, compact)
+    
     params = {
         "page": page,
         "per_page": min(per_page, 100)
@@ -216,7 +1158,67 @@ async def list_absences(
     if status:
         params["status"] = status
     
-    return await breathe_hr_request("absences", params=params)
+    result = await breathe_hr_request("absences", params=params)
+    return _shape(result, "absences", fields, compact)
+
+@mcp.tool
+async def list_all_absences(
+    employee_id: Optional[int] = None,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    absence_type: Optional[str] = None,
+    status: Optional[str] = None,
+    max_records: int = 5000
+) -> Dict[str, Any]:
+    """
+    Get every matching absence record in one call, fetching all pages server-side
+    
+    Args:
+        employee_id: Filter by specific employee ID
+        start_date: Filter absences starting from this date (YYYY-MM-DD)
+        end_date: Filter absences ending before this date (YYYY-MM-DD)
+        absence_type: Filter by absence type (holiday, sick, etc.)
+        status: Filter by status (pending, approved, rejected)
+        max_records: Maximum number of absences to return (default: 5000,
+            capped by the server's BREATHE_HR_MAX_RECORDS limit)
+    
+    Returns:
+        Dict containing the absence records, count, and whether it was truncated
+    """
+    max_records = clamp_max_records(max_records, MAX_RECORDS_LIMIT)
+    local = _local_range(start_date, end_date)
+    if local is not None:
+        records = absence_store.query(
+            *local, employee_id=employee_id, absence_type=absence_type, status=status, within=True
+        )
+        return {
+            "absences": records[:max_records],
+            "count": min(len(records), max_records),
+            "pages": 0,
+            "truncated": len(records) > max_records,
+        }
+    
+    params = {}
+    
+    if employee_id:
+        params["employee_id"] = employee_id
+    if start_date:
+        params["start_date"] = start_date
+    if end_date:
+        params["end_date"] = end_date
+    if absence_type:
+        params["type"] = absence_type
+    if status:
+        params["status"] = status
+    
+    return await fetch_all(
+        breathe_hr_request,
+        "absences",
+        "absences",
+        params=params,
+        concurrency=PAGINATION_CONCURRENCY,
+        max_records=max_records,
+    )
 
 @mcp.tool
 async def create_leave_request(
@@ -256,7 +1258,99 @@ async def create_leave_request(
     if half_day and half_day_period:
         data["half_day_period"] = half_day_period
     
-    return await breathe_hr_request("absences", method="POST", json_data=data)
+    result = await breathe_hr_request("absences", method="POST", json_data=data)
+    
+    # The new absence changes absence lists and the employee's own records
+    _store_created(result)
+    await invalidate_cached("absences")
+    await invalidate_cached(f"employees/{employee_id}")
+    return result
+
+@mcp.tool
+async def create_leave_requests(
+    requests: List[Dict[str, Any]],
+    dry_run: bool = False
+) -> Dict[str, Any]:
+    """
+    Create several leave/absence requests in Breathe HR in one call
+    
+    Every item is validated before anything is submitted: dates must be
+    YYYY-MM-DD, a half day must be a single date with half_day_period
+    'morning' or 'afternoon', and items may not overlap each other or the
+    employee's existing absences. Valid items are then submitted
+    concurrently. Each item is its own upstream POST, so a large batch
+    takes about one second per BREATHE_HR_RATE_LIMIT items.
+    
+    Args:
+        requests: Leave requests, each with employee_id, start_date,
+            end_date, absence_type and optionally reason, half_day and
+            half_day_period (same fields as create_leave_request)
+        dry_run: Only validate and check for overlaps; submit nothing
+    
+    Returns:
+        Dict containing a result per item, in request order, with status
+        "created", "valid" (dry run), "invalid", "conflict", "unchecked"
+        (too many existing absences to check for overlaps; not submitted)
+        or "failed", plus counts of each status
+    """
+    if len(requests) > MAX_BATCH_SIZE:
+        raise ValueError(f"At most {MAX_BATCH_SIZE} leave requests can be created at once")
+    
+    results: List[Dict[str, Any]] = [{"index": index} for index in range(len(requests))]
+    valid = {}
+    for index, item in enumerate(requests):
+        try:
+            valid[index] = parse_leave_request(item)
+        except ValueError as exc:
+            results[index].update(status="invalid", error=str(exc))
+    
+    if valid:
+        start = min(request.start for request in valid.values())
+        end = max(request.end for request in valid.values())
+        existing, complete = await _absences_between(start, end)
+        if not complete:
+            # Missing absences could hide overlaps; look each employee up on
+            # their own, and hold back anyone still too large to check
+            existing, incomplete = await _absences_by_employee(valid)
+            for index in [i for i, request in valid.items() if request.employee_id in incomplete]:
+                results[index].update(
+                    status="unchecked",
+                    error="Too many existing absences to check for overlaps; "
+                    "submit this employee's requests over a shorter date range",
+                )
+                del valid[index]
+        for index, message in find_conflicts(valid, existing).items():
+            results[index].update(status="conflict", error=message)
+            del valid[index]
+    
+    if dry_run:
+        for index in valid:
+            results[index]["status"] = "valid"
+    elif valid:
+        semaphore = asyncio.Semaphore(BATCH_CONCURRENCY)
+        
+        async def submit(request):
+            async with semaphore:
+                return await breathe_hr_request("absences", method="POST", json_data=request.payload())
+        
+        outcomes = await asyncio.gather(
+            *(submit(request) for request in valid.values()), return_exceptions=True
+        )
+        for index, outcome in zip(valid, outcomes):
+            if isinstance(outcome, Exception):
+                results[index].update(status="failed", error=str(outcome))
+            else:
+                results[index].update(status="created", absence=outcome)
+                _store_created(outcome)
+        
+        await invalidate_cached("absences")
+        for employee_id in {request.employee_id for request in valid.values()}:
+            await invalidate_cached(f"employees/{employee_id}")
+    
+    counts: Dict[str, int] = {}
+    for result in results:
+        counts[result["status"]] = counts.get(result["status"], 0) + 1
+    return {"results": results, "counts": counts}
 
 @mcp.tool
 async def get_account_info() -> Dict[str, Any]:
@@ -266,13 +1360,15 @@ async def get_account_info() -> Dict[str, Any]:
     Returns:
         Dict containing account details and configuration
     """
-    return await breathe_hr_request("account")
+    return await get_reference("account")
 
 @mcp.tool
 async def get_employee_absences(
     employee_id: int,
     year: Optional[int] = None,
-    absence_type: Optional[str] = None
+    absence_type: Optional[str] = None,
+    fields: Optional[List[str]] = None,
+    compact: Optional[bool] = None
 ) -> Dict[str, Any]:
     """
     Get absence records for a specific employee
@@ -281,10 +1377,19 @@ async def get_employee_absences(
         employee_id: The unique ID of the employee
         year: Filter by specific year
         absence_type: Filter by absence type
+        fields: Only return these fields for each record (dotted paths such
+            as "department.name" are allowed; "id" is always included)
+        compact: Drop null and empty values (default: server setting, on)
     
     Returns:
         Dict containing the employee's absence records
     """
+    if year:
+        local = _local_range(f"{year:04d}-01-01", f"{year:04d}-12-31")
+        if local is not None:
+            records = absence_store.query(*local, employee_id=employee_id, absence_type=absence_type)
+            return _shape({"absences": records}, "absences", fields, compact)
+    
     params = {"employee_id": employee_id}
     
     if year:
@@ -292,7 +1397,8 @@ async def get_employee_absences(
     if absence_type:
         params["type"] = absence_type
     
-    return await breathe_hr_request(f"employees/{employee_id}/absences", params=params)
+    result = await breathe_hr_request(f"employees/{employee_id}/absences", params=params)
+    return _shape(result, "absences", fields, compact)
 
 @mcp.tool
 async def get_departments() -> Dict[str, Any]:
@@ -302,24 +1408,276 @@ async def get_departments() -> Dict[str, Any]:
     Returns:
         Dict containing departments and their details
     """
-    return await breathe_hr_request("departments")
+    return await get_reference("departments")
+
+async def _employee_records() -> List[Dict[str, Any]]:
+    """Every employee record, from the directory index when it is fresh"""
+    if employee_directory.is_fresh():
+        return employee_directory.records()
+    result = await fetch_all(
+        breathe_hr_request, "employees", "employees",
+        concurrency=PAGINATION_CONCURRENCY, max_records=MAX_RECORDS_LIMIT,
+    )
+    return result["employees"]
+
+async def _absence_report_data(start_date: str, end_date: Optional[str]):
+    """Fetch absences, employees and departments for an aggregation tool"""
+    start = occupancy.parse_date(start_date)
+    end = occupancy.parse_date(end_date) if end_date else start
+    if start is None or end is None:
+        raise ValueError("Dates must be in YYYY-MM-DD format")
+    if end < start:
+        raise ValueError("end_date must not be before start_date")
+    if (end - start).days + 1 > MAX_REPORT_DAYS:
+        raise ValueError(f"Date range cannot exceed {MAX_REPORT_DAYS} days")
+    
+    (absences, complete), employee_records, departments = await asyncio.gather(
+        _absences_between(start, end),
+        _employee_records(),
+        get_reference("departments"),
+    )
+    if not complete:
+        raise ValueError(
+            f"More than {MAX_RECORDS_LIMIT} absences fall in this date range; use a shorter range"
+        )
+    employees_by_id = {
+        int(record["id"]): record for record in employee_records if record.get("id") is not None
+    }
+    return (
+        absences,
+        employees_by_id,
+        occupancy.department_names(departments),
+        start,
+        end,
+    )
+
+@mcp.tool
+async def get_team_calendar(
+    start_date: str,
+    end_date: str,
+    department: Optional[str] = None,
+    include_weekends: bool = False
+) -> Dict[str, Any]:
+    """
+    Get a per-day, per-department summary of how many people are off
+    
+    Args:
+        start_date: First day of the range (YYYY-MM-DD)
+        end_date: Last day of the range (YYYY-MM-DD)
+        department: Only include this department
+        include_weekends: Include Saturdays and Sundays (default: False)
+    
+    Returns:
+        Dict with per-department headcount, absence days, peak absences and
+        average occupancy, plus the number of people off on each day
+    """
+    absences, employees, departments, start, end = await _absence_report_data(start_date, end_date)
+    return occupancy.team_calendar(
+        absences, employees, departments, start, end,
+        department=department, include_weekends=include_weekends,
+    )
+
+@mcp.tool
+async def get_whos_out(
+    start_date: str,
+    end_date: Optional[str] = None,
+    department: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Get the employees who are off at any point in a date range
+    
+    Args:
+        start_date: First day of the range (YYYY-MM-DD)
+        end_date: Last day of the range (default: same as start_date)
+        department: Only include this department
+    
+    Returns:
+        Dict listing each absent employee with their department and the
+        absence periods that fall within the range
+    """
+    absences, employees, departments, start, end = await _absence_report_data(start_date, end_date)
+    return occupancy.who_is_out(
+        absences, employees, departments, start, end, department=department
+    )
+
+@mcp.tool
+async def get_absence_summary(
+    start_date: str,
+    end_date: str,
+    department: Optional[str] = None,
+    include_weekends: bool = False
+) -> Dict[str, Any]:
+    """
+    Get the days of absence taken per employee and absence type in a date range
+    
+    Args:
+        start_date: First day of the range (YYYY-MM-DD)
+        end_date: Last day of the range (YYYY-MM-DD)
+        department: Only include this department
+        include_weekends: Count Saturdays and Sundays (default: False)
+    
+    Returns:
+        Dict with each employee's total absence days and a breakdown by type,
+        ordered by most days taken
+    """
+    absences, employees, departments, start, end = await _absence_report_data(start_date, end_date)
+    return occupancy.absence_totals(
+        absences, employees, departments, start, end,
+        department=department, include_weekends=include_weekends,
+    )
+
+# (directory, directory version, columns) of the last columnar snapshot
+_employee_columns: Optional[tuple] = None
+
+async def employee_columns() -> "EmployeeColumns":
+    """Columnar snapshot of the directory, rebuilt only when it has changed"""
+    global _employee_columns
+    from .analytics import EmployeeColumns
+    
+    directory = employee_directory
+    if directory.is_fresh():
+        cached = _employee_columns
+        if cached is not None and cached[0] is directory and cached[1] == directory.version:
+            return cached[2]
+    version = directory.version
+    records, departments = await asyncio.gather(_employee_records(), get_reference("departments"))
+    columns = EmployeeColumns.from_records(records, occupancy.department_names(departments))
+    if directory.is_fresh() and directory.version == version:
+        _employee_columns = (directory, version, columns)
+    return columns
+
+def _optional_date(value: Optional[str], name: str):
+    if not value:
+        return None
+    parsed = occupancy.parse_date(value)
+    if parsed is None:
+        raise ValueError(f"{name} must be a date in YYYY-MM-DD format")
+    return parsed
+
+@mcp.tool
+async def get_headcount(
+    group_by: Optional[List[str]] = None,
+    department: Optional[str] = None,
+    status: Optional[str] = None,
+    location: Optional[str] = None,
+    employment_type: Optional[str] = None,
+    job_title: Optional[str] = None,
+    employed_on: Optional[str] = None,
+    joined_from: Optional[str] = None,
+    joined_to: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Count employees, optionally grouped and filtered, without listing them
+    
+    Args:
+        group_by: Fields to group by, any of "department", "status",
+            "location", "employment_type" and "job_title"
+            (default: ["department"])
+        department: Only count this department
+        status: Only count this status (e.g. "Current employee")
+        location: Only count this location
+        employment_type: Only count this employment type
+        job_title: Only count this job title
+        employed_on: Only count people employed on this date (YYYY-MM-DD):
+            joined on or before it and not left before it
+        joined_from: Only count people who joined on or after this date
+        joined_to: Only count people who joined on or before this date
+    
+    Returns:
+        Dict with the total and a count per group, largest first
+    """
+    columns = await employee_columns()
+    filters = {
+        "department": department, "status": status, "location": location,
+        "employment_type": employment_type, "job_title": job_title,
+    }
+    mask = columns.select(
+        filters,
+        joined_from=_optional_date(joined_from, "joined_from"),
+        joined_to=_optional_date(joined_to, "joined_to"),
+        employed_on=_optional_date(employed_on, "employed_on"),
+    )
+    by = ["department"] if group_by is None else group_by
+    return {"total": mask.count(1), "group_by": by, "groups": columns.group_count(by, mask)}
+
+@mcp.tool
+async def get_starters_and_leavers(
+    start_date: str,
+    end_date: str,
+    group_by: Optional[List[str]] = None
+) -> Dict[str, Any]:
+    """
+    Count the people who joined and who left in a date range
+    
+    Args:
+        start_date: First day of the range (YYYY-MM-DD)
+        end_date: Last day of the range (YYYY-MM-DD)
+        group_by: Fields to group by, any of "department", "status",
+            "location", "employment_type" and "job_title"
+            (default: ["department"])
+    
+    Returns:
+        Dict with starters and leavers, each with a total and a count per
+        group, plus headcount at the start and end of the range
+    """
+    start = _optional_date(start_date, "start_date")
+    end = _optional_date(end_date, "end_date")
+    if start is None or end is None:
+        raise ValueError("start_date and end_date are required")
+    if end < start:
+        raise ValueError("end_date must not be before start_date")
+    
+    columns = await employee_columns()
+    by = ["department"] if group_by is None else group_by
+    result: Dict[str, Any] = {"start_date": start.isoformat(), "end_date": end.isoformat(), "group_by": by}
+    for name, mask in (
+        ("starters", columns.select(joined_from=start, joined_to=end)),
+        ("leavers", columns.select(left_from=start, left_to=end)),
+    ):
+        result[name] = {"total": mask.count(1), "groups": columns.group_count(by, mask)}
+    result["headcount_at_start"] = columns.select(employed_on=start).count(1)
+    result["headcount_at_end"] = columns.select(employed_on=end).count(1)
+    return result
+
+# MCP Resources
+
+@mcp.resource(REFERENCE_URIS["account"], mime_type="application/json")
+async def account_resource() -> Dict[str, Any]:
+    """Company account details; subscribe to be notified when they change"""
+    return await get_reference("account")
+
+@mcp.resource(REFERENCE_URIS["departments"], mime_type="application/json")
+async def departments_resource() -> Dict[str, Any]:
+    """Departments and teams; subscribe to be notified when they change"""
+    return await get_reference("departments")
+
+@mcp.resource(EMPLOYEES_URI, mime_type="application/json")
+async def employees_resource() -> Dict[str, Any]:
+    """Every employee; subscribe to be notified when any of them changes"""
+    records = await _employee_records()
+    return _shape({"employees": records, "count": len(records)}, "employees", None, None)
+
+@mcp.resource(EMPLOYEES_URI + "/{employee_id}", mime_type="application/json")
+async def employee_resource(employee_id: int) -> Dict[str, Any]:
+    """One employee's details; subscribe to be notified when they change"""
+    return _shape(await _fetch_employee(employee_id), "employees", None, None)
 
 def create_app():
     """Create FastAPI app with MCP integration"""
+    from fastapi import FastAPI
+    from fastapi.responses import PlainTextResponse
+
     # Get the MCP HTTP app
-    mcp_app = mcp.http_app(path="/")
+    mcp_app = mcp.http_app(path="/", stateless_http=STATELESS_HTTP)
     
     # Create main FastAPI app with MCP's lifespan
     app = FastAPI(lifespan=mcp_app.lifespan, title="Breathe HR MCP Server")
     
-    # Add authentication middleware if API key is configured
-    if MCP_API_KEY:
-        @app.middleware("http")
-        async def auth_middleware(request: Request, call_next):
-            if request.url.path.startswith("/mcp"):
-                await authenticate_request(request)
-            response = await call_next(request)
-            return response
+    # Add authentication middleware if any API key is configured; it also
+    # covers the admin endpoints
+    if api_keys:
+        # /metrics names every client, so it needs a key as well
+        app.add_middleware(AuthMiddleware, keyring=api_keys, prefix=("/mcp", "/admin", "/metrics"))
     
     # Mount the MCP app
     app.mount("/mcp", mcp_app)
@@ -328,11 +1686,30 @@ def create_app():
     @app.get("/")
     async def health_check():
         return {"status": "ok", "service": "Breathe HR MCP Server"}
+    
+    if METRICS_ENABLED:
+        @app.get("/metrics", response_class=PlainTextResponse)
+        async def metrics_endpoint():
+            return PlainTextResponse(metrics.render(), media_type=CONTENT_TYPE)
+    
+    slow_calls = tracer.slow_calls if tracer.enabled else None
+    if slow_calls is not None:
+        @app.get("/admin/slow-calls")
+        async def slow_calls_endpoint():
+            return {
+                "threshold_ms": slow_calls.threshold * 1000,
+                "recorded": slow_calls.recorded,
+                "calls": slow_calls.entries(),
+            }
     return app
 
-# Create the app
-app = create_app()
+def __getattr__(name: str):
+    # The HTTP app is built on first access (e.g. by uvicorn), so stdio
+    # sessions never import FastAPI or build routes they won't serve
+    if name == "app":
+        app = globals()["app"] = create_app()
+        return app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 if __name__ == "__main__":
     mcp.run()
-
@@ -0,0 +1,23 @@
+"""Helpers for reading optional tuning settings from the environment"""
+
+import os
+
+
+def env_int(name: str, default: int) -> int:
+    """Read an integer setting, falling back to ``default`` when unset"""
+    value = os.getenv(name)
+    return int(value) if value else default
+
+
+def env_float(name: str, default: float) -> float:
+    """Read a float setting, falling back to ``default`` when unset"""
+    value = os.getenv(name)
+    return float(value) if value else default
+
+
+def env_bool(name: str, default: bool = False) -> bool:
+    """Read a boolean setting such as ``true``/``1``/``yes``"""
+    value = os.getenv(name)
+    if not value:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
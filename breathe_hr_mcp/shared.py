@@ -0,0 +1,367 @@
+"""State shared between worker processes through SQLite
+
+When the server runs several worker processes (``uvicorn --workers N``),
+each one would otherwise keep its own response cache and rate limiter,
+multiplying upstream load and letting the combined request rate exceed the
+API limit. Pointing ``BREATHE_HR_SHARED_STATE_PATH`` at a local file makes
+all workers share:
+
+- ``SharedRateBudget``: one token bucket, including the adaptive rate and any
+  ``Retry-After`` pause, so the workers together stay within the budget
+- ``SharedCache``: a second-level response cache consulted when a worker's
+  in-process cache misses
+- ``SharedLease``: a lease electing the one worker that runs the background
+  sync, so N workers don't each re-fetch the directory and absences
+- ``SharedDatasets``: the datasets the elected worker publishes after each
+  sync, which the other workers load instead of fetching them upstream
+
+The database runs in WAL mode so readers never block the writer, and every
+bucket update is a short ``BEGIN IMMEDIATE`` transaction, which serializes
+reservations across processes.
+"""
+
+import os
+import socket
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+
+from . import jsoncodec
+from .cache import make_key
+from .settings import env_float
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS rate_budget (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    tokens REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    rate REAL NOT NULL,
+    blocked_until REAL NOT NULL DEFAULT 0,
+    decrease_until REAL NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS response_cache (
+    endpoint TEXT NOT NULL,
+    params TEXT NOT NULL,
+    expires_at REAL NOT NULL,
+    body TEXT NOT NULL,
+    PRIMARY KEY (endpoint, params)
+);
+CREATE TABLE IF NOT EXISTS leases (
+    name TEXT PRIMARY KEY,
+    holder TEXT NOT NULL,
+    expires_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS datasets (
+    name TEXT PRIMARY KEY,
+    updated_at REAL NOT NULL,
+    body TEXT NOT NULL
+);
+"""
+
+
+class _SharedDatabase:
+    """Lazily opened SQLite connection in WAL mode"""
+
+    def __init__(self, path: str, clock: Callable[[], float] = time.time, timeout: float = 5.0):
+        self.path = path
+        self._clock = clock
+        self._timeout = timeout
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    @contextmanager
+    def _transaction(self, immediate: bool = False) -> Iterator[sqlite3.Connection]:
+        with self._lock:
+            conn = self._connect()
+            conn.execute("BEGIN IMMEDIATE" if immediate else "BEGIN")
+            try:
+                yield conn
+            except BaseException:
+                conn.rollback()
+                raise
+            conn.commit()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(
+                self.path, timeout=self._timeout, isolation_level=None, check_same_thread=False
+            )
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            self._conn = conn
+        return self._conn
+
+
+class SharedRateBudget(_SharedDatabase):
+    """Token bucket whose state lives in a database shared by all workers"""
+
+    @classmethod
+    def from_env(cls) -> Optional["SharedRateBudget"]:
+        path = os.getenv("BREATHE_HR_SHARED_STATE_PATH")
+        return cls(path) if path else None
+
+    def reserve(self, max_rate: float, burst: int, pace: bool = True) -> Tuple[float, float]:
+        """Take one token, waiting out any shared ``Retry-After`` pause
+
+        Returns:
+            ``(seconds to wait before sending, current shared rate)``
+        """
+        now = self._clock()
+        with self._transaction(immediate=True) as conn:
+            tokens, updated_at, rate, blocked_until = self._state(conn, max_rate, burst)
+            wait = max(0.0, blocked_until - now)
+            if pace and rate > 0:
+                tokens = min(float(burst), tokens + max(0.0, now - updated_at) * rate) - 1
+                if tokens < 0:
+                    wait = max(wait, -tokens / rate)
+                conn.execute(
+                    "UPDATE rate_budget SET tokens = ?, updated_at = ? WHERE id = 1",
+                    (tokens, now),
+                )
+        return wait, rate
+
+    def rate_limited(
+        self,
+        retry_after: Optional[float],
+        max_rate: float,
+        burst: int,
+        min_rate: float,
+        decrease_window: float,
+    ) -> float:
+        """Record a 429: pause every worker and halve the shared rate
+
+        Returns:
+            The shared rate afterwards
+        """
+        now = self._clock()
+        with self._transaction(immediate=True) as conn:
+            tokens, updated_at, rate, blocked_until = self._state(conn, max_rate, burst)
+            decrease_until = conn.execute(
+                "SELECT decrease_until FROM rate_budget WHERE id = 1"
+            ).fetchone()[0]
+            if retry_after:
+                blocked_until = max(blocked_until, now + retry_after)
+            if rate > 0:
+                tokens = min(0.0, min(float(burst), tokens + max(0.0, now - updated_at) * rate))
+                if now >= decrease_until:
+                    rate = max(min_rate, rate / 2)
+                    decrease_until = now + max(retry_after or 0.0, decrease_window)
+            conn.execute(
+                "UPDATE rate_budget SET tokens = ?, updated_at = ?, rate = ?, "
+                "blocked_until = ?, decrease_until = ? WHERE id = 1",
+                (tokens, now, rate, blocked_until, decrease_until),
+            )
+        return rate
+
+    def recover(self, step: float, max_rate: float) -> float:
+        """Raise the shared rate by ``step`` up to ``max_rate``
+
+        Returns:
+            The shared rate afterwards
+        """
+        with self._transaction(immediate=True) as conn:
+            conn.execute(
+                "UPDATE rate_budget SET rate = MIN(?, rate + ?) WHERE id = 1 AND rate < ?",
+                (max_rate, step, max_rate),
+            )
+            row = conn.execute("SELECT rate FROM rate_budget WHERE id = 1").fetchone()
+        return row[0] if row else max_rate
+
+    def _state(self, conn: sqlite3.Connection, max_rate: float, burst: int):
+        row = conn.execute(
+            "SELECT tokens, updated_at, rate, blocked_until FROM rate_budget WHERE id = 1"
+        ).fetchone()
+        if row is not None:
+            return row
+        state = (float(burst), self._clock(), max_rate, 0.0)
+        conn.execute(
+            "INSERT INTO rate_budget (id, tokens, updated_at, rate, blocked_until) "
+            "VALUES (1, ?, ?, ?, ?)",
+            state,
+        )
+        return state
+
+
+class SharedCache(_SharedDatabase):
+    """Second-level response cache shared by all workers
+
+    Expired rows are ignored on read and purged every ``purge_every`` writes.
+    """
+
+    def __init__(self, path: str, clock: Callable[[], float] = time.time, purge_every: int = 100):
+        super().__init__(path, clock)
+        self.purge_every = purge_every
+        self._writes = 0
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_env(cls) -> Optional["SharedCache"]:
+        path = os.getenv("BREATHE_HR_SHARED_STATE_PATH")
+        return cls(path) if path else None
+
+    def get(
+        self, endpoint: str, params: Optional[Dict[str, Any]] = None
+    ) -> Optional[Tuple[Any, float]]:
+        """Return ``(value, seconds until it expires)``, or ``None`` on a miss"""
+        endpoint, params_key = self._key(endpoint, params)
+        now = self._clock()
+        with self._transaction() as conn:
+            row = conn.execute(
+                "SELECT expires_at, body FROM response_cache "
+                "WHERE endpoint = ? AND params = ? AND expires_at > ?",
+                (endpoint, params_key, now),
+            ).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        try:
+            value = jsoncodec.loads(row[1])
+        except ValueError:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return value, row[0] - now
+
+    def set(self, endpoint: str, params: Optional[Dict[str, Any]], value: Any, ttl: float) -> None:
+        if ttl <= 0 or value is None:
+            return
+        endpoint, params_key = self._key(endpoint, params)
+        body = jsoncodec.dumps(value)
+        now = self._clock()
+        self._writes += 1
+        with self._transaction(immediate=True) as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO response_cache (endpoint, params, expires_at, body) "
+                "VALUES (?, ?, ?, ?)",
+                (endpoint, params_key, now + ttl, body),
+            )
+            if self._writes % self.purge_every == 0:
+                conn.execute("DELETE FROM response_cache WHERE expires_at <= ?", (now,))
+
+    def invalidate(self, endpoint: str) -> int:
+        """Drop entries for an endpoint and anything nested beneath it"""
+        endpoint = endpoint.strip("/")
+        prefix = endpoint + "/"
+        with self._transaction(immediate=True) as conn:
+            cursor = conn.execute(
+                "DELETE FROM response_cache WHERE endpoint = ? OR substr(endpoint, 1, ?) = ?",
+                (endpoint, len(prefix), prefix),
+            )
+        return cursor.rowcount
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
+
+    @staticmethod
+    def _key(endpoint: str, params: Optional[Dict[str, Any]]) -> Tuple[str, str]:
+        endpoint, normalized = make_key(endpoint, params)
+        return endpoint, jsoncodec.dumps(normalized)
+
+
+class SharedLease(_SharedDatabase):
+    """Time-limited lease held by at most one worker at a time
+
+    The holder renews the lease well within ``ttl``; if it dies, another
+    worker takes over once the lease expires.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        name: str = "refresher",
+        ttl: float = 60.0,
+        clock: Callable[[], float] = time.time,
+    ):
+        super().__init__(path, clock)
+        self.name = name
+        self.ttl = ttl
+        self.holder = f"{socket.gethostname()}:{os.getpid()}:{id(self):x}"
+        self.held = False
+
+    @classmethod
+    def from_env(cls) -> Optional["SharedLease"]:
+        path = os.getenv("BREATHE_HR_SHARED_STATE_PATH")
+        if not path:
+            return None
+        return cls(path, ttl=env_float("BREATHE_HR_REFRESHER_LEASE", 60.0))
+
+    def renew(self) -> bool:
+        """Take or extend the lease if it is free, expired or already ours
+
+        Returns:
+            Whether this worker holds the lease afterwards
+        """
+        now = self._clock()
+        try:
+            with self._transaction(immediate=True) as conn:
+                row = conn.execute(
+                    "SELECT holder, expires_at FROM leases WHERE name = ?", (self.name,)
+                ).fetchone()
+                self.held = row is None or row[0] == self.holder or row[1] <= now
+                if self.held:
+                    conn.execute(
+                        "INSERT OR REPLACE INTO leases (name, holder, expires_at) VALUES (?, ?, ?)",
+                        (self.name, self.holder, now + self.ttl),
+                    )
+        except sqlite3.Error:
+            # Another worker may still hold it; never assume we do
+            self.held = False
+        return self.held
+
+    def release(self) -> None:
+        """Give up the lease so another worker can take it straight away"""
+        if not self.held:
+            return
+        self.held = False
+        with self._transaction(immediate=True) as conn:
+            conn.execute(
+                "DELETE FROM leases WHERE name = ? AND holder = ?", (self.name, self.holder)
+            )
+
+
+class SharedDatasets(_SharedDatabase):
+    """Latest value of each dataset published by the refreshing worker"""
+
+    @classmethod
+    def from_env(cls) -> Optional["SharedDatasets"]:
+        path = os.getenv("BREATHE_HR_SHARED_STATE_PATH")
+        return cls(path) if path else None
+
+    def publish(self, name: str, value: Any) -> None:
+        body = jsoncodec.dumps(value)
+        with self._transaction(immediate=True) as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO datasets (name, updated_at, body) VALUES (?, ?, ?)",
+                (name, self._clock(), body),
+            )
+
+    def fetch(self, name: str) -> Optional[Tuple[Any, float]]:
+        """Return ``(value, seconds since it was published)``, or ``None``"""
+        with self._transaction() as conn:
+            row = conn.execute(
+                "SELECT updated_at, body FROM datasets WHERE name = ?", (name,)
+            ).fetchone()
+        if row is None:
+            return None
+        try:
+            value = jsoncodec.loads(row[1])
+        except ValueError:
+            return None
+        return value, max(0.0, self._clock() - row[0])
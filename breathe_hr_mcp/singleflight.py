@@ -0,0 +1,62 @@
+"""Request coalescing for concurrent identical upstream calls
+
+When several callers ask for the same key while a call is already in flight,
+they wait on that call and share its result (or error) instead of issuing
+their own.
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """Deduplicate concurrent calls that share a key"""
+
+    def __init__(self):
+        self._inflight: Dict[Hashable, "asyncio.Task[Any]"] = {}
+        self.executions = 0
+        self.deduplicated = 0
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._inflight)
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        """Run ``fn`` unless a call for ``key`` is already in flight
+
+        The shared call runs as its own task, so cancelling one waiter does
+        not cancel the request for everyone else.
+        """
+        task = self._inflight.get(key)
+        if task is not None:
+            self.deduplicated += 1
+        else:
+            self.executions += 1
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+        return await asyncio.shield(task)
+
+    def detach(self, predicate: Callable[[Hashable], bool]) -> int:
+        """Stop sharing in-flight calls whose key matches ``predicate``
+
+        Current waiters still receive the detached call's result, but new
+        callers start a fresh call instead of joining it.
+        """
+        stale = [key for key in self._inflight if predicate(key)]
+        for key in stale:
+            del self._inflight[key]
+        return len(stale)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "executions": self.executions,
+            "deduplicated": self.deduplicated,
+            "in_flight": self.in_flight,
+        }
+
+    def _forget(self, key: Hashable, task: "asyncio.Task[Any]") -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
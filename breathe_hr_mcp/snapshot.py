@@ -0,0 +1,126 @@
+"""Persistent on-disk snapshots of slow-changing upstream data
+
+The employee directory, departments and account info are written to a small
+SQLite database after each successful fetch, together with the time they
+were fetched and the upstream ``ETag``/``Last-Modified`` validators. After a
+restart the server restores them, answers from the snapshot straight away
+and revalidates against the API in the background
+(stale-while-revalidate), instead of starting cold.
+
+The database is opened on first use, so an unused store costs nothing.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Optional
+
+from . import jsoncodec
+from .settings import env_float
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS snapshots (
+    key TEXT PRIMARY KEY,
+    fetched_at REAL NOT NULL,
+    etag TEXT,
+    last_modified TEXT,
+    body TEXT NOT NULL
+)
+"""
+
+
+@dataclass(frozen=True)
+class Snapshot:
+    """A stored upstream response and its freshness metadata"""
+
+    value: Any
+    fetched_at: float
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+
+    def age(self, now: Optional[float] = None) -> float:
+        """Seconds since the snapshot was fetched"""
+        return max(0.0, (time.time() if now is None else now) - self.fetched_at)
+
+
+class SnapshotStore:
+    """SQLite-backed key/value store of JSON snapshots"""
+
+    def __init__(
+        self,
+        path: str,
+        max_stale: float = 86400.0,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.path = path
+        self.max_stale = max_stale
+        self._clock = clock
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> Optional["SnapshotStore"]:
+        """Build a store from ``BREATHE_HR_SNAPSHOT_*``, or ``None`` if disabled"""
+        path = os.getenv("BREATHE_HR_SNAPSHOT_PATH")
+        if not path:
+            return None
+        return cls(path, max_stale=env_float("BREATHE_HR_SNAPSHOT_MAX_STALE", 86400.0))
+
+    def load(self, key: str) -> Optional[Snapshot]:
+        """Return the snapshot for ``key`` if it is recent enough to serve"""
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT fetched_at, etag, last_modified, body FROM snapshots WHERE key = ?",
+                (key,),
+            ).fetchone()
+        if row is None:
+            return None
+        fetched_at, etag, last_modified, body = row
+        try:
+            value = jsoncodec.loads(body)
+        except ValueError:
+            return None
+        snapshot = Snapshot(value, fetched_at, etag, last_modified)
+        if snapshot.age(self._clock()) > self.max_stale:
+            return None
+        return snapshot
+
+    def save(
+        self,
+        key: str,
+        value: Any,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+    ) -> None:
+        """Store ``value`` under ``key``, replacing any previous snapshot"""
+        body = jsoncodec.dumps(value)
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO snapshots "
+                    "(key, fetched_at, etag, last_modified, body) VALUES (?, ?, ?, ?, ?)",
+                    (key, self._clock(), etag, last_modified, body),
+                )
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                conn.execute("DELETE FROM snapshots WHERE key = ?", (key,))
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute(_SCHEMA)
+        return self._conn
@@ -0,0 +1,113 @@
+"""Resource subscriptions and update notifications
+
+Departments, account info and employee records are exposed as MCP
+resources as well as tools. Instead of polling them, a client can send
+``resources/subscribe`` for a URI and re-read the resource only when it
+receives ``notifications/resources/updated``. ``Subscriptions`` records
+which sessions subscribed to which URIs, and ``notify`` is called by the
+background sync whenever it finds that a resource changed.
+
+Sessions are held weakly, so a client that disconnects without
+unsubscribing is forgotten once its session is collected. A session whose
+connection is broken is dropped on the first failed send.
+
+FastMCP does not handle ``resources/subscribe`` itself. ``install``
+registers the handlers on its low-level server and advertises the
+``subscribe`` capability. The low-level server is private FastMCP API, so
+``install`` checks for everything it uses and raises if any of it moved.
+"""
+
+import asyncio
+import weakref
+from typing import Any, Dict, Iterable
+
+from pydantic import AnyUrl
+
+# Attributes of FastMCP's private low-level server that ``install`` uses
+_LOW_LEVEL_API = ("subscribe_resource", "unsubscribe_resource", "request_context", "get_capabilities")
+
+
+class Subscriptions:
+    """MCP sessions subscribed to each resource URI"""
+
+    def __init__(self):
+        self._sessions: Dict[str, "weakref.WeakSet[Any]"] = {}
+        self.notifications = 0
+        self.failures = 0
+
+    def subscribe(self, uri: str, session: Any) -> None:
+        self._sessions.setdefault(uri, weakref.WeakSet()).add(session)
+
+    def unsubscribe(self, uri: str, session: Any) -> None:
+        sessions = self._sessions.get(uri)
+        if sessions is not None:
+            sessions.discard(session)
+            if not sessions:
+                del self._sessions[uri]
+
+    def subscribers(self, uri: str) -> int:
+        return len(self._sessions.get(uri, ()))
+
+    async def notify(self, uris: Iterable[str]) -> int:
+        """Tell every subscriber of ``uris`` that those resources changed
+
+        Returns:
+            The number of notifications sent
+        """
+        sends = []
+        for uri in uris:
+            for session in list(self._sessions.get(uri, ())):
+                sends.append((uri, session))
+        if not sends:
+            return 0
+        results = await asyncio.gather(
+            *(session.send_resource_updated(AnyUrl(uri)) for uri, session in sends),
+            return_exceptions=True,
+        )
+        sent = 0
+        for (uri, session), result in zip(sends, results):
+            if isinstance(result, Exception):
+                self.failures += 1
+                self.unsubscribe(uri, session)
+            else:
+                sent += 1
+        self.notifications += sent
+        return sent
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "resources": len(self._sessions),
+            "subscriptions": sum(len(sessions) for sessions in self._sessions.values()),
+            "notifications": self.notifications,
+            "failures": self.failures,
+        }
+
+    def install(self, server: Any) -> None:
+        """Handle ``resources/subscribe`` and ``resources/unsubscribe`` on a FastMCP server"""
+        low_level = getattr(server, "_mcp_server", None)
+        # Checked on the class: ``request_context`` raises outside a request
+        missing = [name for name in _LOW_LEVEL_API if not hasattr(type(low_level), name)]
+        if missing:
+            raise RuntimeError(
+                "This FastMCP version no longer exposes the low-level server API used for "
+                f"resource subscriptions (missing: {', '.join(missing)})"
+            )
+
+        @low_level.subscribe_resource()
+        async def subscribe(uri: AnyUrl) -> None:
+            self.subscribe(str(uri), low_level.request_context.session)
+
+        @low_level.unsubscribe_resource()
+        async def unsubscribe(uri: AnyUrl) -> None:
+            self.unsubscribe(str(uri), low_level.request_context.session)
+
+        # The low-level server always reports subscribe=False
+        get_capabilities = low_level.get_capabilities
+
+        def capabilities(*args: Any, **kwargs: Any):
+            result = get_capabilities(*args, **kwargs)
+            if result.resources is not None:
+                result.resources.subscribe = True
+            return result
+
+        low_level.get_capabilities = capabilities
@@ -0,0 +1,297 @@
+"""Spans for tool calls and upstream requests, and a log of slow upstream calls
+
+``Tracer.span`` times a block of work as a ``Span``. Spans nest through a
+context variable, so an upstream request made while a tool runs becomes a
+child of the tool's span and shares its trace ID. A finished span is passed
+to every exporter:
+
+- ``InMemoryExporter`` keeps finished spans in a list, for tests and
+  offline inspection
+- ``SlowCallLog`` keeps the slowest recent upstream calls in a ring buffer,
+  served by the HTTP app at ``/admin/slow-calls``
+
+With ``otel`` on, every span is mirrored to an OpenTelemetry span through
+``opentelemetry-api``, parented the same way, so an installed SDK can
+export it anywhere. Without an SDK the API is a no-op.
+
+An upstream span breaks its time down into phases. The server adds the time
+spent waiting on the rate limiter, backing off after a 429 and decoding the
+JSON body. Every request it sends, retries and hedged duplicates included,
+is a child ``attempt`` span; the client's ``request`` event hook gives each
+one an httpcore ``trace`` callback, which times waiting for a pooled
+connection, TCP connect, TLS, sending the request, waiting for the response
+headers and reading the body.
+
+Tracing is off unless ``BREATHE_HR_TRACING`` is set.
+"""
+
+import importlib.util
+import random
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional
+
+import httpx
+
+from .settings import env_bool, env_float, env_int
+
+# httpcore trace steps and the phase each is counted under
+_PHASES = {
+    "connect_tcp": "connect",
+    "start_tls": "tls",
+    "send_request_headers": "send",
+    "send_request_body": "send",
+    "receive_response_headers": "wait",
+    "receive_response_body": "receive",
+}
+
+_current: "ContextVar[Optional[Span]]" = ContextVar("breathe_hr_span", default=None)
+
+
+def current_span() -> "Optional[Span]":
+    """The innermost span open in this context, if any"""
+    return _current.get()
+
+
+def params_shape(params: Optional[Dict[str, Any]]) -> Dict[str, str]:
+    """Parameter names and value types, without the values themselves"""
+    return {key: type(value).__name__ for key, value in sorted((params or {}).items())}
+
+
+class Span:
+    """One timed unit of work with attributes and phase timings"""
+
+    __slots__ = (
+        "name", "attributes", "parent", "trace_id", "span_id",
+        "start", "end", "started_at", "phases", "status", "error", "otel",
+    )
+
+    def __init__(self, name: str, attributes: Dict[str, Any], parent: "Optional[Span]" = None):
+        self.name = name
+        self.attributes = attributes
+        self.parent = parent
+        self.trace_id = parent.trace_id if parent is not None else f"{random.getrandbits(128):032x}"
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.started_at = time.time()
+        self.start = time.perf_counter()
+        self.end: Optional[float] = None
+        # Seconds spent in each phase, summed over repeats (e.g. retries)
+        self.phases: Dict[str, float] = {}
+        self.status = "ok"
+        self.error: Optional[str] = None
+        # The mirrored OpenTelemetry span, when ``otel`` is on
+        self.otel: Any = None
+
+    @property
+    def duration(self) -> float:
+        """Seconds from start to end, or to now while the span is open"""
+        return (self.end if self.end is not None else time.perf_counter()) - self.start
+
+    def set(self, **attributes: Any) -> None:
+        self.attributes.update(attributes)
+
+    def add_phase(self, phase: str, seconds: float) -> None:
+        self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+
+    def root(self) -> "Span":
+        span = self
+        while span.parent is not None:
+            span = span.parent
+        return span
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent.span_id if self.parent is not None else None,
+            "started_at": self.started_at,
+            "duration_ms": round(self.duration * 1000, 3),
+            "status": self.status,
+            "error": self.error,
+            "attributes": dict(self.attributes),
+            "phases_ms": {phase: round(seconds * 1000, 3) for phase, seconds in self.phases.items()},
+        }
+
+
+class InMemoryExporter:
+    """Keep every finished span in memory"""
+
+    def __init__(self):
+        self.spans: List[Span] = []
+
+    def export(self, span: Span) -> None:
+        self.spans.append(span)
+
+    def named(self, name: str) -> List[Span]:
+        return [span for span in self.spans if span.name == name]
+
+    def clear(self) -> None:
+        self.spans.clear()
+
+
+class SlowCallLog:
+    """Ring buffer of the most recent upstream calls slower than ``threshold`` seconds"""
+
+    def __init__(self, capacity: int = 100, threshold: float = 1.0, span_name: str = "upstream"):
+        self.threshold = threshold
+        self.span_name = span_name
+        self._entries: "deque[Dict[str, Any]]" = deque(maxlen=capacity)
+        self.recorded = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def export(self, span: Span) -> None:
+        if span.name != self.span_name or span.duration < self.threshold:
+            return
+        entry = span.to_dict()
+        root = span.root()
+        if root is not span:
+            entry["tool"] = root.attributes.get("tool")
+        self._entries.append(entry)
+        self.recorded += 1
+
+    def entries(self) -> List[Dict[str, Any]]:
+        """Logged calls, newest first"""
+        return list(reversed(self._entries))
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+class _PhaseTimer:
+    """httpcore ``trace`` callback adding connection phases to a span"""
+
+    __slots__ = ("span", "queued_at", "started")
+
+    def __init__(self, span: Span, queued_at: float):
+        self.span = span
+        self.queued_at = queued_at
+        self.started: Dict[str, float] = {}
+
+    async def __call__(self, event_name: str, info: Dict[str, Any]) -> None:
+        step, _, event = event_name.rpartition(".")
+        phase = _PHASES.get(step.rpartition(".")[2])
+        if phase is None:
+            return
+        now = time.perf_counter()
+        if event == "started":
+            if self.queued_at:
+                # Time from handing the request to the client until its
+                # connection starts doing work
+                self.span.add_phase("pool", now - self.queued_at)
+                self.queued_at = 0.0
+            self.started[phase] = now
+        elif phase in self.started:
+            self.span.add_phase(phase, now - self.started.pop(phase))
+
+
+class Tracer:
+    """Create spans and hand finished ones to exporters
+
+    Args:
+        enabled: Record spans at all; when off, ``span`` yields ``None``
+        exporters: Objects with an ``export(span)`` method
+        otel: Mirror spans to OpenTelemetry through ``opentelemetry-api``
+    """
+
+    def __init__(self, enabled: bool = True, exporters: Optional[List[Any]] = None, otel: bool = False):
+        self.enabled = enabled
+        self.exporters: List[Any] = list(exporters or [])
+        self.otel = otel
+        # Looked up on the first span, so importing the API doesn't slow startup
+        self._otel = None
+        if otel and importlib.util.find_spec("opentelemetry") is None:
+            raise RuntimeError(
+                "BREATHE_HR_TRACING_OTEL is enabled but 'opentelemetry-api' is not installed. "
+                "Install it with: pip install 'breathe-hr-mcp[tracing]'"
+            )
+
+    @classmethod
+    def from_env(cls) -> "Tracer":
+        """Build a tracer and slow-call log from ``BREATHE_HR_TRACING*``/``BREATHE_HR_SLOW_CALL_*``"""
+        exporters = []
+        capacity = env_int("BREATHE_HR_SLOW_CALL_LOG_SIZE", 100)
+        if capacity > 0:
+            exporters.append(
+                SlowCallLog(capacity, threshold=env_float("BREATHE_HR_SLOW_CALL_THRESHOLD", 1.0))
+            )
+        return cls(
+            enabled=env_bool("BREATHE_HR_TRACING", False),
+            exporters=exporters,
+            otel=env_bool("BREATHE_HR_TRACING_OTEL", False),
+        )
+
+    @property
+    def slow_calls(self) -> Optional[SlowCallLog]:
+        """The slow-call log among the exporters, if there is one"""
+        for exporter in self.exporters:
+            if isinstance(exporter, SlowCallLog):
+                return exporter
+        return None
+
+    @contextmanager
+    def span(self, name: str, **attributes: Any) -> Iterator[Optional[Span]]:
+        """Time the enclosed block as a child of the current span"""
+        if not self.enabled:
+            yield None
+            return
+        span = Span(name, attributes, _current.get())
+        if self.otel:
+            self._start_otel(span)
+        token = _current.set(span)
+        try:
+            yield span
+        except BaseException as exc:
+            span.status = "error"
+            span.error = f"{type(exc).__name__}: {exc}"
+            raise
+        finally:
+            span.end = time.perf_counter()
+            _current.reset(token)
+            if span.otel is not None:
+                self._end_otel(span)
+            for exporter in self.exporters:
+                exporter.export(span)
+
+    def event_hooks(self) -> Dict[str, List[Any]]:
+        """httpx event hooks that time each request's phases on the current span"""
+        if not self.enabled:
+            return {}
+
+        async def on_request(request: httpx.Request) -> None:
+            span = _current.get()
+            if span is not None:
+                request.extensions["trace"] = _PhaseTimer(span, time.perf_counter())
+
+        async def on_response(response: httpx.Response) -> None:
+            span = _current.get()
+            if span is not None:
+                span.set(http_version=response.http_version)
+
+        return {"request": [on_request], "response": [on_response]}
+
+    def _start_otel(self, span: Span) -> None:
+        from opentelemetry import trace
+
+        if self._otel is None:
+            self._otel = trace.get_tracer("breathe_hr_mcp")
+        parent = span.parent.otel if span.parent is not None else None
+        context = trace.set_span_in_context(parent) if parent is not None else None
+        span.otel = self._otel.start_span(span.name, context=context)
+
+    def _end_otel(self, span: Span) -> None:
+        from opentelemetry.trace import Status, StatusCode
+
+        for key, value in span.attributes.items():
+            if value is not None:
+                primitive = isinstance(value, (str, bool, int, float))
+                span.otel.set_attribute(key, value if primitive else str(value))
+        for phase, seconds in span.phases.items():
+            span.otel.set_attribute(f"phase.{phase}_ms", seconds * 1000)
+        if span.status == "error":
+            span.otel.set_status(Status(StatusCode.ERROR, span.error))
+        span.otel.end()
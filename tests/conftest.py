@@ -0,0 +1,86 @@
+"""Shared test fixtures"""
+
+import pytest
+from unittest.mock import patch
+
+from breathe_hr_mcp import server
+from breathe_hr_mcp.absences import AbsenceStore
+from breathe_hr_mcp.directory import EmployeeDirectory
+from breathe_hr_mcp.ratelimit import RateLimiter
+from breathe_hr_mcp.refresher import BackgroundRefresher
+from breathe_hr_mcp.resilience import CircuitBreaker
+from breathe_hr_mcp.tracing import InMemoryExporter, SlowCallLog, Tracer
+
+
+class FakeTime:
+    """Clock whose sleep advances time instantly instead of blocking"""
+
+    def __init__(self):
+        self.now = 0.0
+        self.slept = []
+
+    def clock(self):
+        return self.now
+
+    async def sleep(self, delay):
+        self.slept.append(delay)
+        self.now += delay
+
+
+@pytest.fixture(autouse=True)
+def reset_response_cache():
+    """Start every test with empty response and validator caches"""
+    server.response_cache.clear()
+    server.upstream_validators.clear()
+    yield
+    server.response_cache.clear()
+    server.upstream_validators.clear()
+
+
+@pytest.fixture(autouse=True)
+def employee_directory():
+    """Give every test its own cold employee directory"""
+    directory = EmployeeDirectory()
+    with patch("breathe_hr_mcp.server.employee_directory", directory):
+        yield directory
+
+
+@pytest.fixture(autouse=True)
+def absence_store():
+    """Give every test its own empty absence store, so absence tools call upstream"""
+    store = AbsenceStore()
+    with patch("breathe_hr_mcp.server.absence_store", store):
+        yield store
+
+
+@pytest.fixture(autouse=True)
+def upstream_limiter():
+    """Give every test its own rate limiter that never really sleeps"""
+    time = FakeTime()
+    limiter = RateLimiter(clock=time.clock, sleep=time.sleep)
+    with patch("breathe_hr_mcp.server.upstream_limiter", limiter):
+        yield limiter
+
+
+@pytest.fixture(autouse=True)
+def reference_data():
+    """Give every test an empty refresher, so reference tools call upstream"""
+    refresher = BackgroundRefresher()
+    with patch("breathe_hr_mcp.server.reference_data", refresher):
+        yield refresher
+
+
+@pytest.fixture(autouse=True)
+def upstream_breaker():
+    """Give every test its own closed circuit breaker"""
+    breaker = CircuitBreaker()
+    with patch("breathe_hr_mcp.server.upstream_breaker", breaker):
+        yield breaker
+
+
+@pytest.fixture(autouse=True)
+def tracer():
+    """Give every test its own tracer, keeping spans in memory and logging every upstream call"""
+    tracer = Tracer(exporters=[InMemoryExporter(), SlowCallLog(threshold=0.0)])
+    with patch("breathe_hr_mcp.server.tracer", tracer):
+        yield tracer
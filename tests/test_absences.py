@@ -0,0 +1,179 @@
+"""Tests for the incrementally synced absence store"""
+
+from datetime import date
+
+import pytest
+
+from breathe_hr_mcp.absences import AbsenceStore
+
+
+def absence(absence_id, employee_id, start, end=None, **fields):
+    return {
+        "id": absence_id,
+        "employee": {"id": employee_id},
+        "start_date": start,
+        "end_date": end or start,
+        "type": "Holiday",
+        "status": "approved",
+        **fields,
+    }
+
+
+class Upstream:
+    """``absences`` endpoint that, like Breathe HR, returns absences wholly inside the range"""
+
+    def __init__(self, records):
+        self.records = list(records)
+        self.ranges = []
+
+    async def request(self, endpoint, params=None):
+        start, end = params["start_date"], params["end_date"]
+        if params["page"] == 1:
+            self.ranges.append((start, end))
+        return {"absences": [
+            record for record in self.records
+            if record["start_date"] >= start and record["end_date"] <= end
+        ]}
+
+
+class Today:
+    def __init__(self, day):
+        self.day = day
+
+    def __call__(self):
+        return self.day
+
+
+@pytest.fixture
+def store():
+    store = AbsenceStore(clock=lambda: 0.0)
+    store.load([
+        absence(1, 10, "2024-03-01", "2024-03-05"),
+        absence(2, 10, "2024-03-20"),
+        absence(3, 11, "2024-02-20", "2024-03-02", type="Sick"),
+        absence(4, 12, "2024-03-04", status="Cancelled"),
+        absence(5, 12, "2024-01-01", "2024-01-31"),
+    ], (date(2024, 1, 1), date(2024, 12, 31)))
+    return store
+
+
+class TestAbsenceStore:
+    """Test the interval index and incremental sync"""
+
+    def test_query_returns_overlapping_absences_in_start_order(self, store):
+        ids = [record["id"] for record in store.query(date(2024, 3, 2), date(2024, 3, 4))]
+        assert ids == [3, 1, 4]
+
+    def test_long_absences_are_found_from_inside(self, store):
+        assert [r["id"] for r in store.query(date(2024, 1, 15), date(2024, 1, 15))] == [5]
+        assert store.query(date(2024, 2, 1), date(2024, 2, 19)) == []
+
+    def test_query_filters(self, store):
+        march = (date(2024, 3, 1), date(2024, 3, 31))
+        assert [r["id"] for r in store.query(*march, employee_id=10)] == [1, 2]
+        assert [r["id"] for r in store.query(*march, absence_type="sick")] == [3]
+        assert [r["id"] for r in store.query(*march, status="cancelled")] == [4]
+
+    def test_upsert_moves_and_remove_drops(self, store):
+        assert store.upsert(absence(2, 10, "2024-04-01"))
+        assert not store.upsert(absence(2, 10, "2024-04-01"))
+        assert [r["id"] for r in store.query(date(2024, 3, 10), date(2024, 4, 30), employee_id=10)] == [2]
+        assert store.remove(1)
+        assert [r["id"] for r in store.query(date(2024, 3, 1), date(2024, 3, 5))] == [3, 4]
+
+    def test_page(self, store):
+        result = store.page(date(2024, 1, 1), date(2024, 12, 31), page=2, per_page=2)
+        assert [r["id"] for r in result["absences"]] == [1, 4]
+        assert result["pagination"] == {"page": 2, "per_page": 2, "total": 5}
+
+    def test_covers_requires_freshness_and_window(self):
+        now = [0.0]
+        store = AbsenceStore(max_age=60, clock=lambda: now[0])
+        assert not store.covers(date(2024, 3, 1), date(2024, 3, 1))
+        store.load([], (date(2024, 1, 1), date(2024, 12, 31)))
+        assert store.covers(date(2024, 3, 1), date(2024, 3, 1))
+        assert not store.covers(date(2023, 12, 31), date(2024, 3, 1))
+        now[0] = 61
+        assert not store.covers(date(2024, 3, 1), date(2024, 3, 1))
+
+    @pytest.mark.asyncio
+    async def test_first_sync_loads_the_window(self):
+        upstream = Upstream([absence(1, 10, "2024-06-01"), absence(2, 10, "2023-01-01")])
+        store = AbsenceStore(past_days=30, future_days=30, today=Today(date(2024, 6, 15)))
+
+        assert await store.sync(upstream.request) == 1
+        # Widened by overlap_days to catch absences crossing the window's edges
+        assert upstream.ranges == [("2024-04-15", "2024-08-15")]
+        assert store.window == (date(2024, 5, 16), date(2024, 7, 15))
+
+    @pytest.mark.asyncio
+    async def test_incremental_sync_applies_changes(self):
+        today = Today(date(2024, 6, 15))
+        upstream = Upstream([
+            absence(1, 10, "2024-05-17"),
+            absence(2, 10, "2024-06-14"),
+            absence(3, 11, "2024-06-20"),
+        ])
+        store = AbsenceStore(past_days=30, future_days=30, chunk_days=10, overlap_days=0, today=today)
+        await store.sync(upstream.request)
+
+        upstream.records = [
+            absence(2, 10, "2024-06-14", status="cancelled"),
+            absence(4, 11, "2024-07-16"),
+        ]
+        upstream.ranges.clear()
+        today.day = date(2024, 6, 16)
+        await store.sync(upstream.request)
+
+        # New day at the end, the weeks around today and one rotating chunk
+        assert upstream.ranges == [
+            ("2024-07-16", "2024-07-16"),
+            ("2024-06-06", "2024-06-26"),
+            ("2024-05-17", "2024-05-26"),
+        ]
+        records = {r["id"]: r for r in store.query(*store.window)}
+        assert sorted(records) == [2, 4]
+        assert records[2]["status"] == "cancelled"
+        assert store.stats()["changes"] == 4
+        assert store.stats()["incremental_syncs"] == 1
+
+    @pytest.mark.asyncio
+    async def test_absences_crossing_a_chunk_edge_survive_resync(self):
+        today = Today(date(2024, 6, 15))
+        crossing = absence(1, 10, "2024-05-25", "2024-05-28")
+        upstream = Upstream([crossing])
+        store = AbsenceStore(past_days=30, future_days=30, chunk_days=10, overlap_days=0, today=today)
+        await store.sync(upstream.request)
+        assert len(store) == 1
+
+        # The rotating chunk ends on 2024-05-25, inside the absence; the fetch
+        # is widened by the longest stored absence so it is still returned
+        upstream.ranges.clear()
+        await store.sync(upstream.request)
+        assert upstream.ranges[-1] == ("2024-05-13", "2024-05-28")
+        assert [r["id"] for r in store.query(date(2024, 5, 26), date(2024, 5, 26))] == [1]
+
+        # Absent from a fetch that did cover it, it is dropped as deleted
+        upstream.records = []
+        await store.sync(upstream.request)
+        assert len(store) == 0
+
+    def test_query_within_matches_the_upstream_filter(self, store):
+        march = (date(2024, 3, 1), date(2024, 3, 31))
+        assert [r["id"] for r in store.query(*march)] == [3, 1, 4, 2]
+        assert [r["id"] for r in store.query(*march, within=True)] == [1, 4, 2]
+
+    @pytest.mark.asyncio
+    async def test_window_slides_past_old_absences(self):
+        today = Today(date(2024, 6, 15))
+        upstream = Upstream([absence(1, 10, "2024-05-16")])
+        store = AbsenceStore(past_days=30, future_days=30, today=today)
+        await store.sync(upstream.request)
+        assert len(store) == 1
+
+        upstream.records = []
+        today.day = date(2024, 6, 20)
+        await store.sync(upstream.request)
+
+        assert len(store) == 0
+        assert store.full_syncs == 1
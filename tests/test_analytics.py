@@ -0,0 +1,62 @@
+"""Tests for the columnar employee analytics"""
+
+from datetime import date
+
+import pytest
+
+from breathe_hr_mcp.analytics import EmployeeColumns
+
+EMPLOYEES = [
+    {"id": 1, "department": {"id": 10, "name": "Engineering"}, "status": "Current employee",
+     "location": {"name": "HQ"}, "employment_type": "full_time", "join_date": "2020-01-15"},
+    {"id": 2, "department": {"id": 10, "name": "Engineering"}, "status": "Former employee",
+     "location": {"name": "HQ"}, "join_date": "2019-05-01", "leaving_date": "2024-02-29"},
+    {"id": 3, "department_id": 20, "status": "Current employee",
+     "location": "Remote", "employment_type": "part_time", "join_date": "2024-03-04"},
+    {"id": 4, "status": "Current employee", "join_date": "2024-01-02"},
+    {"first_name": "No ID"},
+]
+
+
+@pytest.fixture
+def columns():
+    return EmployeeColumns.from_records(EMPLOYEES, departments={20: "Sales"})
+
+
+class TestEmployeeColumns:
+    """Test dictionary encoding, masks and group-by counts"""
+
+    def test_encodes_labels_once(self, columns):
+        assert columns.size == 4
+        assert columns.labels["department"] == ["Engineering", "Sales", "Unassigned"]
+        assert list(columns.codes["department"]) == [0, 0, 1, 2]
+        assert columns.labels["employment_type"] == ["full_time", "Unknown", "part_time"]
+        assert columns.nbytes() == 4 * (8 + 4 + 4 + 2 * 5)
+
+    def test_group_count_orders_largest_first(self, columns):
+        assert columns.group_count(["department"]) == [
+            {"department": "Engineering", "count": 2},
+            {"department": "Sales", "count": 1},
+            {"department": "Unassigned", "count": 1},
+        ]
+        assert columns.group_count([]) == [{"count": 4}]
+
+    def test_filters_combine(self, columns):
+        mask = columns.select({"status": "current EMPLOYEE", "location": "hq"})
+        assert list(mask) == [1, 0, 0, 0]
+        mask = columns.select({"status": "Current employee"}, joined_from=date(2024, 1, 1))
+        assert columns.group_count(["department", "location"], mask) == [
+            {"department": "Sales", "location": "Remote", "count": 1},
+            {"department": "Unassigned", "location": "Unknown", "count": 1},
+        ]
+
+    def test_date_filters(self, columns):
+        assert list(columns.select(left_from=date(2024, 1, 1), left_to=date(2024, 3, 31))) == [0, 1, 0, 0]
+        assert list(columns.select(employed_on=date(2024, 3, 1))) == [1, 0, 0, 1]
+        assert list(columns.select(employed_on=date(2024, 2, 29))) == [1, 1, 0, 1]
+
+    def test_unknown_fields_are_rejected(self, columns):
+        with pytest.raises(ValueError, match="Cannot filter on 'salary'"):
+            columns.select({"salary": "high"})
+        with pytest.raises(ValueError, match="Cannot group by 'salary'"):
+            columns.group_count(["salary"])
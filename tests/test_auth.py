@@ -0,0 +1,143 @@
+"""Tests for hashed API keys and per-key quotas"""
+
+import hashlib
+
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+from breathe_hr_mcp.auth import AuthError, AuthMiddleware, KeyRing
+from tests.conftest import FakeTime
+
+
+class TestKeyRing:
+    """Test key parsing, lookup and quotas"""
+
+    def test_parse_plain_and_hashed_keys(self):
+        digest = hashlib.sha256(b"bob-secret").hexdigest()
+        keyring = KeyRing.parse(f"alice:alice-secret, bob:sha256:{digest}", single_key="legacy")
+
+        assert len(keyring) == 3
+        assert keyring.authenticate("Bearer alice-secret").name == "alice"
+        assert keyring.authenticate("Bearer bob-secret").name == "bob"
+        assert keyring.authenticate("Bearer legacy").name == "default"
+
+    def test_parse_rejects_bad_entries(self):
+        with pytest.raises(ValueError, match="expected name:key"):
+            KeyRing.parse("alice")
+        with pytest.raises(ValueError, match="64 hex characters"):
+            KeyRing.parse("alice:sha256:abc")
+        with pytest.raises(ValueError, match="Duplicate"):
+            KeyRing.parse("alice:one,alice:two")
+        with pytest.raises(ValueError, match="duplicates another key"):
+            KeyRing.parse("alice:same,bob:same")
+
+    def test_authenticate_rejects_unknown_keys(self):
+        keyring = KeyRing.parse("alice:secret")
+
+        for header in (None, "Basic secret", "Bearer wrong"):
+            with pytest.raises(AuthError) as exc:
+                keyring.authenticate(header)
+            assert exc.value.status == 401
+            assert exc.value.headers == {"WWW-Authenticate": "Bearer"}
+        assert keyring.unauthorized == 3
+
+    def test_concurrency_quota_is_per_key(self):
+        keyring = KeyRing.parse("alice:a,bob:b", concurrency=2)
+        alice = keyring.authenticate("Bearer a")
+        bob = keyring.authenticate("Bearer b")
+
+        keyring.acquire(alice)
+        keyring.acquire(alice)
+        with pytest.raises(AuthError) as exc:
+            keyring.acquire(alice)
+        assert exc.value.status == 429
+        keyring.acquire(bob)
+
+        keyring.release(alice)
+        keyring.acquire(alice)
+        assert keyring.stats()["alice"] == {"in_flight": 2, "streams": 0, "requests": 3, "rejected": 1}
+
+    def test_rate_quota_refills(self):
+        time = FakeTime()
+        keyring = KeyRing.parse("alice:a", rate=2, burst=2, clock=time.clock)
+        alice = keyring.authenticate("Bearer a")
+
+        for _ in range(2):
+            keyring.acquire(alice)
+            keyring.release(alice)
+        with pytest.raises(AuthError) as exc:
+            keyring.acquire(alice)
+        assert exc.value.headers == {"Retry-After": "1"}
+
+        time.now += 0.5
+        keyring.acquire(alice)
+
+
+class TestAuthMiddleware:
+    """Test the middleware attaches principals and maps errors to responses"""
+
+    @pytest.fixture
+    def keyring(self):
+        return KeyRing.parse("alice:secret", concurrency=1)
+
+    @pytest.fixture
+    def client(self, keyring):
+        app = FastAPI()
+        app.add_middleware(AuthMiddleware, keyring=keyring)
+
+        @app.get("/mcp/whoami")
+        async def whoami(request: Request):
+            return {"name": request.state.principal.name, "in_flight": request.state.principal.in_flight}
+
+        @app.get("/mcp/stream")
+        async def stream(request: Request):
+            async def chunks():
+                for _ in range(3):
+                    yield f"{request.state.principal.in_flight}\n"
+            return StreamingResponse(chunks(), media_type="text/event-stream")
+
+        @app.get("/")
+        async def health():
+            return {"status": "ok"}
+
+        return TestClient(app)
+
+    def test_valid_key_sets_principal(self, client):
+        response = client.get("/mcp/whoami", headers={"Authorization": "Bearer secret"})
+        assert response.json() == {"name": "alice", "in_flight": 1}
+        # The slot is released after each request
+        response = client.get("/mcp/whoami", headers={"Authorization": "Bearer secret"})
+        assert response.status_code == 200
+
+    def test_errors_become_responses(self, client):
+        response = client.get("/mcp/whoami", headers={"Authorization": "Bearer wrong"})
+        assert response.status_code == 401
+        assert response.headers["www-authenticate"] == "Bearer"
+        assert client.get("/").status_code == 200
+
+    def test_slot_is_held_for_the_whole_stream(self, client, keyring):
+        with client.stream("GET", "/mcp/stream", headers={"Authorization": "Bearer secret"}) as response:
+            assert list(response.iter_lines()) == ["1", "1", "1"]
+        assert keyring.stats()["alice"]["in_flight"] == 0
+
+    def test_event_streams_take_no_slot(self, client, keyring):
+        headers = {"Authorization": "Bearer secret", "Accept": "text/event-stream"}
+        with client.stream("GET", "/mcp/stream", headers=headers) as response:
+            assert list(response.iter_lines()) == ["0", "0", "0"]
+        assert keyring.stats()["alice"] == {"in_flight": 0, "streams": 0, "requests": 1, "rejected": 0}
+
+        # An open stream leaves the one concurrency slot free for requests
+        principal = keyring.authenticate("Bearer secret")
+        keyring.acquire(principal, stream=True)
+        assert keyring.stats()["alice"]["streams"] == 1
+        assert client.get("/mcp/whoami", headers={"Authorization": "Bearer secret"}).status_code == 200
+
+    def test_quota_rejection(self, client, keyring):
+        principal = keyring.authenticate("Bearer secret")
+        keyring.acquire(principal)
+        response = client.get("/mcp/whoami", headers={"Authorization": "Bearer secret"})
+        assert response.status_code == 429
+        assert response.headers["retry-after"] == "1"
+        assert response.json() == {"detail": "Too many concurrent requests for this API key"}
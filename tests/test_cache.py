@@ -0,0 +1,89 @@
+"""Tests for the response cache"""
+
+from breathe_hr_mcp.cache import ResponseCache, endpoint_pattern, make_key
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestKeys:
+    """Test endpoint and parameter normalization"""
+
+    def test_endpoint_pattern(self):
+        assert endpoint_pattern("employees/42") == "employees/{id}"
+        assert endpoint_pattern("/employees/42/absences") == "employees/{id}/absences"
+        assert endpoint_pattern("employees/search") == "employees/search"
+
+    def test_make_key_ignores_order_and_none(self):
+        assert make_key("employees", {"page": 1, "status": None, "per_page": 50}) == \
+            make_key("/employees", {"per_page": "50", "page": "1"})
+
+
+class TestResponseCache:
+    """Test TTL expiry, LRU eviction and invalidation"""
+
+    def test_hit_and_miss_counters(self):
+        cache = ResponseCache()
+        assert cache.get("departments") is None
+        cache.set("departments", None, {"departments": []})
+        assert cache.get("departments") == {"departments": []}
+        stats = cache.stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["hit_ratio"] == 0.5
+
+    def test_ttl_expiry(self):
+        clock = FakeClock()
+        cache = ResponseCache(ttls={"account": 10.0}, clock=clock)
+        cache.set("account", None, {"name": "Acme"})
+        clock.now = 9.9
+        assert cache.get("account") == {"name": "Acme"}
+        clock.now = 10.0
+        assert cache.get("account") is None
+        assert len(cache) == 0
+
+    def test_uncacheable_endpoint(self):
+        cache = ResponseCache()
+        cache.set("widgets", None, {"id": 1})
+        assert not cache.is_cacheable("widgets")
+        assert len(cache) == 0
+
+    def test_lru_eviction_by_entries(self):
+        cache = ResponseCache(max_entries=2)
+        cache.set("employees/1", None, {"id": 1})
+        cache.set("employees/2", None, {"id": 2})
+        cache.get("employees/1")
+        cache.set("employees/3", None, {"id": 3})
+        assert cache.get("employees/2") is None
+        assert cache.get("employees/1") == {"id": 1}
+        assert cache.stats()["evictions"] == 1
+
+    def test_lru_eviction_by_bytes(self):
+        cache = ResponseCache(max_bytes=40)
+        cache.set("employees/1", None, {"name": "x" * 10})
+        cache.set("employees/2", None, {"name": "y" * 10})
+        assert len(cache) == 1
+        assert cache.get("employees/2") is not None
+        assert cache.stats()["bytes"] <= 40
+
+    def test_invalidate_nested(self):
+        cache = ResponseCache()
+        cache.set("employees/42", None, {"id": 42})
+        cache.set("employees/42/absences", {"employee_id": 42}, {"absences": []})
+        cache.set("employees/420", None, {"id": 420})
+        assert cache.invalidate("employees/42") == 2
+        assert cache.get("employees/420") == {"id": 420}
+
+    def test_set_skips_values_fetched_before_invalidation(self):
+        cache = ResponseCache()
+        generation = cache.generation
+        cache.invalidate("absences")
+        cache.set("absences", None, {"absences": ["old"]}, generation=generation)
+        assert cache.get("absences") is None
+        cache.set("absences", None, {"absences": ["new"]}, generation=cache.generation)
+        assert cache.get("absences") == {"absences": ["new"]}
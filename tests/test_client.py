@@ -0,0 +1,122 @@
+"""Tests for the shared Breathe HR HTTP client"""
+
+import socket
+import threading
+import time
+
+import httpx
+import pytest
+import uvicorn
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+from unittest.mock import patch
+
+from breathe_hr_mcp import server
+from breathe_hr_mcp.client import ClientSettings, create_http_client
+
+
+class StandInBreatheHR:
+    """Minimal local stand-in for the Breathe HR API that records client sockets"""
+
+    def __init__(self):
+        self.peers = []
+
+        async def employees(request):
+            self.peers.append(request.scope["client"])
+            return JSONResponse({"employees": [{"id": 1}]})
+
+        app = Starlette(routes=[Route("/v1/employees", employees)])
+        sock = socket.socket()
+        sock.bind(("127.0.0.1", 0))
+        self.port = sock.getsockname()[1]
+        sock.close()
+        self.server = uvicorn.Server(
+            uvicorn.Config(app, host="127.0.0.1", port=self.port, log_level="error")
+        )
+        self.thread = threading.Thread(target=self.server.run, daemon=True)
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.port}/v1"
+
+    def __enter__(self):
+        self.thread.start()
+        deadline = time.monotonic() + 5
+        while not self.server.started:
+            if time.monotonic() > deadline:
+                raise RuntimeError("Stand-in server failed to start")
+            time.sleep(0.01)
+        return self
+
+    def __exit__(self, *exc):
+        self.server.should_exit = True
+        self.thread.join(timeout=5)
+
+
+@pytest.fixture
+def breathe_api():
+    with StandInBreatheHR() as api:
+        with patch("breathe_hr_mcp.server.BREATHE_HR_API_KEY", "test_api_key"):
+            with patch("breathe_hr_mcp.server.BREATHE_HR_BASE_URL", api.base_url):
+                yield api
+
+
+class TestClientSettings:
+    """Test pool configuration"""
+
+    def test_defaults(self):
+        settings = ClientSettings.from_env()
+        assert settings.max_connections == 20
+        assert settings.http2 is False
+
+    def test_from_env(self):
+        with patch.dict("os.environ", {
+            "BREATHE_HR_MAX_CONNECTIONS": "5",
+            "BREATHE_HR_MAX_KEEPALIVE_CONNECTIONS": "2",
+            "BREATHE_HR_KEEPALIVE_EXPIRY": "10",
+            "BREATHE_HR_TIMEOUT": "12.5",
+        }):
+            settings = ClientSettings.from_env()
+        assert settings.max_connections == 5
+        assert settings.max_keepalive_connections == 2
+        assert settings.keepalive_expiry == 10.0
+        assert settings.timeout == 12.5
+
+    @pytest.mark.asyncio
+    async def test_create_http_client(self):
+        client = create_http_client(ClientSettings(timeout=7.0, connect_timeout=2.0))
+        try:
+            assert isinstance(client, httpx.AsyncClient)
+            assert client.timeout.read == 7.0
+            assert client.timeout.connect == 2.0
+        finally:
+            await client.aclose()
+
+
+class TestSharedClient:
+    """Test that the shared client is reused across upstream calls"""
+
+    @pytest.mark.asyncio
+    async def test_connections_are_reused(self, breathe_api):
+        """Sequential calls should travel over a single kept-alive connection"""
+        await server.close_http_client()
+        try:
+            for page in range(5):
+                result = await server.breathe_hr_request("employees", params={"page": page})
+                assert result == {"employees": [{"id": 1}]}
+        finally:
+            await server.close_http_client()
+
+        assert len(breathe_api.peers) == 5
+        assert len(set(breathe_api.peers)) == 1
+
+    @pytest.mark.asyncio
+    async def test_lifespan_opens_and_closes_client(self):
+        await server.close_http_client()
+        async with server.lifespan(server.mcp):
+            client = server.get_http_client()
+            assert server.get_http_client() is client
+            assert not client.is_closed
+        assert client.is_closed
+        assert server._http_client is None
@@ -0,0 +1,40 @@
+"""Tests for conditional GET validators"""
+
+from breathe_hr_mcp.conditional import ValidatorCache
+
+
+class TestValidatorCache:
+    """Test validator storage, 304 accounting and eviction"""
+
+    def test_only_responses_with_validators_are_stored(self):
+        cache = ValidatorCache()
+        assert not cache.store("a", {}, {"x": 1})
+        assert cache.headers_for("a") == {}
+        assert cache.store("a", {"ETag": '"v1"', "Last-Modified": "Mon"}, {"x": 1})
+        assert cache.headers_for("a") == {"If-None-Match": '"v1"', "If-Modified-Since": "Mon"}
+
+    def test_revalidated_counts_hits_and_bytes(self):
+        cache = ValidatorCache()
+        body = {"employees": []}
+        cache.store("a", {"ETag": '"v1"'}, body, size=500)
+        cache.headers_for("a")
+        cache.headers_for("a")
+        assert cache.revalidated("a").body is body
+        assert cache.revalidated("missing") is None
+
+        stats = cache.stats()
+        assert stats["conditional_requests"] == 2
+        assert stats["not_modified"] == 1
+        assert stats["bytes_saved"] == 500
+        assert stats["hit_ratio"] == 0.5
+
+    def test_least_recently_used_is_evicted(self):
+        cache = ValidatorCache(max_entries=2)
+        for key in "abc":
+            cache.store(key, {"ETag": key}, key)
+        assert len(cache) == 2
+        assert cache.headers_for("a") == {}
+
+    def test_disabled(self):
+        cache = ValidatorCache(max_entries=0)
+        assert not cache.store("a", {"ETag": '"v1"'}, {})
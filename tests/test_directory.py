@@ -0,0 +1,114 @@
+"""Tests for the local employee directory index"""
+
+import pytest
+
+from breathe_hr_mcp.directory import EmployeeDirectory, record_tokens
+
+EMPLOYEES = [
+    {"id": 1, "first_name": "Sarah", "last_name": "Connor", "email": "sarah.connor@example.com",
+     "department": {"id": 10, "name": "Engineering"}},
+    {"id": 2, "first_name": "Sarah", "last_name": "Baker", "email": "sbaker@example.com",
+     "department": {"id": 20, "name": "Sales"}},
+    {"id": 3, "first_name": "John", "last_name": "Sarahson", "email": "john@example.com",
+     "department": "Engineering"},
+]
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def directory():
+    directory = EmployeeDirectory()
+    directory.load(EMPLOYEES)
+    return directory
+
+
+class TestEmployeeDirectory:
+    """Test token indexing and prefix search"""
+
+    def test_record_tokens(self):
+        tokens = record_tokens(EMPLOYEES[0])
+        assert {"sarah", "connor", "engineering", "1", "sarah.connor@example.com"} <= tokens
+
+    def test_search_by_prefix(self, directory):
+        ids = [record["id"] for record in directory.search("sar")]
+        assert sorted(ids) == [1, 2, 3]
+
+    def test_exact_matches_rank_first(self, directory):
+        ids = [record["id"] for record in directory.search("sarah")]
+        assert ids == [2, 1, 3]
+
+    def test_all_terms_must_match(self, directory):
+        assert [r["id"] for r in directory.search("sarah eng")] == [1, 3]
+        assert [r["id"] for r in directory.search("sarah sales")] == [2]
+        assert directory.search("sarah marketing") == []
+
+    def test_search_by_email_and_id(self, directory):
+        assert [r["id"] for r in directory.search("sbaker@example.com")] == [2]
+        assert [r["id"] for r in directory.search("3")] == [3]
+
+    def test_search_page(self, directory):
+        result = directory.search_page("sarah", page=2, per_page=2)
+        assert [r["id"] for r in result["employees"]] == [3]
+        assert result["pagination"]["total"] == 3
+
+    def test_upsert_reindexes(self, directory):
+        directory.upsert({"id": 2, "first_name": "Sara", "last_name": "Baker-Smith"})
+        assert [r["id"] for r in directory.search("smith")] == [2]
+        assert 2 not in [r["id"] for r in directory.search("sales")]
+        assert directory.get(2)["first_name"] == "Sara"
+
+    def test_load_records_changed_ids(self, directory):
+        assert directory.changed == {1, 2, 3}
+        directory.load([EMPLOYEES[0], {**EMPLOYEES[1], "last_name": "Baker-Smith"}])
+        assert directory.changed == {2, 3}
+        directory.load([EMPLOYEES[0], {**EMPLOYEES[1], "last_name": "Baker-Smith"}])
+        assert directory.changed == set()
+
+    def test_detailed_records_are_not_changes(self, directory):
+        # get_employee upserts the fuller record from employees/{id}
+        directory.upsert({**EMPLOYEES[0], "salary": {"amount": 1}, "address": "1 High St"})
+        directory.load(EMPLOYEES)
+        assert directory.changed == set()
+
+    def test_freshness(self):
+        clock = FakeClock()
+        directory = EmployeeDirectory(max_age=60, clock=clock)
+        assert not directory.is_fresh()
+        directory.load(EMPLOYEES)
+        assert directory.is_fresh()
+        clock.now = 61
+        assert not directory.is_fresh()
+
+    def test_restored_snapshot_is_served_until_max_stale(self):
+        clock = FakeClock()
+        clock.now = 1000
+        directory = EmployeeDirectory(max_age=60, clock=clock, max_stale=3600)
+        directory.restore(EMPLOYEES, age=600)
+        assert directory.age == 600
+        assert directory.is_fresh()
+        clock.now = 1000 + 3001
+        assert not directory.is_fresh()
+
+        # A real sync replaces the snapshot and the normal max_age applies again
+        directory.load(EMPLOYEES)
+        assert not directory.restored
+        clock.now += 61
+        assert not directory.is_fresh()
+
+    @pytest.mark.asyncio
+    async def test_sync(self):
+        directory = EmployeeDirectory()
+
+        async def request(endpoint, params=None):
+            return {"employees": EMPLOYEES, "pagination": {"total": 3}}
+
+        assert await directory.sync(request) == 3
+        assert directory.get(1)["last_name"] == "Connor"
+        assert directory.is_fresh()
@@ -0,0 +1,57 @@
+"""Tests for the pluggable JSON codec"""
+
+from datetime import date
+
+import pytest
+
+from breathe_hr_mcp import jsoncodec
+
+
+@pytest.fixture(params=list(jsoncodec.available_backends()))
+def codec(request):
+    return jsoncodec.available_backends()[request.param]
+
+
+class TestCodec:
+    """Test that every backend behaves the same"""
+
+    def test_round_trip_from_bytes(self, codec):
+        loads, dumps = codec
+        value = {"employees": [{"id": 1, "name": "Zoë", "ratio": 0.5, "tags": [], "x": None}]}
+        encoded = dumps(value)
+        assert isinstance(encoded, bytes)
+        assert loads(encoded) == value
+        assert loads(encoded.decode()) == value
+
+    def test_unknown_types_are_stringified(self, codec):
+        loads, dumps = codec
+        assert loads(dumps({"day": date(2024, 1, 2)})) == {"day": "2024-01-02"}
+
+    def test_invalid_json_raises_value_error(self, codec):
+        loads, _ = codec
+        with pytest.raises(ValueError):
+            loads(b"{not json")
+
+    def test_unknown_backend(self):
+        with pytest.raises(RuntimeError, match="not available"):
+            jsoncodec.select_backend("simdjson")
+
+    def test_auto_prefers_fastest(self):
+        name, _ = jsoncodec.select_backend("auto")
+        assert name == next(iter(jsoncodec.available_backends()))
+
+
+class TestExcerpt:
+    """Test bounded error excerpts"""
+
+    def test_short_body_is_unchanged(self):
+        assert jsoncodec.excerpt(b"Bad gateway") == "Bad gateway"
+
+    def test_long_body_is_truncated(self):
+        text = jsoncodec.excerpt(b"x" * 10_000, limit=100)
+        assert text.startswith("x" * 100)
+        assert text.endswith("... (10000 bytes)")
+        assert len(text) < 150
+
+    def test_split_multibyte_character(self):
+        assert jsoncodec.excerpt("é".encode() * 3, limit=3) == "é�... (6 bytes)"
@@ -0,0 +1,99 @@
+"""Tests for bulk leave request validation and overlap detection"""
+
+from datetime import date
+
+import pytest
+
+from breathe_hr_mcp.leave import LeaveRequest, find_conflicts, parse_leave_request
+
+
+def item(**overrides):
+    base = {
+        "employee_id": 1,
+        "start_date": "2024-07-01",
+        "end_date": "2024-07-05",
+        "absence_type": "holiday",
+    }
+    base.update(overrides)
+    return base
+
+
+class TestParseLeaveRequest:
+    """Test per-item validation"""
+
+    def test_valid_item(self):
+        request = parse_leave_request(item(reason="Summer"))
+        assert request == LeaveRequest(1, date(2024, 7, 1), date(2024, 7, 5), "holiday", "Summer")
+        assert request.payload() == {
+            "employee_id": 1,
+            "start_date": "2024-07-01",
+            "end_date": "2024-07-05",
+            "type": "holiday",
+            "half_day": False,
+            "reason": "Summer",
+        }
+
+    def test_half_day(self):
+        request = parse_leave_request(
+            item(end_date="2024-07-01", half_day=True, half_day_period="morning")
+        )
+        assert request.payload()["half_day_period"] == "morning"
+
+    @pytest.mark.parametrize("overrides, message", [
+        ({"employee_id": "abc"}, "employee_id must be an integer"),
+        ({"start_date": "01/07/2024"}, "start_date must be a date"),
+        ({"end_date": "2024-02-30"}, "end_date must be a date"),
+        ({"end_date": "2024-06-30"}, "end_date must not be before start_date"),
+        ({"absence_type": " "}, "absence_type is required"),
+        ({"half_day": "yes"}, "half_day must be true or false"),
+        ({"half_day": True, "half_day_period": "morning"}, "same date"),
+        ({"end_date": "2024-07-01", "half_day": True}, "half_day_period must be"),
+        ({"half_day_period": "afternoon"}, "only allowed when half_day is true"),
+    ])
+    def test_invalid_items(self, overrides, message):
+        with pytest.raises(ValueError, match=message):
+            parse_leave_request(item(**overrides))
+
+
+class TestFindConflicts:
+    """Test overlap detection within a batch and against existing absences"""
+
+    def test_overlap_with_existing_absence(self):
+        requests = {0: parse_leave_request(item()), 1: parse_leave_request(item(employee_id=2))}
+        existing = [
+            {"id": 9, "employee": {"id": 1}, "start_date": "2024-07-05", "end_date": "2024-07-09"},
+            {"id": 10, "employee_id": 2, "start_date": "2024-07-01", "status": "cancelled"},
+        ]
+
+        assert find_conflicts(requests, existing) == {
+            0: "Overlaps existing absence 9 (2024-07-05 to 2024-07-09)"
+        }
+
+    def test_overlap_within_batch(self):
+        requests = {
+            0: parse_leave_request(item()),
+            1: parse_leave_request(item(start_date="2024-07-04", end_date="2024-07-10")),
+            2: parse_leave_request(item(start_date="2024-07-06", end_date="2024-07-10")),
+        }
+
+        assert find_conflicts(requests, []) == {1: "Overlaps item 0 (2024-07-01 to 2024-07-05)"}
+
+    def test_morning_and_afternoon_do_not_overlap(self):
+        day = {"start_date": "2024-07-01", "end_date": "2024-07-01", "half_day": True}
+        requests = {
+            0: parse_leave_request(item(**day, half_day_period="morning")),
+            1: parse_leave_request(item(**day, half_day_period="afternoon")),
+            2: parse_leave_request(item(**day, half_day_period="afternoon")),
+        }
+
+        assert list(find_conflicts(requests, [])) == [2]
+
+    def test_existing_half_day_without_period_blocks_the_day(self):
+        requests = {
+            0: parse_leave_request(
+                item(end_date="2024-07-01", half_day=True, half_day_period="morning")
+            )
+        }
+        existing = [{"employee_id": 1, "start_date": "2024-07-01", "half_day": True}]
+
+        assert list(find_conflicts(requests, existing)) == [0]
@@ -0,0 +1,60 @@
+"""Tests for the Prometheus-style metrics registry"""
+
+import pytest
+
+from breathe_hr_mcp.metrics import Registry
+
+
+class TestRegistry:
+    """Test metric recording and text exposition"""
+
+    def test_counter_and_gauge(self):
+        registry = Registry()
+        calls = registry.counter("calls_total", "Calls", ["tool"])
+        running = registry.gauge("running", "Running calls")
+
+        calls.inc(tool="a")
+        calls.inc(2, tool="a")
+        running.inc()
+        running.inc()
+        running.dec()
+
+        assert calls.value(tool="a") == 3
+        text = registry.render()
+        assert "# TYPE calls_total counter" in text
+        assert 'calls_total{tool="a"} 3' in text
+        assert "running 1" in text
+
+    def test_histogram_buckets_are_cumulative(self):
+        registry = Registry()
+        latency = registry.histogram("latency_seconds", "Latency", ["endpoint"], buckets=[0.1, 1.0])
+
+        for value in (0.05, 0.5, 0.7, 3.0):
+            latency.observe(value, endpoint="employees")
+
+        text = registry.render()
+        assert 'latency_seconds_bucket{endpoint="employees",le="0.1"} 1' in text
+        assert 'latency_seconds_bucket{endpoint="employees",le="1"} 3' in text
+        assert 'latency_seconds_bucket{endpoint="employees",le="+Inf"} 4' in text
+        assert 'latency_seconds_count{endpoint="employees"} 4' in text
+        assert 'latency_seconds_sum{endpoint="employees"} 4.25' in text
+        assert latency.count(endpoint="employees") == 4
+
+    def test_label_values_are_escaped(self):
+        registry = Registry()
+        errors = registry.counter("errors_total", "Errors", ["reason"])
+        errors.inc(reason='bad "quote"\n')
+        assert 'errors_total{reason="bad \\"quote\\"\\n"} 1' in registry.render()
+
+    def test_undeclared_labels_are_rejected(self):
+        registry = Registry()
+        age = registry.gauge("age_seconds", "Age")
+        with pytest.raises(ValueError, match="dataset"):
+            age.set(5, dataset="departments")
+
+    def test_collectors_run_at_render_and_failures_are_ignored(self):
+        registry = Registry()
+        size = registry.gauge("size", "Size")
+        registry.add_collector(lambda: size.set(7))
+        registry.add_collector(lambda: 1 / 0)
+        assert "size 7" in registry.render()
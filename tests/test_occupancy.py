@@ -0,0 +1,114 @@
+"""Tests for absence aggregation"""
+
+import random
+import time
+from datetime import date, timedelta
+
+from breathe_hr_mcp.occupancy import (
+    absence_totals,
+    clip_intervals,
+    daily_counts,
+    team_calendar,
+    who_is_out,
+)
+
+EMPLOYEES = {
+    1: {"id": 1, "first_name": "Ann", "last_name": "Lee", "department": {"id": 10, "name": "Engineering"}},
+    2: {"id": 2, "first_name": "Bob", "last_name": "Ray", "department_id": 20},
+    3: {"id": 3, "first_name": "Cat", "last_name": "Fox", "department": {"id": 10, "name": "Engineering"}},
+}
+DEPARTMENTS = {10: "Engineering", 20: "Sales"}
+
+# Monday 2024-03-04 .. Sunday 2024-03-10
+START, END = date(2024, 3, 4), date(2024, 3, 10)
+
+ABSENCES = [
+    {"employee": {"id": 1}, "start_date": "2024-03-01", "end_date": "2024-03-05", "type": "holiday"},
+    {"employee_id": 2, "start_date": "2024-03-05", "end_date": "2024-03-05", "type": "sick", "half_day": True},
+    {"employee_id": 3, "start_date": "2024-03-08", "end_date": "2024-03-12", "type": "holiday"},
+    {"employee_id": 3, "start_date": "2024-03-06", "end_date": "2024-03-06", "status": "cancelled"},
+    {"employee_id": 1, "start_date": "2024-04-01", "end_date": "2024-04-02"},
+]
+
+
+class TestIntervals:
+    """Test clipping and difference-array counting"""
+
+    def test_clip_intervals(self):
+        intervals = [(eid, lo, hi, weight) for eid, lo, hi, weight, _ in clip_intervals(ABSENCES, START, END)]
+        assert intervals == [(1, 0, 1, 1.0), (2, 1, 1, 0.5), (3, 4, 6, 1.0)]
+
+    def test_daily_counts(self):
+        counts = daily_counts(clip_intervals(ABSENCES, START, END), 7)
+        assert counts["all"] == [1.0, 1.5, 0.0, 0.0, 1.0, 1.0, 1.0]
+
+
+class TestReports:
+    """Test the aggregated reports"""
+
+    def test_team_calendar(self):
+        result = team_calendar(ABSENCES, EMPLOYEES, DEPARTMENTS, START, END)
+        assert [day["date"] for day in result["days"]] == [
+            "2024-03-04", "2024-03-05", "2024-03-06", "2024-03-07", "2024-03-08"
+        ]
+        assert result["days"][1]["by_department"] == {"Engineering": 1.0, "Sales": 0.5}
+        engineering = result["departments"]["Engineering"]
+        assert engineering["headcount"] == 2
+        assert engineering["absence_days"] == 3.0
+        assert engineering["average_occupancy"] == 0.7
+
+    def test_team_calendar_department_filter(self):
+        result = team_calendar(ABSENCES, EMPLOYEES, DEPARTMENTS, START, END, department="sales")
+        assert list(result["departments"]) == ["Sales"]
+
+    def test_team_calendar_includes_departments_with_nobody_off(self):
+        employees = {**EMPLOYEES, 4: {"id": 4, "department_id": 30}}
+        departments = {**DEPARTMENTS, 30: "Support"}
+        result = team_calendar(ABSENCES, employees, departments, START, END)
+        assert result["departments"]["Support"] == {
+            "headcount": 1, "absence_days": 0.0, "peak_off": 0.0, "average_occupancy": 1.0,
+        }
+
+        result = team_calendar(ABSENCES, employees, departments, START, END, department="support")
+        assert list(result["departments"]) == ["Support"]
+        assert all(day["off"] == 0 for day in result["days"])
+
+    def test_who_is_out(self):
+        result = who_is_out(ABSENCES, EMPLOYEES, DEPARTMENTS, date(2024, 3, 5), date(2024, 3, 5))
+        assert [(e["employee_id"], e["department"]) for e in result["employees"]] == [
+            (1, "Engineering"), (2, "Sales")
+        ]
+        assert result["employees"][0]["absences"][0] == {
+            "from": "2024-03-05", "to": "2024-03-05", "type": "holiday", "half_day": False
+        }
+
+    def test_absence_totals_skip_weekends(self):
+        result = absence_totals(ABSENCES, EMPLOYEES, DEPARTMENTS, START, END)
+        totals = {row["employee_id"]: row["by_type"] for row in result["employees"]}
+        assert totals == {1: {"holiday": 2.0}, 2: {"sick": 0.5}, 3: {"holiday": 1.0}}
+
+    def test_full_year_scales(self):
+        rng = random.Random(0)
+        start, end = date(2024, 1, 1), date(2024, 12, 31)
+        employees = {
+            i: {"id": i, "first_name": f"E{i}", "department": {"name": f"Dept {i % 40}"}}
+            for i in range(5000)
+        }
+        absences = []
+        for _ in range(30000):
+            first = start + timedelta(days=rng.randrange(366))
+            absences.append({
+                "employee_id": rng.randrange(5000),
+                "start_date": first.isoformat(),
+                "end_date": (first + timedelta(days=rng.randrange(10))).isoformat(),
+                "type": "holiday",
+            })
+
+        began = time.perf_counter()
+        calendar = team_calendar(absences, employees, {}, start, end)
+        totals = absence_totals(absences, employees, {}, start, end)
+        elapsed = time.perf_counter() - began
+
+        assert len(calendar["departments"]) == 40
+        assert totals["employees"]
+        assert elapsed < 1.0
@@ -0,0 +1,159 @@
+"""Tests for server-side auto-pagination"""
+
+import asyncio
+
+import pytest
+
+import httpx
+
+from breathe_hr_mcp.pagination import (
+    clamp_max_records,
+    fetch_all,
+    pagination_from_headers,
+    paginate,
+    total_pages,
+)
+
+
+class FakeListEndpoint:
+    """Serves ``total`` numbered records in pages, tracking concurrency"""
+
+    def __init__(self, total, report_total=True, delay=0.0):
+        self.total = total
+        self.report_total = report_total
+        self.delay = delay
+        self.pages_requested = []
+        self.active = 0
+        self.max_active = 0
+
+    async def __call__(self, endpoint, params=None):
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        try:
+            await asyncio.sleep(self.delay)
+            page, per_page = params["page"], params["per_page"]
+            self.pages_requested.append(page)
+            start = (page - 1) * per_page
+            body = {"employees": [{"id": i} for i in range(start, min(start + per_page, self.total))]}
+            if self.report_total:
+                body["pagination"] = {"page": page, "per_page": per_page, "total": self.total}
+            return body
+        finally:
+            self.active -= 1
+
+
+class TestPaginationHeaders:
+    """Test reading page totals from upstream response headers"""
+
+    def test_total_and_per_page(self):
+        headers = httpx.Headers({"Total": "250", "Per-Page": "100"})
+        assert pagination_from_headers(headers, {"page": 2}) == {
+            "total": 250, "per_page": 100, "total_pages": 3, "page": 2
+        }
+
+    def test_link_last(self):
+        headers = httpx.Headers({
+            "Link": '<https://api.breathehr.com/v1/employees?page=2&per_page=100>; rel="next", '
+                    '<https://api.breathehr.com/v1/employees?page=7&per_page=100>; rel="last"'
+        })
+        assert pagination_from_headers(headers)["total_pages"] == 7
+
+    def test_total_uses_requested_page_size(self):
+        headers = httpx.Headers({"X-Total-Count": "120"})
+        assert pagination_from_headers(headers, {"page": 1, "per_page": 50})["total_pages"] == 3
+
+    def test_no_pagination_headers(self):
+        assert pagination_from_headers(httpx.Headers({"Content-Type": "application/json"})) is None
+        assert pagination_from_headers(None) is None
+
+
+class TestPaginate:
+    """Test the paginating async generator"""
+
+    def test_total_pages(self):
+        assert total_pages({"pagination": {"total": 250}}, 100) == 3
+        assert total_pages({"pagination": {"total_pages": 7}}, 100) == 7
+        assert total_pages({"employees": []}, 100) is None
+
+    @pytest.mark.asyncio
+    async def test_yields_pages_in_order(self):
+        api = FakeListEndpoint(total=250, delay=0.001)
+        ids = []
+        async for page in paginate(api, "employees", "employees", concurrency=3):
+            ids.extend(record["id"] for record in page)
+
+        assert ids == list(range(250))
+        assert sorted(api.pages_requested) == [1, 2, 3]
+
+    @pytest.mark.asyncio
+    async def test_prefetch_is_bounded(self):
+        api = FakeListEndpoint(total=2000, delay=0.005)
+        async for _ in paginate(api, "employees", "employees", concurrency=4):
+            pass
+
+        assert len(api.pages_requested) == 20
+        assert 1 < api.max_active <= 4
+
+    @pytest.mark.asyncio
+    async def test_sequential_without_total(self):
+        api = FakeListEndpoint(total=230, report_total=False)
+        ids = []
+        async for page in paginate(api, "employees", "employees"):
+            ids.extend(record["id"] for record in page)
+
+        assert ids == list(range(230))
+        assert api.pages_requested == [1, 2, 3]
+
+    @pytest.mark.asyncio
+    async def test_max_records_stops_early(self):
+        api = FakeListEndpoint(total=2000)
+        ids = []
+        async for page in paginate(api, "employees", "employees", max_records=150):
+            ids.extend(record["id"] for record in page)
+
+        assert ids == list(range(150))
+        assert max(api.pages_requested) == 2
+
+
+class TestFetchAll:
+    """Test collecting all pages into a single response"""
+
+    @pytest.mark.asyncio
+    async def test_collects_everything(self):
+        result = await fetch_all(FakeListEndpoint(total=120), "employees", "employees")
+
+        assert result["count"] == 120
+        assert result["pages"] == 2
+        assert result["truncated"] is False
+
+    @pytest.mark.asyncio
+    async def test_truncates_at_max_records(self):
+        result = await fetch_all(
+            FakeListEndpoint(total=120), "employees", "employees", max_records=100
+        )
+
+        assert result["count"] == 100
+        assert result["truncated"] is True
+
+    @pytest.mark.asyncio
+    async def test_exact_max_records_is_not_truncated(self):
+        result = await fetch_all(
+            FakeListEndpoint(total=100), "employees", "employees", max_records=100
+        )
+
+        assert result["count"] == 100
+        assert result["truncated"] is False
+
+
+class TestClampMaxRecords:
+    """Test the server-side ceiling on requested record counts"""
+
+    def test_clamps_to_ceiling(self):
+        assert clamp_max_records(10 ** 9, 10000) == 10000
+        assert clamp_max_records(50, 10000) == 50
+
+    def test_rejects_values_below_one(self):
+        with pytest.raises(ValueError, match="max_records must be at least 1"):
+            clamp_max_records(-2, 10000)
+        with pytest.raises(ValueError):
+            clamp_max_records(0, 10000)
@@ -0,0 +1,69 @@
+"""Tests for response projection and compaction"""
+
+from breathe_hr_mcp.projection import compact, project, shape_response
+
+RECORD = {
+    "id": 1,
+    "first_name": "John",
+    "middle_name": None,
+    "notes": "",
+    "holiday_allowance": 0,
+    "active": False,
+    "custom_fields": [],
+    "department": {"id": 3, "name": "Engineering", "manager": None},
+    "emergency_contact": {"name": None, "phone": None},
+    "tags": ["a", None, {}, "b"],
+}
+
+
+class TestCompact:
+    """Test the compact profile"""
+
+    def test_drops_nulls_and_empty_values(self):
+        assert compact(RECORD) == {
+            "id": 1,
+            "first_name": "John",
+            "holiday_allowance": 0,
+            "active": False,
+            "department": {"id": 3, "name": "Engineering"},
+            "tags": ["a", "b"],
+        }
+
+    def test_does_not_mutate_input(self):
+        record = {"a": None, "b": {"c": None}}
+        compact(record)
+        assert record == {"a": None, "b": {"c": None}}
+
+
+class TestProject:
+    """Test field projection"""
+
+    def test_dotted_paths(self):
+        assert project(RECORD, ["first_name", "department.name", "missing"]) == {
+            "first_name": "John",
+            "department": {"name": "Engineering"},
+        }
+
+    def test_whole_field_wins_over_subfield(self):
+        assert project(RECORD, ["department", "department.name"])["department"] == RECORD["department"]
+
+
+class TestShapeResponse:
+    """Test shaping whole tool responses"""
+
+    def test_list_response_keeps_pagination(self):
+        body = {"employees": [RECORD], "pagination": {"page": 1, "total": 1}}
+        result = shape_response(body, "employees", fields=["first_name"])
+        assert result == {
+            "employees": [{"id": 1, "first_name": "John"}],
+            "pagination": {"page": 1, "total": 1},
+        }
+        assert body["employees"][0] is RECORD
+
+    def test_single_record(self):
+        assert shape_response(RECORD, "employees", fields=["department.id"]) == {
+            "id": 1, "department": {"id": 3}
+        }
+
+    def test_disabled_returns_body_unchanged(self):
+        assert shape_response(RECORD, "employees", compact_profile=False) is RECORD
@@ -0,0 +1,118 @@
+"""Tests for the upstream rate limiter"""
+
+from datetime import datetime, timezone
+
+import pytest
+
+from breathe_hr_mcp.ratelimit import RateLimiter, parse_retry_after
+
+
+class FakeTime:
+    """Clock whose sleep advances time instantly"""
+
+    def __init__(self):
+        self.now = 0.0
+        self.slept = []
+
+    def clock(self):
+        return self.now
+
+    async def sleep(self, delay):
+        self.slept.append(delay)
+        self.now += delay
+
+
+class TestParseRetryAfter:
+    """Test Retry-After header parsing"""
+
+    def test_seconds(self):
+        assert parse_retry_after("3") == 3.0
+
+    def test_http_date(self):
+        now = datetime(2024, 1, 1, 12, 0, 0, tzinfo=timezone.utc)
+        assert parse_retry_after("Mon, 01 Jan 2024 12:00:05 GMT", now=now) == 5.0
+
+    @pytest.mark.asyncio
+    async def test_invalid(self):
+        assert parse_retry_after(None) is None
+        assert parse_retry_after("soon") is None
+
+
+class TestRateLimiter:
+    """Test token bucket pacing and adaptive backoff"""
+
+    @pytest.mark.asyncio
+    async def test_burst_then_paced(self):
+        time = FakeTime()
+        limiter = RateLimiter(rate=10, burst=5, clock=time.clock, sleep=time.sleep)
+        for _ in range(15):
+            await limiter.acquire()
+
+        # 5 requests ride the burst, the other 10 are paced at 10/s
+        assert time.now == pytest.approx(1.0)
+
+    @pytest.mark.asyncio
+    async def test_disabled_never_waits(self):
+        time = FakeTime()
+        limiter = RateLimiter(rate=0, clock=time.clock, sleep=time.sleep)
+        for _ in range(100):
+            await limiter.acquire()
+        assert time.slept == []
+
+    @pytest.mark.asyncio
+    async def test_retry_after_pauses_all_callers(self):
+        time = FakeTime()
+        limiter = RateLimiter(rate=0, clock=time.clock, sleep=time.sleep)
+        await limiter.on_rate_limited(retry_after=4)
+        await limiter.acquire()
+        assert time.now == pytest.approx(4.0)
+
+    @pytest.mark.asyncio
+    async def test_adaptive_rate(self):
+        time = FakeTime()
+        limiter = RateLimiter(rate=10, min_rate=1, clock=time.clock, sleep=time.sleep)
+        await limiter.on_rate_limited()
+        time.now += 1
+        await limiter.on_rate_limited()
+        assert limiter.rate == 2.5
+        for _ in range(5):
+            time.now += 1
+            await limiter.on_rate_limited()
+        assert limiter.rate == 1
+        for _ in range(100):
+            await limiter.on_success()
+        assert limiter.rate == 10
+
+    @pytest.mark.asyncio
+    async def test_one_decrease_per_throttling_event(self):
+        time = FakeTime()
+        limiter = RateLimiter(rate=10, clock=time.clock, sleep=time.sleep)
+        for _ in range(4):
+            await limiter.on_rate_limited(retry_after=2)
+        assert limiter.rate == 5
+        assert limiter.throttled == 4
+        time.now += 2
+        await limiter.on_rate_limited()
+        assert limiter.rate == 2.5
+
+    def test_negative_max_retries_is_clamped(self):
+        assert RateLimiter(max_retries=-3).max_retries == 0
+
+    @pytest.mark.asyncio
+    async def test_backoff_delay(self):
+        limiter = RateLimiter(backoff_base=1.0, backoff_cap=8.0)
+        assert 0.5 <= limiter.backoff_delay(0) <= 1.0
+        assert 2.0 <= limiter.backoff_delay(2) <= 4.0
+        assert 4.0 <= limiter.backoff_delay(10) <= 8.0
+        assert 3.0 <= limiter.backoff_delay(0, retry_after=3.0) <= 4.0
+        assert limiter.backoff_delay(0, retry_after=7.9) <= 8.0
+
+    @pytest.mark.asyncio
+    async def test_long_retry_after_is_capped(self):
+        time = FakeTime()
+        limiter = RateLimiter(rate=0, backoff_cap=30.0, clock=time.clock, sleep=time.sleep)
+        assert limiter.can_wait(30.0)
+        assert not limiter.can_wait(3600.0)
+        await limiter.on_rate_limited(retry_after=3600)
+        await limiter.acquire()
+        assert time.now == pytest.approx(30.0)
@@ -0,0 +1,154 @@
+"""Tests for the stale-while-revalidate reference data refresher"""
+
+import asyncio
+import random
+
+import pytest
+
+from breathe_hr_mcp.refresher import BackgroundRefresher
+from tests.conftest import FakeTime
+
+
+def make_refresher(time, **kwargs):
+    return BackgroundRefresher(
+        clock=time.clock, sleep=time.sleep, rng=random.Random(1), **kwargs
+    )
+
+
+class Upstream:
+    """Fetch function returning numbered versions, optionally failing"""
+
+    def __init__(self):
+        self.calls = 0
+        self.fail = False
+
+    async def fetch(self):
+        self.calls += 1
+        await asyncio.sleep(0)
+        if self.fail:
+            raise RuntimeError("Breathe HR API error: 503")
+        return {"version": self.calls}
+
+
+class TestBackgroundRefresher:
+    """Test serving from memory, background refresh and backoff"""
+
+    @pytest.mark.asyncio
+    async def test_cold_reads_share_one_fetch(self):
+        time, upstream = FakeTime(), Upstream()
+        refresher = make_refresher(time)
+        refresher.register("departments", upstream.fetch, soft_ttl=60)
+
+        results = await asyncio.gather(*(refresher.get("departments") for _ in range(5)))
+
+        assert results == [{"version": 1}] * 5
+        assert upstream.calls == 1
+        assert await refresher.get("departments") == {"version": 1}
+        assert upstream.calls == 1
+
+    @pytest.mark.asyncio
+    async def test_stale_read_returns_immediately_and_refreshes(self):
+        time, upstream = FakeTime(), Upstream()
+        refresher = make_refresher(time)
+        refresher.register("departments", upstream.fetch, soft_ttl=60)
+        await refresher.get("departments")
+
+        time.now += 61
+        assert await refresher.get("departments") == {"version": 1}
+        await refresher.refresh("departments")
+
+        assert await refresher.get("departments") == {"version": 2}
+        assert refresher.stats()["departments"]["age"] == 0
+
+    @pytest.mark.asyncio
+    async def test_failed_refresh_keeps_value_and_backs_off(self):
+        time, upstream = FakeTime(), Upstream()
+        refresher = make_refresher(time, jitter=0, backoff_base=5, backoff_max=12)
+        refresher.register("account", upstream.fetch, soft_ttl=60)
+        await refresher.get("account")
+        time.now += 61
+        upstream.fail = True
+
+        await refresher.refresh_due()
+        await refresher.refresh_due()
+        assert upstream.calls == 2
+        assert await refresher.get("account") == {"version": 1}
+        stats = refresher.stats()["account"]
+        assert stats["failures"] == 1
+        assert stats["retry_in"] == 5
+        assert stats["last_error"] == "RuntimeError: Breathe HR API error: 503"
+
+        time.now += 5
+        await refresher.refresh_due()
+        time.now += 10
+        await refresher.refresh_due()
+        assert refresher.stats()["account"]["retry_in"] == 12
+
+        upstream.fail = False
+        time.now += 12
+        await refresher.refresh_due()
+        assert await refresher.get("account") == {"version": 5}
+        assert refresher.stats()["account"]["failures"] == 0
+
+    @pytest.mark.asyncio
+    async def test_restored_value_is_revalidated(self):
+        time, upstream = FakeTime(), Upstream()
+        refresher = make_refresher(time)
+        refresher.register("departments", upstream.fetch, soft_ttl=3600)
+        refresher.restore("departments", {"version": 0}, age=10)
+
+        assert await refresher.get("departments") == {"version": 0}
+        await refresher.refresh("departments")
+
+        assert upstream.calls == 1
+        assert await refresher.get("departments") == {"version": 1}
+
+    @pytest.mark.asyncio
+    async def test_on_change_runs_when_a_refresh_changes_the_value(self):
+        time, upstream, changes = FakeTime(), Upstream(), []
+
+        async def on_change(value):
+            changes.append(value)
+
+        refresher = make_refresher(time)
+        refresher.register("departments", upstream.fetch, soft_ttl=60, on_change=on_change)
+        await refresher.get("departments")
+        assert changes == []
+
+        await refresher.refresh("departments")
+        assert changes == [{"version": 2}]
+
+        upstream.calls = 1
+        await refresher.refresh("departments")
+        assert changes == [{"version": 2}]
+
+    @pytest.mark.asyncio
+    async def test_value_past_max_stale_blocks_on_fetch(self):
+        time, upstream = FakeTime(), Upstream()
+        refresher = make_refresher(time, max_stale=100)
+        refresher.register("account", upstream.fetch, soft_ttl=60)
+        refresher.restore("account", {"version": 0}, age=101)
+        upstream.fail = True
+
+        with pytest.raises(RuntimeError, match="503"):
+            await refresher.get("account")
+
+    @pytest.mark.asyncio
+    async def test_run_sleeps_a_jittered_interval(self):
+        upstream, slept = Upstream(), []
+
+        async def sleep(delay):
+            slept.append(delay)
+            await asyncio.sleep(0)
+
+        refresher = BackgroundRefresher(interval=30, jitter=0.2, sleep=sleep, rng=random.Random(1))
+        refresher.register("departments", upstream.fetch, soft_ttl=3600)
+
+        task = asyncio.ensure_future(refresher.run())
+        while len(slept) < 5:
+            await asyncio.sleep(0)
+        task.cancel()
+
+        assert upstream.calls == 1
+        assert all(24 <= delay <= 36 for delay in slept)
+        assert len(set(slept)) > 1
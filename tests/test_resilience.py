@@ -0,0 +1,162 @@
+"""Tests for the circuit breaker, request hedging and endpoint timeouts"""
+
+import asyncio
+
+import httpx
+import pytest
+
+from breathe_hr_mcp.resilience import (
+    CircuitBreaker,
+    CircuitOpenError,
+    EndpointTimeouts,
+    Hedger,
+)
+from tests.conftest import FakeTime
+
+
+class TestCircuitBreaker:
+    """Test opening on failures or slow calls and recovering through a probe"""
+
+    def make_breaker(self, time, **kwargs):
+        options = dict(window=4, min_calls=4, failure_ratio=0.5, reset_timeout=30, slow_call=5)
+        options.update(kwargs)
+        return CircuitBreaker(clock=time.clock, **options)
+
+    def test_opens_when_failure_ratio_is_reached(self):
+        breaker = self.make_breaker(FakeTime())
+        for ok in (True, True, False):
+            breaker.before_call()
+            breaker.record(ok, 0.1)
+        assert breaker.state == CircuitBreaker.CLOSED
+
+        breaker.record(False, 0.1)
+        assert breaker.state == CircuitBreaker.OPEN
+        with pytest.raises(CircuitOpenError, match="paused for 30s"):
+            breaker.before_call()
+        assert breaker.stats()["rejected"] == 1
+
+    def test_slow_calls_count_as_failures(self):
+        breaker = self.make_breaker(FakeTime())
+        for _ in range(4):
+            breaker.record(True, 6.0)
+        assert breaker.state == CircuitBreaker.OPEN
+
+    def test_probe_closes_or_reopens(self):
+        time = FakeTime()
+        breaker = self.make_breaker(time)
+        for _ in range(4):
+            breaker.record(False, 0.1)
+
+        time.now += 30
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+        breaker.before_call()
+        with pytest.raises(CircuitOpenError):
+            breaker.before_call()
+        breaker.record(False, 0.1)
+        assert breaker.state == CircuitBreaker.OPEN
+        assert breaker.stats()["opened"] == 2
+
+        time.now += 30
+        breaker.before_call()
+        breaker.record(True, 0.1)
+        assert breaker.state == CircuitBreaker.CLOSED
+        breaker.before_call()
+
+    def test_cancelled_probe_is_released(self):
+        time = FakeTime()
+        breaker = self.make_breaker(time)
+        for _ in range(4):
+            breaker.record(False, 0.1)
+        time.now += 30
+
+        breaker.before_call()
+        breaker.release()
+        breaker.before_call()
+
+    def test_disabled_breaker_admits_everything(self):
+        breaker = self.make_breaker(FakeTime(), enabled=False)
+        for _ in range(10):
+            breaker.before_call()
+            breaker.record(False, 0.1)
+        assert breaker.state == CircuitBreaker.CLOSED
+
+
+class TestHedger:
+    """Test that slow requests are raced against a second copy"""
+
+    def make_hedger(self, latency=0.001):
+        hedger = Hedger(enabled=True, min_samples=5, min_delay=0.01)
+        for _ in range(5):
+            hedger.observe("employees", latency)
+        return hedger
+
+    def test_no_hedge_without_enough_samples(self):
+        hedger = Hedger(enabled=True, min_samples=5)
+        hedger.observe("employees", 0.001)
+        assert hedger.delay("employees") is None
+        assert Hedger(enabled=False).delay("employees") is None
+
+    def test_delay_is_the_quantile_with_a_floor(self):
+        hedger = Hedger(enabled=True, quantile=0.9, min_samples=10, min_delay=0.05)
+        for ms in range(1, 11):
+            hedger.observe("employees", ms / 10)
+        assert hedger.delay("employees") == 1.0
+        assert self.make_hedger().delay("employees") == 0.01
+
+    @pytest.mark.asyncio
+    async def test_slow_request_is_hedged(self):
+        hedger = self.make_hedger()
+        calls, acquired = [], []
+
+        async def send():
+            calls.append(len(calls))
+            await asyncio.sleep(1.0 if len(calls) == 1 else 0)
+            return len(calls)
+
+        async def before_hedge():
+            acquired.append(True)
+
+        assert await hedger.run("employees", send, before_hedge) == 2
+        assert acquired == [True]
+        assert hedger.stats() == {"hedged": 1, "hedge_wins": 1}
+
+    @pytest.mark.asyncio
+    async def test_fast_request_is_not_hedged(self):
+        hedger = self.make_hedger(latency=1.0)
+
+        async def send():
+            return "ok"
+
+        assert await hedger.run("employees", send) == "ok"
+        assert hedger.stats()["hedged"] == 0
+
+    @pytest.mark.asyncio
+    async def test_error_raised_only_if_both_fail(self):
+        hedger = self.make_hedger()
+        attempts = 0
+
+        async def send():
+            nonlocal attempts
+            attempts += 1
+            attempt = attempts
+            await asyncio.sleep(0.05)
+            raise httpx.ReadTimeout(f"attempt {attempt}")
+
+        with pytest.raises(httpx.ReadTimeout, match="attempt 1"):
+            await hedger.run("employees", send)
+        assert attempts == 2
+
+
+class TestEndpointTimeouts:
+    """Test parsing per-endpoint timeout overrides"""
+
+    def test_parse(self):
+        timeouts = EndpointTimeouts.parse("absences=60, employees/{id}=2:10", connect=5.0)
+        assert timeouts.for_endpoint("absences") == httpx.Timeout(60.0, connect=5.0)
+        assert timeouts.for_endpoint("employees/{id}") == httpx.Timeout(10.0, connect=2.0)
+        assert timeouts.for_endpoint("account") is None
+
+    @pytest.mark.parametrize("spec", ["absences", "absences=slow", "=5"])
+    def test_invalid_spec(self, spec):
+        with pytest.raises(ValueError, match="Invalid endpoint timeout"):
+            EndpointTimeouts.parse(spec, connect=5.0)
@@ -1,10 +1,13 @@
 """Tests for Breathe HR MCP Server"""
 
+import asyncio
+import json
 import pytest
 from unittest.mock import AsyncMock, patch, MagicMock
 import httpx
 from fastapi.testclient import TestClient
 
+from breathe_hr_mcp.cache import make_key
 from breathe_hr_mcp.server import app, mcp, breathe_hr_request
 
 
@@ -23,18 +26,21 @@ class TestBreatheHRRequest:
                 with patch("breathe_hr_mcp.server.BREATHE_HR_BASE_URL", "https://api.test-breathehr.com/v1"):
                     yield
 
+    def mock_client(self, response):
+        """Patch the shared HTTP client to return the given response"""
+        client = MagicMock()
+        client.request = AsyncMock(return_value=response)
+        return patch("breathe_hr_mcp.server.get_http_client", return_value=client)
+
     @pytest.mark.asyncio
     async def test_successful_request(self):
         """Test successful API request"""
         mock_response = MagicMock()
         mock_response.status_code = 200
         mock_response.is_success = True
-        mock_response.json.return_value = {"employees": []}
+        mock_response.content = json.dumps({"employees": []}).encode()
 
-        with patch("httpx.AsyncClient") as mock_client:
-            mock_client.return_value.__aenter__.return_value.request = AsyncMock(
-                return_value=mock_response
-            )
+        with self.mock_client(mock_response):
             
             result = await breathe_hr_request("employees")
             
@@ -53,10 +59,7 @@ class TestBreatheHRRequest:
         mock_response = MagicMock()
         mock_response.status_code = 401
 
-        with patch("httpx.AsyncClient") as mock_client:
-            mock_client.return_value.__aenter__.return_value.request = AsyncMock(
-                return_value=mock_response
-            )
+        with self.mock_client(mock_response):
             
             with pytest.raises(RuntimeError, match="Authentication failed"):
                 await breathe_hr_request("employees")
@@ -67,10 +70,7 @@ class TestBreatheHRRequest:
         mock_response = MagicMock()
         mock_response.status_code = 403
 
-        with patch("httpx.AsyncClient") as mock_client:
-            mock_client.return_value.__aenter__.return_value.request = AsyncMock(
-                return_value=mock_response
-            )
+        with self.mock_client(mock_response):
             
             with pytest.raises(RuntimeError, match="Access forbidden"):
                 await breathe_hr_request("employees")
@@ -81,27 +81,263 @@ class TestBreatheHRRequest:
         mock_response = MagicMock()
         mock_response.status_code = 404
 
-        with patch("httpx.AsyncClient") as mock_client:
-            mock_client.return_value.__aenter__.return_value.request = AsyncMock(
-                return_value=mock_response
-            )
+        with self.mock_client(mock_response):
             
             with pytest.raises(RuntimeError, match="Resource not found"):
                 await breathe_hr_request("employees/999")
 
     @pytest.mark.asyncio
-    async def test_rate_limit_error(self):
-        """Test 429 rate limit error"""
+    async def test_upstream_metrics_recorded(self):
+        """Test that upstream latency and errors are labeled by endpoint and status"""
+        from breathe_hr_mcp import server
+
+        mock_response = MagicMock()
+        mock_response.status_code = 404
+        labels = {"endpoint": "employees/{id}", "method": "GET", "status": 404}
+        latency_before = server.upstream_latency.count(**labels)
+        errors_before = server.upstream_errors.value(endpoint="employees/{id}", reason=404)
+
+        with self.mock_client(mock_response):
+            with pytest.raises(RuntimeError):
+                await breathe_hr_request("employees/998")
+
+        assert server.upstream_latency.count(**labels) == latency_before + 1
+        assert server.upstream_errors.value(endpoint="employees/{id}", reason=404) == errors_before + 1
+        assert server.upstream_in_flight.value() == 0
+
+    @pytest.mark.asyncio
+    async def test_rate_limit_error(self, upstream_limiter):
+        """Test 429 rate limit error once retries are exhausted"""
         mock_response = MagicMock()
         mock_response.status_code = 429
+        mock_response.headers = {}
 
-        with patch("httpx.AsyncClient") as mock_client:
-            mock_client.return_value.__aenter__.return_value.request = AsyncMock(
-                return_value=mock_response
-            )
+        with self.mock_client(mock_response) as get_client:
             
             with pytest.raises(RuntimeError, match="Rate limit exceeded"):
                 await breathe_hr_request("employees")
+            
+            assert get_client.return_value.request.await_count == upstream_limiter.max_retries + 1
+            assert upstream_limiter.throttled == upstream_limiter.max_retries + 1
+
+    @pytest.mark.asyncio
+    async def test_rate_limit_retry_honors_retry_after(self, upstream_limiter):
+        """Test a 429 is retried after the Retry-After delay"""
+        throttled = MagicMock()
+        throttled.status_code = 429
+        throttled.headers = {"Retry-After": "2"}
+        ok = MagicMock()
+        ok.status_code = 200
+        ok.is_success = True
+        ok.content = json.dumps({"employees": []}).encode()
+        with self.mock_client(ok) as get_client:
+            get_client.return_value.request = AsyncMock(side_effect=[throttled, ok])
+            
+            result = await breathe_hr_request("employees")
+            
+            assert result == {"employees": []}
+            assert upstream_limiter.retries == 1
+            assert upstream_limiter.rate < upstream_limiter.max_rate
+            assert upstream_limiter._clock() >= 2
+
+    @pytest.mark.asyncio
+    async def test_long_retry_after_fails_without_sleeping(self, upstream_limiter):
+        """Test a Retry-After beyond the wait cap fails the call instead of sleeping"""
+        throttled = MagicMock()
+        throttled.status_code = 429
+        throttled.headers = {"Retry-After": "3600"}
+        with self.mock_client(throttled) as get_client:
+            with pytest.raises(RuntimeError, match="asked to wait 3600 seconds"):
+                await breathe_hr_request("employees")
+            assert get_client.return_value.request.await_count == 1
+        assert upstream_limiter.retries == 0
+        assert upstream_limiter._blocked_until <= upstream_limiter._clock() + upstream_limiter.backoff_cap
+
+    @pytest.mark.asyncio
+    async def test_upstream_calls_are_traced(self, tracer):
+        """Test that an upstream call records its shape, status and phases in a span"""
+        throttled = MagicMock()
+        throttled.status_code = 429
+        throttled.headers = {"Retry-After": "1"}
+        ok = MagicMock()
+        ok.status_code = 200
+        ok.is_success = True
+        ok.content = json.dumps({"employees": []}).encode()
+        with self.mock_client(ok) as get_client:
+            get_client.return_value.request = AsyncMock(side_effect=[throttled, ok])
+            await breathe_hr_request("employees", params={"department": "Sales", "page": 1})
+        
+        exporter, slow_calls = tracer.exporters
+        [span] = exporter.named("upstream")
+        assert span.attributes["endpoint"] == "employees"
+        assert span.attributes["params"] == {"department": "str", "page": "int"}
+        assert span.attributes["attempts"] == 2
+        assert span.attributes["status_code"] == 200
+        assert {"queue", "backoff", "decode"} <= set(span.phases)
+        assert slow_calls.entries()[0]["span_id"] == span.span_id
+        attempts = exporter.named("attempt")
+        assert [attempt.attributes["number"] for attempt in attempts] == [1, 2]
+        assert [attempt.attributes["status_code"] for attempt in attempts] == [429, 200]
+        assert all(attempt.parent is span for attempt in attempts)
+
+    @pytest.mark.asyncio
+    async def test_hedged_requests_get_their_own_spans(self, tracer):
+        """Test that a hedged duplicate is traced apart from the request it races"""
+        from breathe_hr_mcp.resilience import Hedger
+
+        ok = MagicMock()
+        ok.status_code = 200
+        ok.is_success = True
+        ok.content = json.dumps({"employees": []}).encode()
+        calls = 0
+
+        async def request(**kwargs):
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(1.0 if calls == 1 else 0)
+            return ok
+
+        hedger = Hedger(enabled=True, min_samples=1, min_delay=0.01)
+        hedger.observe("employees", 0.001)
+        with self.mock_client(ok) as get_client, \
+                patch("breathe_hr_mcp.server.upstream_hedger", hedger):
+            get_client.return_value.request = AsyncMock(side_effect=request)
+            await breathe_hr_request("employees")
+
+        exporter, _ = tracer.exporters
+        [span] = exporter.named("upstream")
+        attempts = exporter.named("attempt")
+        assert sorted(attempt.attributes["number"] for attempt in attempts) == [1, 2]
+        assert all(attempt.parent is span for attempt in attempts)
+        assert hedger.stats() == {"hedged": 1, "hedge_wins": 1}
+
+    @pytest.mark.asyncio
+    async def test_get_requests_are_cached(self):
+        """Test repeated GETs to read-only endpoints hit the cache"""
+        mock_response = MagicMock()
+        mock_response.status_code = 200
+        mock_response.is_success = True
+        mock_response.content = json.dumps({"departments": []}).encode()
+
+        with self.mock_client(mock_response) as get_client:
+            await breathe_hr_request("departments")
+            result = await breathe_hr_request("departments")
+
+            assert result == {"departments": []}
+            assert get_client.return_value.request.await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_post_requests_are_not_cached(self):
+        """Test write requests always reach the upstream API"""
+        mock_response = MagicMock()
+        mock_response.status_code = 200
+        mock_response.is_success = True
+        mock_response.content = json.dumps({"id": 1}).encode()
+
+        with self.mock_client(mock_response) as get_client:
+            await breathe_hr_request("absences", method="POST", json_data={})
+            await breathe_hr_request("absences", method="POST", json_data={})
+
+            assert get_client.return_value.request.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_concurrent_gets_are_coalesced(self):
+        """Test concurrent identical GETs share one upstream request"""
+        from breathe_hr_mcp.server import upstream_flight
+
+        mock_response = MagicMock()
+        mock_response.status_code = 200
+        mock_response.is_success = True
+        mock_response.content = json.dumps({"id": 1}).encode()
+
+        async def slow_request(**kwargs):
+            await asyncio.sleep(0.01)
+            return mock_response
+
+        with self.mock_client(mock_response) as get_client:
+            get_client.return_value.request = AsyncMock(side_effect=slow_request)
+            results = await asyncio.gather(
+                *(breathe_hr_request("employees/1") for _ in range(5))
+            )
+
+            assert results == [{"id": 1}] * 5
+            assert get_client.return_value.request.await_count == 1
+            assert upstream_flight.in_flight == 0
+
+    @pytest.mark.asyncio
+    async def test_in_flight_get_does_not_cache_over_invalidation(self):
+        """Test a GET that races create_leave_request cannot cache stale data"""
+        from breathe_hr_mcp.server import create_leave_request
+
+        def response(body):
+            mock_response = MagicMock()
+            mock_response.status_code = 200
+            mock_response.is_success = True
+            mock_response.content = json.dumps(body).encode()
+            return mock_response
+
+        old_get_started = asyncio.Event()
+        release_old_get = asyncio.Event()
+        absences = ["old"]
+
+        async def upstream(method, url, **kwargs):
+            if method == "POST":
+                absences[:] = ["new"]
+                return response({"id": 123})
+            body = {"absences": list(absences)}
+            if body["absences"] == ["old"]:
+                old_get_started.set()
+                await release_old_get.wait()
+            return response(body)
+
+        with self.mock_client(None) as get_client:
+            get_client.return_value.request = AsyncMock(side_effect=upstream)
+            
+            in_flight = asyncio.ensure_future(breathe_hr_request("absences"))
+            await old_get_started.wait()
+            await create_leave_request.fn(
+                employee_id=1,
+                start_date="2024-02-01",
+                end_date="2024-02-05",
+                absence_type="holiday"
+            )
+            fresh = await breathe_hr_request("absences")
+            release_old_get.set()
+            
+            assert await in_flight == {"absences": ["old"]}
+            assert fresh == {"absences": ["new"]}
+            assert await breathe_hr_request("absences") == {"absences": ["new"]}
+
+    @pytest.mark.asyncio
+    async def test_pagination_headers_drive_concurrent_prefetch(self):
+        """Test header-only page totals still enable concurrent page fetches"""
+        from breathe_hr_mcp.server import list_all_employees
+
+        active = 0
+        max_active = 0
+
+        async def upstream(method, url, params=None, **kwargs):
+            nonlocal active, max_active
+            active += 1
+            max_active = max(max_active, active)
+            await asyncio.sleep(0.005)
+            active -= 1
+            page, per_page = params["page"], params["per_page"]
+            start = (page - 1) * per_page
+            return httpx.Response(
+                200,
+                json={"employees": [{"id": i} for i in range(start, min(start + per_page, 450))]},
+                headers={"Total": "450", "Per-Page": str(per_page)},
+            )
+
+        with self.mock_client(None) as get_client:
+            get_client.return_value.request = AsyncMock(side_effect=upstream)
+            
+            result = await list_all_employees.fn()
+            
+            assert result["count"] == 450
+            assert get_client.return_value.request.await_count == 5
+            assert max_active > 1
 
     @pytest.mark.asyncio
     async def test_invalid_json_response(self):
@@ -109,17 +345,277 @@ class TestBreatheHRRequest:
         mock_response = MagicMock()
         mock_response.status_code = 200
         mock_response.is_success = True
-        mock_response.json.side_effect = ValueError("Invalid JSON")
-        mock_response.text = "Invalid response"
+        mock_response.content = b"Invalid response"
 
-        with patch("httpx.AsyncClient") as mock_client:
-            mock_client.return_value.__aenter__.return_value.request = AsyncMock(
-                return_value=mock_response
-            )
+        with self.mock_client(mock_response):
             
             with pytest.raises(RuntimeError, match="Invalid JSON response"):
                 await breathe_hr_request("employees")
 
+    @pytest.mark.asyncio
+    async def test_large_error_body_is_truncated(self):
+        """Test that error messages quote only a bounded excerpt of the body"""
+        mock_response = MagicMock()
+        mock_response.status_code = 502
+        mock_response.is_success = False
+        mock_response.content = b"<html>" + b"x" * 1_000_000
+
+        with self.mock_client(mock_response):
+            with pytest.raises(RuntimeError, match="502") as error:
+                await breathe_hr_request("employees")
+
+        assert len(str(error.value)) < 1000
+        assert "bytes)" in str(error.value)
+
+    @pytest.mark.asyncio
+    async def test_not_modified_reuses_decoded_body(self):
+        """Test that a 304 returns the stored body without re-parsing"""
+        from breathe_hr_mcp import server
+
+        first = httpx.Response(200, json={"employees": [{"id": 1}]}, headers={"ETag": '"v1"'})
+        not_modified = MagicMock()
+        not_modified.status_code = 304
+        not_modified.headers = httpx.Headers()
+
+        with self.mock_client(first) as get_client:
+            request = get_client.return_value.request
+            request.side_effect = [first, not_modified]
+            body = await breathe_hr_request("employees")
+            server.response_cache.clear()
+            again = await breathe_hr_request("employees")
+
+        assert again is body
+        not_modified.json.assert_not_called()
+        assert "If-None-Match" not in request.call_args_list[0].kwargs["headers"]
+        assert request.call_args_list[1].kwargs["headers"]["If-None-Match"] == '"v1"'
+        assert server.upstream_validators.stats()["not_modified"] == 1
+        assert server.upstream_validators.stats()["bytes_saved"] == len(first.content)
+
+    @pytest.mark.asyncio
+    async def test_open_circuit_fails_fast_or_serves_stale(self, upstream_breaker):
+        """Test that an open circuit skips upstream and falls back to the last body"""
+        from breathe_hr_mcp import server
+        from breathe_hr_mcp.resilience import CircuitOpenError
+
+        first = httpx.Response(200, json={"employees": [{"id": 1}]}, headers={"ETag": '"v1"'})
+        failing = httpx.Response(503, json={"message": "unavailable"})
+
+        with self.mock_client(first) as get_client:
+            request = get_client.return_value.request
+            body = await breathe_hr_request("employees")
+            server.response_cache.clear()
+            request.return_value = failing
+            page = 0
+            while upstream_breaker.state == upstream_breaker.CLOSED:
+                page += 1
+                with pytest.raises(RuntimeError, match="503"):
+                    await breathe_hr_request("absences", params={"page": page})
+            calls = request.await_count
+
+            assert await breathe_hr_request("employees") is body
+            with pytest.raises(CircuitOpenError, match="paused"):
+                await breathe_hr_request("departments")
+            assert request.await_count == calls
+
+        assert server.stale_responses.value(endpoint="employees") >= 1
+
+    @pytest.mark.asyncio
+    async def test_probe_is_released_when_it_raises_unexpectedly(self):
+        """Test that a half-open probe failing with a non-HTTP error admits the next call"""
+        from tests.conftest import FakeTime
+        from breathe_hr_mcp.resilience import CircuitBreaker
+
+        time = FakeTime()
+        breaker = CircuitBreaker(window=4, min_calls=4, reset_timeout=30, clock=time.clock)
+        for _ in range(4):
+            breaker.record(False, 0.1)
+        time.now += 30
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+
+        with patch("breathe_hr_mcp.server.upstream_breaker", breaker):
+            with self.mock_client(httpx.Response(200, json={"id": 1})) as get_client:
+                request = get_client.return_value.request
+                request.side_effect = [RuntimeError("bad transport"), httpx.Response(200, json={"id": 1})]
+                with pytest.raises(RuntimeError, match="bad transport"):
+                    await breathe_hr_request("employees/1")
+                assert await breathe_hr_request("employees/1") == {"id": 1}
+
+        assert breaker.state == CircuitBreaker.CLOSED
+
+    @pytest.mark.asyncio
+    async def test_endpoint_timeouts_are_applied(self):
+        """Test that a per-endpoint timeout override is passed to the client"""
+        from breathe_hr_mcp.resilience import EndpointTimeouts
+
+        timeouts = EndpointTimeouts.parse("employees/{id}=2:10", connect=5.0)
+        response = httpx.Response(200, json={"id": 1})
+
+        with patch("breathe_hr_mcp.server.upstream_timeouts", timeouts):
+            with self.mock_client(response) as get_client:
+                await breathe_hr_request("employees/1")
+                await breathe_hr_request("account")
+
+        calls = get_client.return_value.request.call_args_list
+        assert calls[0].kwargs["timeout"] == httpx.Timeout(10.0, connect=2.0)
+        assert calls[1].kwargs["timeout"] is httpx.USE_CLIENT_DEFAULT
+
+    @pytest.mark.asyncio
+    async def test_not_modified_after_eviction_refetches(self):
+        """Test that a 304 for an evicted body falls back to a full GET"""
+        from breathe_hr_mcp import server
+
+        first = httpx.Response(200, json={"v": 1}, headers={"ETag": '"v1"'})
+        not_modified = httpx.Response(304)
+        full = httpx.Response(200, json={"v": 2})
+
+        async def request(**kwargs):
+            if "If-None-Match" in kwargs["headers"]:
+                server.upstream_validators.clear()
+                return not_modified
+            return full
+
+        with self.mock_client(first) as get_client:
+            get_client.return_value.request.side_effect = [first]
+            await breathe_hr_request("employees")
+            server.response_cache.clear()
+            get_client.return_value.request.side_effect = request
+            assert await breathe_hr_request("employees") == {"v": 2}
+
+    @pytest.mark.asyncio
+    async def test_shared_cache_serves_other_workers(self, tmp_path):
+        """Test that a response fetched by one worker is reused by another"""
+        from breathe_hr_mcp import server
+        from breathe_hr_mcp.shared import SharedCache
+
+        path = str(tmp_path / "shared.db")
+        mock_response = MagicMock()
+        mock_response.status_code = 200
+        mock_response.content = json.dumps({"departments": [{"id": 1}]}).encode()
+
+        with patch("breathe_hr_mcp.server.shared_cache", SharedCache(path)):
+            with self.mock_client(mock_response):
+                await breathe_hr_request("departments")
+
+        # A second worker starts with an empty in-process cache
+        server.response_cache.clear()
+        with patch("breathe_hr_mcp.server.shared_cache", SharedCache(path)):
+            with patch("breathe_hr_mcp.server.get_http_client") as get_client:
+                assert await breathe_hr_request("departments") == {"departments": [{"id": 1}]}
+                get_client.assert_not_called()
+            # Local copies of shared responses are kept only briefly
+            assert server.response_cache._entries[make_key("departments")][0] <= \
+                server.response_cache._clock() + server.SHARED_LOCAL_TTL
+
+            await server.invalidate_cached("departments")
+            assert server.shared_cache.get("departments") is None
+
+    @pytest.mark.asyncio
+    async def test_only_the_lease_holder_syncs_upstream(self, tmp_path):
+        """Test that other workers load the directory the refreshing worker published"""
+        from breathe_hr_mcp import server
+        from breathe_hr_mcp.directory import EmployeeDirectory
+        from breathe_hr_mcp.shared import SharedDatasets, SharedLease
+
+        path = str(tmp_path / "shared.db")
+        leader, follower = SharedLease(path), SharedLease(path)
+        assert leader.renew() and not follower.renew()
+        request = AsyncMock(return_value={"employees": [{"id": 7, "first_name": "Ada"}]})
+
+        with patch("breathe_hr_mcp.server.shared_datasets", SharedDatasets(path)), \
+                patch("breathe_hr_mcp.server.breathe_hr_request", request):
+            with patch("breathe_hr_mcp.server.refresher_lease", follower):
+                with pytest.raises(RuntimeError, match="not been published"):
+                    await server.sync_employee_directory()
+            with patch("breathe_hr_mcp.server.refresher_lease", leader):
+                assert await server.sync_employee_directory() == 1
+            request.reset_mock()
+            with patch("breathe_hr_mcp.server.refresher_lease", follower), \
+                    patch("breathe_hr_mcp.server.employee_directory", EmployeeDirectory()):
+                assert await server.sync_employee_directory() == 1
+                assert server.employee_directory.get(7)["first_name"] == "Ada"
+                assert server.employee_directory.is_fresh()
+        request.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_snapshot_endpoints_are_persisted(self, tmp_path):
+        """Test that departments responses are saved with their validators"""
+        from breathe_hr_mcp.snapshot import SnapshotStore
+
+        store = SnapshotStore(str(tmp_path / "snapshots.db"))
+        mock_response = MagicMock()
+        mock_response.status_code = 200
+        mock_response.content = json.dumps({"departments": [{"id": 1, "name": "Sales"}]}).encode()
+        mock_response.headers = httpx.Headers({"ETag": '"v1"'})
+
+        with patch("breathe_hr_mcp.server.snapshot_store", store):
+            with self.mock_client(mock_response):
+                await breathe_hr_request("departments")
+
+        snapshot = store.load("departments")
+        assert snapshot.value == {"departments": [{"id": 1, "name": "Sales"}]}
+        assert snapshot.etag == '"v1"'
+
+    @pytest.mark.asyncio
+    async def test_restore_snapshots_warms_cache_and_directory(self, tmp_path, employee_directory):
+        """Test that a restart answers from snapshots without calling upstream"""
+        from breathe_hr_mcp import server
+        from breathe_hr_mcp.snapshot import SnapshotStore
+
+        store = SnapshotStore(str(tmp_path / "snapshots.db"))
+        store.save("employees", [{"id": 7, "first_name": "Ada", "last_name": "Lovelace"}])
+        store.save("departments", {"departments": [{"id": 1, "name": "Sales"}]})
+
+        with patch("breathe_hr_mcp.server.snapshot_store", store):
+            assert server.restore_snapshots() == ["employees", "departments"]
+
+        assert employee_directory.is_fresh()
+        assert employee_directory.get(7)["first_name"] == "Ada"
+        with patch("breathe_hr_mcp.server.get_http_client") as get_client:
+            assert await breathe_hr_request("departments") == {"departments": [{"id": 1, "name": "Sales"}]}
+            get_client.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_reference_tools_are_served_from_memory(self, reference_data):
+        """Test that departments are fetched once, then served without upstream calls"""
+        from breathe_hr_mcp import server
+        from breathe_hr_mcp.server import get_departments
+
+        with patch("breathe_hr_mcp.server.DIRECTORY_REFRESH_INTERVAL", 0), \
+                patch("breathe_hr_mcp.server.ABSENCE_SYNC_INTERVAL", 0):
+            server.register_reference_data(reference_data)
+        mock_response = MagicMock()
+        mock_response.status_code = 200
+        mock_response.content = json.dumps({"departments": [{"id": 1}]}).encode()
+        mock_response.headers = httpx.Headers()
+
+        with self.mock_client(mock_response) as get_client:
+            await reference_data.refresh_due()
+            server.response_cache.clear()
+            assert await get_departments.fn() == {"departments": [{"id": 1}]}
+            assert await get_departments.fn() == {"departments": [{"id": 1}]}
+            # One fetch each for departments and account, from refresh_due
+            assert get_client.return_value.request.await_count == 2
+
+        freshness = reference_data.stats()
+        assert freshness["departments"]["age"] is not None
+        assert not freshness["departments"]["stale"]
+
+    @pytest.mark.asyncio
+    async def test_restored_snapshots_seed_reference_data(self, tmp_path, reference_data):
+        """Test that restored reference data is served and marked for revalidation"""
+        from breathe_hr_mcp import server
+        from breathe_hr_mcp.snapshot import SnapshotStore
+
+        server.register_reference_data(reference_data)
+        store = SnapshotStore(str(tmp_path / "snapshots.db"))
+        store.save("account", {"name": "Acme"})
+
+        with patch("breathe_hr_mcp.server.snapshot_store", store):
+            server.restore_snapshots()
+
+        assert await server.get_reference("account") == {"name": "Acme"}
+        assert reference_data.stats()["account"]["stale"]
+
 
 class TestMCPTools:
     """Test MCP tool implementations"""
@@ -173,6 +669,66 @@ class TestMCPTools:
             }
         )
 
+    @pytest.mark.asyncio
+    async def test_list_all_employees(self, mock_breathe_hr_request):
+        """Test list_all_employees pages through every employee"""
+        mock_breathe_hr_request.side_effect = [
+            {"employees": [{"id": i} for i in range(100)], "pagination": {"total": 150}},
+            {"employees": [{"id": i} for i in range(100, 150)], "pagination": {"total": 150}},
+        ]
+
+        from breathe_hr_mcp.server import list_all_employees
+
+        result = await list_all_employees.fn(department="Engineering")
+
+        assert result["count"] == 150
+        assert result["truncated"] is False
+        mock_breathe_hr_request.assert_any_call(
+            "employees",
+            params={"department": "Engineering", "page": 2, "per_page": 100}
+        )
+
+    @pytest.mark.asyncio
+    async def test_list_all_employees_max_records_guard(self, mock_breathe_hr_request):
+        """Test max_records is validated and capped server-side"""
+        mock_breathe_hr_request.return_value = {
+            "employees": [{"id": i} for i in range(100)], "pagination": {"total": 10 ** 6}
+        }
+
+        from breathe_hr_mcp.server import list_all_employees
+
+        with pytest.raises(ValueError, match="max_records must be at least 1"):
+            await list_all_employees.fn(max_records=-2)
+        
+        with patch("breathe_hr_mcp.server.MAX_RECORDS_LIMIT", 250):
+            result = await list_all_employees.fn(max_records=10 ** 9)
+        
+        assert result["count"] == 250
+        assert result["truncated"] is True
+
+    @pytest.mark.asyncio
+    async def test_list_employees_fields_and_compact(self, mock_breathe_hr_request):
+        """Test list_employees projects fields and strips empty values"""
+        mock_breathe_hr_request.return_value = {
+            "employees": [
+                {"id": 1, "first_name": "John", "email": "john@example.com", "phone": None,
+                 "department": {"id": 2, "name": "Engineering"}}
+            ],
+            "pagination": {"page": 1, "per_page": 50, "total": 1}
+        }
+
+        from breathe_hr_mcp.server import list_employees
+
+        projected = await list_employees.fn(fields=["first_name", "department.name"])
+        compacted = await list_employees.fn()
+        raw = await list_employees.fn(compact=False)
+
+        assert projected["employees"] == [
+            {"id": 1, "first_name": "John", "department": {"name": "Engineering"}}
+        ]
+        assert "phone" not in compacted["employees"][0]
+        assert raw["employees"][0]["phone"] is None
+
     @pytest.mark.asyncio
     async def test_get_employee(self, mock_breathe_hr_request):
         """Test get_employee tool"""
@@ -191,6 +747,46 @@ class TestMCPTools:
         mock_breathe_hr_request.assert_called_once_with("employees/1")
         assert result == mock_response
 
+    @pytest.mark.asyncio
+    async def test_get_employees(self, mock_breathe_hr_request):
+        """Test get_employees fetches IDs concurrently and reports per-ID errors"""
+        in_flight = 0
+        max_in_flight = 0
+
+        async def fetch(endpoint):
+            nonlocal in_flight, max_in_flight
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+            await asyncio.sleep(0.001)
+            in_flight -= 1
+            employee_id = int(endpoint.split("/")[1])
+            if employee_id == 404:
+                raise RuntimeError(f"Resource not found: {endpoint}")
+            return {"id": employee_id}
+
+        mock_breathe_hr_request.side_effect = fetch
+
+        from breathe_hr_mcp.server import get_employees
+
+        with patch("breathe_hr_mcp.server.BATCH_CONCURRENCY", 3):
+            result = await get_employees.fn([5, 404, 1, 2, 3, 4, 5])
+
+        assert [e["id"] for e in result["employees"]] == [5, 1, 2, 3, 4]
+        assert result["errors"] == [
+            {"employee_id": 404, "error": "Resource not found: employees/404"}
+        ]
+        assert mock_breathe_hr_request.call_count == 6
+        assert max_in_flight == 3
+
+    @pytest.mark.asyncio
+    async def test_get_employees_rejects_oversized_batch(self, mock_breathe_hr_request):
+        """Test the batch size ceiling"""
+        from breathe_hr_mcp.server import get_employees
+
+        with patch("breathe_hr_mcp.server.MAX_BATCH_SIZE", 2):
+            with pytest.raises(ValueError, match="At most 2 employee IDs"):
+                await get_employees.fn([1, 2, 3])
+
     @pytest.mark.asyncio
     async def test_search_employees(self, mock_breathe_hr_request):
         """Test search_employees tool"""
@@ -210,6 +806,38 @@ class TestMCPTools:
         )
         assert result == mock_response
 
+    @pytest.mark.asyncio
+    async def test_search_employees_served_from_directory(
+        self, mock_breathe_hr_request, employee_directory
+    ):
+        """Test search_employees and get_employee use a fresh local index"""
+        employee_directory.load([
+            {"id": 1, "first_name": "John", "last_name": "Doe", "email": "john@example.com"},
+            {"id": 2, "first_name": "Jane", "last_name": "Smith", "email": "jane@example.com"},
+        ])
+
+        from breathe_hr_mcp.server import get_employee, search_employees
+
+        result = await search_employees.fn("jo")
+        employee = await get_employee.fn(2)
+
+        mock_breathe_hr_request.assert_not_called()
+        assert [e["id"] for e in result["employees"]] == [1]
+        assert employee["last_name"] == "Smith"
+
+    @pytest.mark.asyncio
+    async def test_get_employee_updates_directory(
+        self, mock_breathe_hr_request, employee_directory
+    ):
+        """Test records fetched upstream are written through to the index"""
+        mock_breathe_hr_request.return_value = {"id": 7, "first_name": "Ada", "last_name": "Lovelace"}
+
+        from breathe_hr_mcp.server import get_employee
+
+        await get_employee.fn(7)
+
+        assert [e["id"] for e in employee_directory.search("lovelace")] == [7]
+
     @pytest.mark.asyncio
     async def test_list_absences(self, mock_breathe_hr_request):
         """Test list_absences tool"""
@@ -272,6 +900,222 @@ class TestMCPTools:
         )
         assert result == mock_response
 
+    @pytest.mark.asyncio
+    async def test_create_leave_request_invalidates_cache(self, mock_breathe_hr_request):
+        """Test create_leave_request drops cached absence and employee entries"""
+        from breathe_hr_mcp.server import create_leave_request, response_cache
+
+        response_cache.set("absences", {"page": 1}, {"absences": []})
+        response_cache.set("employees/1", None, {"id": 1})
+        response_cache.set("employees/1/absences", {"employee_id": 1}, {"absences": []})
+        response_cache.set("departments", None, {"departments": []})
+        mock_breathe_hr_request.return_value = {"id": 123}
+
+        await create_leave_request.fn(
+            employee_id=1,
+            start_date="2024-02-01",
+            end_date="2024-02-05",
+            absence_type="holiday"
+        )
+
+        assert len(response_cache) == 1
+        assert response_cache.get("departments") == {"departments": []}
+
+    @pytest.mark.asyncio
+    async def test_get_whos_out(self, mock_breathe_hr_request):
+        """Test get_whos_out joins absences, employees and departments"""
+        responses = {
+            "absences": {"absences": [
+                {"employee_id": 1, "start_date": "2024-03-04", "end_date": "2024-03-08", "type": "holiday"}
+            ]},
+            "employees": {"employees": [{"id": 1, "first_name": "John", "last_name": "Doe", "department_id": 5}]},
+            "departments": {"departments": [{"id": 5, "name": "Engineering"}]},
+        }
+
+        async def request(endpoint, params=None):
+            return responses[endpoint]
+
+        mock_breathe_hr_request.side_effect = request
+
+        from breathe_hr_mcp.server import get_whos_out
+
+        result = await get_whos_out.fn("2024-03-05", department="Engineering")
+
+        assert result["count"] == 1
+        assert result["employees"][0]["name"] == "John Doe"
+        mock_breathe_hr_request.assert_any_call(
+            "absences",
+            params={"start_date": "2024-02-03", "end_date": "2024-04-05", "page": 1, "per_page": 100}
+        )
+
+    @pytest.mark.asyncio
+    async def test_create_leave_requests(self, mock_breathe_hr_request):
+        """Test bulk leave creation validates, checks overlaps and reports per item"""
+        from breathe_hr_mcp.server import create_leave_requests
+
+        posted = []
+
+        async def request(endpoint, method="GET", params=None, json_data=None):
+            if method == "GET":
+                return {"absences": [
+                    {"id": 7, "employee_id": 3, "start_date": "2024-07-02", "end_date": "2024-07-02"}
+                ]}
+            if json_data["employee_id"] == 4:
+                raise RuntimeError("Breathe HR API request failed: 422 - Insufficient allowance")
+            posted.append(json_data)
+            return {"absences": [{"id": 100 + len(posted), **json_data}]}
+
+        mock_breathe_hr_request.side_effect = request
+        base = {"start_date": "2024-07-01", "end_date": "2024-07-03", "absence_type": "holiday"}
+
+        result = await create_leave_requests.fn([
+            {"employee_id": 1, **base},
+            {"employee_id": 2, **base, "end_date": "2024-06-01"},
+            {"employee_id": 3, **base},
+            {"employee_id": 4, **base},
+            {"employee_id": 1, **base, "start_date": "2024-07-03", "end_date": "2024-07-04"},
+        ])
+
+        assert [item["status"] for item in result["results"]] == [
+            "created", "invalid", "conflict", "failed", "conflict"
+        ]
+        assert result["counts"] == {"created": 1, "invalid": 1, "conflict": 2, "failed": 1}
+        assert result["results"][0]["absence"]["absences"][0]["id"] == 101
+        assert "existing absence 7" in result["results"][2]["error"]
+        assert "Insufficient allowance" in result["results"][3]["error"]
+        assert posted == [{
+            "employee_id": 1, "start_date": "2024-07-01", "end_date": "2024-07-03",
+            "type": "holiday", "half_day": False,
+        }]
+        # Widened so absences crossing the batch's first or last day are seen
+        mock_breathe_hr_request.assert_any_call(
+            "absences",
+            params={"start_date": "2024-05-31", "end_date": "2024-08-04", "page": 1, "per_page": 100}
+        )
+
+    @pytest.mark.asyncio
+    async def test_create_leave_requests_with_truncated_lookup(self, mock_breathe_hr_request):
+        """Test that a truncated overlap lookup is redone per employee or reported as unchecked"""
+        from breathe_hr_mcp.server import create_leave_requests
+
+        async def request(endpoint, method="GET", params=None, json_data=None):
+            if method == "POST":
+                return {"absences": [{"id": 100, **json_data}]}
+            employee_id = params.get("employee_id")
+            if employee_id == 1:
+                return {"absences": [
+                    {"id": 7, "employee_id": 1, "start_date": "2024-07-02", "end_date": "2024-07-02"}
+                ]}
+            # The whole batch's range, and employee 2's own, exceed the limit
+            return {
+                "absences": [{"id": i, "employee_id": 9, "start_date": "2024-07-01"} for i in range(3)],
+                "pagination": {"total": 3},
+            }
+
+        mock_breathe_hr_request.side_effect = request
+        base = {"start_date": "2024-07-01", "end_date": "2024-07-03", "absence_type": "holiday"}
+
+        with patch("breathe_hr_mcp.server.MAX_RECORDS_LIMIT", 2):
+            result = await create_leave_requests.fn(
+                [{"employee_id": 1, **base}, {"employee_id": 2, **base}], dry_run=True
+            )
+
+        assert [item["status"] for item in result["results"]] == ["conflict", "unchecked"]
+        assert "shorter date range" in result["results"][1]["error"]
+
+    @pytest.mark.asyncio
+    async def test_create_leave_requests_dry_run(self, mock_breathe_hr_request):
+        """Test a dry run validates without submitting anything"""
+        from breathe_hr_mcp.server import create_leave_requests
+
+        mock_breathe_hr_request.return_value = {"absences": []}
+
+        result = await create_leave_requests.fn([
+            {"employee_id": 1, "start_date": "2024-07-01", "end_date": "2024-07-01",
+             "absence_type": "holiday", "half_day": True, "half_day_period": "morning"},
+        ], dry_run=True)
+
+        assert result["counts"] == {"valid": 1}
+        assert all(call.kwargs.get("method", "GET") == "GET"
+                   for call in mock_breathe_hr_request.call_args_list)
+
+    @pytest.mark.asyncio
+    async def test_absence_tools_use_fresh_store(self, mock_breathe_hr_request, absence_store):
+        """Test covered date ranges are answered from the absence store"""
+        from datetime import date
+        from breathe_hr_mcp.server import (
+            create_leave_request, get_employee_absences, list_absences, list_all_absences,
+        )
+
+        absence_store.load([
+            {"id": 1, "employee": {"id": 3}, "start_date": "2024-07-01", "end_date": "2024-07-05",
+             "type": "Holiday", "status": "approved"},
+        ], (date(2024, 1, 1), date(2024, 12, 31)))
+        mock_breathe_hr_request.return_value = {"absences": [
+            {"id": 2, "employee_id": 3, "start_date": "2024-07-10", "end_date": "2024-07-10"}
+        ]}
+
+        await create_leave_request.fn(3, "2024-07-10", "2024-07-10", "holiday")
+        mock_breathe_hr_request.reset_mock()
+
+        result = await list_absences.fn(start_date="2024-07-01", end_date="2024-07-31", per_page=1)
+        assert [a["id"] for a in result["absences"]] == [1]
+        assert result["pagination"]["total"] == 2
+        # Like the upstream filter, only absences wholly inside the range
+        result = await list_all_absences.fn(start_date="2024-07-04", end_date="2024-07-31")
+        assert [a["id"] for a in result["absences"]] == [2]
+        result = await get_employee_absences.fn(3, year=2024, absence_type="holiday")
+        assert [a["id"] for a in result["absences"]] == [1]
+        mock_breathe_hr_request.assert_not_called()
+
+        # Ranges outside the window still go upstream
+        await list_absences.fn(start_date="2025-01-01", end_date="2025-01-31")
+        mock_breathe_hr_request.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_headcount_tools_use_columnar_directory(
+        self, mock_breathe_hr_request, employee_directory
+    ):
+        """Test analytics tools aggregate the directory and reuse its snapshot"""
+        from breathe_hr_mcp import server
+        from breathe_hr_mcp.server import get_headcount, get_starters_and_leavers
+
+        employee_directory.load([
+            {"id": 1, "department": {"name": "Sales"}, "status": "Current employee", "join_date": "2024-02-01"},
+            {"id": 2, "department": {"name": "Sales"}, "status": "Current employee", "join_date": "2021-06-01"},
+            {"id": 3, "department_id": 5, "status": "Former employee", "join_date": "2020-01-01",
+             "leaving_date": "2024-03-15"},
+        ])
+        mock_breathe_hr_request.return_value = {"departments": [{"id": 5, "name": "Finance"}]}
+
+        result = await get_headcount.fn(group_by=["department", "status"])
+        assert result["total"] == 3
+        assert result["groups"][0] == {"department": "Sales", "status": "Current employee", "count": 2}
+        assert {"department": "Finance", "status": "Former employee", "count": 1} in result["groups"]
+        columns = server._employee_columns[2]
+
+        result = await get_starters_and_leavers.fn("2024-01-01", "2024-03-31")
+        assert result["starters"] == {"total": 1, "groups": [{"department": "Sales", "count": 1}]}
+        assert result["leavers"] == {"total": 1, "groups": [{"department": "Finance", "count": 1}]}
+        assert (result["headcount_at_start"], result["headcount_at_end"]) == (2, 2)
+        assert server._employee_columns[2] is columns
+
+        # Only departments were fetched; employees came from the directory
+        assert all(call.args == ("departments",) for call in mock_breathe_hr_request.call_args_list)
+        with pytest.raises(ValueError, match="joined_from must be a date"):
+            await get_headcount.fn(joined_from="soon")
+
+    @pytest.mark.asyncio
+    async def test_absence_reports_validate_dates(self, mock_breathe_hr_request):
+        """Test aggregation tools reject bad or oversized date ranges"""
+        from breathe_hr_mcp.server import get_team_calendar
+
+        with pytest.raises(ValueError, match="end_date must not be before start_date"):
+            await get_team_calendar.fn("2024-03-05", "2024-03-01")
+        with pytest.raises(ValueError, match="cannot exceed"):
+            await get_team_calendar.fn("2020-01-01", "2024-01-01")
+        mock_breathe_hr_request.assert_not_called()
+
     @pytest.mark.asyncio
     async def test_get_account_info(self, mock_breathe_hr_request):
         """Test get_account_info tool"""
@@ -290,6 +1134,117 @@ class TestMCPTools:
         assert result == mock_response
 
 
+    @pytest.mark.asyncio
+    async def test_tool_calls_are_traced(self, tracer):
+        """Test that MCP tool calls get a span"""
+        from fastmcp import Client
+
+        with patch("breathe_hr_mcp.server.breathe_hr_request", new_callable=AsyncMock) as request:
+            request.return_value = {"departments": []}
+            async with Client(mcp) as client:
+                await client.call_tool("get_departments", {})
+
+        [span] = tracer.exporters[0].named("tool")
+        assert span.attributes == {"tool": "get_departments"}
+        assert span.status == "ok"
+
+class TestResources:
+    """Test MCP resources and resource-updated notifications"""
+
+    @pytest.fixture
+    def notifications(self):
+        return []
+
+    @pytest.fixture
+    def message_handler(self, notifications):
+        async def handler(message):
+            root = getattr(message, "root", None)
+            if getattr(root, "method", None) == "notifications/resources/updated":
+                notifications.append(str(root.params.uri))
+        return handler
+
+    async def wait_for(self, notifications, count):
+        for _ in range(100):
+            if len(notifications) >= count:
+                return
+            await asyncio.sleep(0.01)
+
+    @pytest.mark.asyncio
+    async def test_resources_are_listed_and_readable(self, employee_directory):
+        """Test that reference data and employees can be read as resources"""
+        from fastmcp import Client
+
+        employee_directory.load([{"id": 7, "first_name": "Ada", "email": None}])
+        with patch("breathe_hr_mcp.server.breathe_hr_request", new_callable=AsyncMock) as request:
+            request.return_value = {"departments": [{"id": 1, "name": "Sales"}]}
+            async with Client(mcp) as client:
+                assert client.initialize_result.capabilities.resources.subscribe
+                uris = {str(resource.uri) for resource in await client.list_resources()}
+                templates = [t.uriTemplate for t in await client.list_resource_templates()]
+                departments = await client.read_resource("breathe://departments")
+                employee = await client.read_resource("breathe://employees/7")
+                employees = await client.read_resource("breathe://employees")
+
+        assert uris == {"breathe://account", "breathe://departments", "breathe://employees"}
+        assert templates == ["breathe://employees/{employee_id}"]
+        request.assert_awaited_once_with("departments")
+        assert json.loads(departments[0].text) == {"departments": [{"id": 1, "name": "Sales"}]}
+        assert json.loads(employee[0].text) == {"id": 7, "first_name": "Ada"}
+        assert json.loads(employees[0].text)["count"] == 1
+
+    @pytest.mark.asyncio
+    async def test_directory_sync_notifies_changed_employees(
+        self, employee_directory, notifications, message_handler
+    ):
+        """Test that subscribers hear about employees changed by a directory sync"""
+        from fastmcp import Client
+        from breathe_hr_mcp import server
+
+        employees = [{"id": 7, "first_name": "Ada"}, {"id": 8, "first_name": "Alan"}]
+
+        async def request(endpoint, params=None):
+            return {"employees": employees, "pagination": {"total": len(employees)}}
+
+        with patch("breathe_hr_mcp.server.breathe_hr_request", request):
+            await server.sync_employee_directory()
+            async with Client(mcp, message_handler=message_handler) as client:
+                await client.session.subscribe_resource("breathe://employees/7")
+                await client.session.subscribe_resource("breathe://employees/8")
+                employees[1] = {"id": 8, "first_name": "Alan", "last_name": "Turing"}
+                await server.sync_employee_directory()
+                await self.wait_for(notifications, 1)
+                await client.session.unsubscribe_resource("breathe://employees/8")
+                employees[1] = {"id": 8, "first_name": "Alan"}
+                await server.sync_employee_directory()
+
+        assert notifications == ["breathe://employees/8"]
+
+    @pytest.mark.asyncio
+    async def test_reference_refresh_notifies_on_change(
+        self, reference_data, notifications, message_handler
+    ):
+        """Test that a refreshed reference endpoint notifies only when its value changed"""
+        from fastmcp import Client
+        from breathe_hr_mcp import server
+
+        with patch("breathe_hr_mcp.server.DIRECTORY_REFRESH_INTERVAL", 0), \
+                patch("breathe_hr_mcp.server.ABSENCE_SYNC_INTERVAL", 0):
+            server.register_reference_data(reference_data)
+        versions = iter([{"departments": []}, {"departments": []}, {"departments": [{"id": 1}]}])
+
+        async def refresh(endpoint):
+            return next(versions) if endpoint == "departments" else {"name": "Acme"}
+
+        with patch("breathe_hr_mcp.server.refresh_reference", refresh):
+            async with Client(mcp, message_handler=message_handler) as client:
+                await client.session.subscribe_resource("breathe://departments")
+                for _ in range(3):
+                    await reference_data.refresh("departments")
+                await self.wait_for(notifications, 1)
+
+        assert notifications == ["breathe://departments"]
+
+
 class TestFastAPIApp:
     """Test FastAPI application"""
 
@@ -302,6 +1257,79 @@ class TestFastAPIApp:
         # The exact response depends on FastMCP's default routes
         assert response.status_code in [200, 404]  # Either works or endpoint doesn't exist
 
+    def test_app_is_built_once(self):
+        """Test that the lazily built app is cached and shared with the package"""
+        import breathe_hr_mcp
+        from breathe_hr_mcp import server
+
+        assert server.app is app
+        assert breathe_hr_mcp.app is app
+
+    def test_stdio_import_skips_http_app(self):
+        """Test that importing the server for stdio doesn't load FastAPI or deferred subsystems"""
+        import subprocess
+        import sys
+
+        probe = (
+            "import sys, breathe_hr_mcp.server as server; "
+            "print('fastapi' in sys.modules, 'app' in vars(server), "
+            "'breathe_hr_mcp.shared' in sys.modules, 'breathe_hr_mcp.analytics' in sys.modules)"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", probe], capture_output=True, text=True, check=True
+        )
+        assert result.stdout.split() == ["False", "False", "False", "False"]
+
+    @pytest.mark.asyncio
+    async def test_lifespan_opens_shared_state(self, tmp_path):
+        """Test that shared state is opened by the lifespan and closed after it"""
+        from breathe_hr_mcp import server
+
+        path = str(tmp_path / "shared.db")
+        with patch("breathe_hr_mcp.server.SHARED_STATE_PATH", path), \
+                patch.dict("os.environ", {"BREATHE_HR_SHARED_STATE_PATH": path}), \
+                patch("breathe_hr_mcp.server.BREATHE_HR_API_KEY", None):
+            async with server.lifespan(mcp):
+                assert server.shared_cache is not None
+                assert server.upstream_limiter.budget is not None
+            assert server.shared_cache is None
+            assert server.upstream_limiter.budget is None
+
+    def test_mcp_requires_api_key(self):
+        """Test that /mcp and /metrics reject unknown keys with 401 while / stays open"""
+        from breathe_hr_mcp import server
+        from breathe_hr_mcp.auth import KeyRing
+
+        with patch("breathe_hr_mcp.server.api_keys", KeyRing.parse("alice:secret")):
+            client = TestClient(server.create_app())
+
+        response = client.post("/mcp/", headers={"Authorization": "Bearer wrong"})
+        assert response.status_code == 401
+        assert response.json() == {"detail": "Invalid API key"}
+        assert client.post("/mcp/").status_code == 401
+        assert client.get("/").status_code == 200
+        # Metrics carry client names, so they are behind a key too
+        assert client.get("/metrics").status_code == 401
+        assert client.get("/metrics", headers={"Authorization": "Bearer secret"}).status_code == 200
+
+    def test_slow_calls_endpoint(self, tracer):
+        """Test that /admin/slow-calls lists slow upstream calls behind the API key"""
+        from breathe_hr_mcp import server
+        from breathe_hr_mcp.auth import KeyRing
+
+        with tracer.span("tool", tool="list_all_employees"):
+            with tracer.span("upstream", endpoint="employees", status_code=200):
+                pass
+        with patch("breathe_hr_mcp.server.api_keys", KeyRing.parse("alice:secret")):
+            client = TestClient(server.create_app())
+
+        assert client.get("/admin/slow-calls").status_code == 401
+        response = client.get("/admin/slow-calls", headers={"Authorization": "Bearer secret"})
+        assert response.status_code == 200
+        [call] = response.json()["calls"]
+        assert call["tool"] == "list_all_employees"
+        assert call["attributes"] == {"endpoint": "employees", "status_code": 200}
+
     def test_mcp_tools_registration(self):
         """Test that MCP tools are properly registered"""
         # Check that we can import the tool functions and they're FunctionTool objects
@@ -315,4 +1343,56 @@ class TestFastAPIApp:
         # Check that the underlying functions exist
         assert callable(list_employees.fn)
         assert callable(get_employee.fn)
-        assert callable(list_absences.fn)
\ No newline at end of file
+        assert callable(list_absences.fn)
+
+    def test_metrics_endpoint(self):
+        """Test that /metrics exposes tool and upstream metrics"""
+        from breathe_hr_mcp import server
+
+        server.upstream_latency.observe(0.2, endpoint="employees/{id}", method="GET", status=200)
+        response = TestClient(app).get("/metrics")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+        assert "# TYPE breathe_hr_tool_duration_seconds histogram" in response.text
+        assert 'endpoint="employees/{id}",method="GET",status="200"' in response.text
+        assert 'breathe_hr_cache{stat="hit_ratio"}' in response.text
+
+    def test_metrics_report_each_reference_dataset(self, reference_data):
+        """Test that reference freshness is exported as one series per dataset"""
+        async def fetch():
+            return {}
+
+        for name in ("account", "departments", "employees"):
+            reference_data.register(name, fetch, 60)
+            reference_data.restore(name, {}, age=5)
+        reference_data._datasets["employees"].failures = 2
+
+        text = TestClient(app).get("/metrics").text
+        ages = [line for line in text.splitlines() if line.startswith("breathe_hr_reference_age_seconds{")]
+        failures = [
+            line for line in text.splitlines()
+            if line.startswith("breathe_hr_reference_refresh_failures{")
+        ]
+        assert sorted(line.split("}")[0] for line in ages) == [
+            'breathe_hr_reference_age_seconds{dataset="account"',
+            'breathe_hr_reference_age_seconds{dataset="departments"',
+            'breathe_hr_reference_age_seconds{dataset="employees"',
+        ]
+        assert 'breathe_hr_reference_refresh_failures{dataset="employees"} 2' in failures
+        assert len(failures) == 3
+
+    @pytest.mark.asyncio
+    async def test_tool_calls_are_timed(self):
+        """Test that MCP tool calls are recorded by the metrics middleware"""
+        from fastmcp import Client
+        from breathe_hr_mcp import server
+
+        before = server.tool_latency.count(tool="get_departments", status="ok")
+        with patch("breathe_hr_mcp.server.breathe_hr_request", new_callable=AsyncMock) as request:
+            request.return_value = {"departments": []}
+            async with Client(mcp) as client:
+                await client.call_tool("get_departments", {})
+
+        assert server.tool_latency.count(tool="get_departments", status="ok") == before + 1
+        assert server.tools_in_flight.value(tool="get_departments") == 0
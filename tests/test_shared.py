@@ -0,0 +1,172 @@
+"""Tests for state shared between worker processes"""
+
+import multiprocessing
+
+import pytest
+
+from breathe_hr_mcp.ratelimit import RateLimiter
+from breathe_hr_mcp.shared import SharedCache, SharedDatasets, SharedLease, SharedRateBudget
+
+
+class FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def _reserve_many(path, count, queue):
+    budget = SharedRateBudget(path, clock=lambda: 1000.0)
+    queue.put([budget.reserve(10.0, 5)[0] for _ in range(count)])
+
+
+class TestSharedRateBudget:
+    """Test that workers draw from a single token bucket"""
+
+    def test_workers_share_one_bucket(self, tmp_path):
+        path = str(tmp_path / "shared.db")
+        clock = FakeClock()
+        first = SharedRateBudget(path, clock=clock)
+        second = SharedRateBudget(path, clock=clock)
+
+        waits = [worker.reserve(10.0, 4)[0] for worker in (first, second) * 3]
+        assert waits == pytest.approx([0, 0, 0, 0, 0.1, 0.2])
+
+        clock.now += 1.0
+        assert first.reserve(10.0, 4)[0] == 0
+
+    def test_reservations_are_atomic_across_processes(self, tmp_path):
+        path = str(tmp_path / "shared.db")
+        SharedRateBudget(path).reserve(10.0, 5, pace=False)
+        context = multiprocessing.get_context("spawn")
+        queue = context.Queue()
+        processes = [context.Process(target=_reserve_many, args=(path, 10, queue)) for _ in range(3)]
+        for process in processes:
+            process.start()
+        waits = sorted(wait for _ in processes for wait in queue.get(timeout=30))
+        for process in processes:
+            process.join(timeout=30)
+
+        # 30 reservations against burst 5 at 10/s: each token is handed out once
+        expected = [max(0, i + 1 - 5) / 10 for i in range(30)]
+        assert waits == pytest.approx(expected)
+
+    @pytest.mark.asyncio
+    async def test_rate_limit_pauses_every_worker(self, tmp_path):
+        path = str(tmp_path / "shared.db")
+        clock = FakeClock()
+        first = SharedRateBudget(path, clock=clock)
+        second = SharedRateBudget(path, clock=clock)
+
+        assert first.rate_limited(5.0, 10.0, 20, 0.5, 1.0) == 5.0
+        # A second 429 from the same throttling event does not halve again
+        assert second.rate_limited(5.0, 10.0, 20, 0.5, 1.0) == 5.0
+        wait, rate = second.reserve(10.0, 20)
+        assert wait >= 5.0
+        assert rate == 5.0
+
+        assert first.recover(0.5, 10.0) == 5.5
+        assert second.reserve(10.0, 20)[1] == 5.5
+
+    @pytest.mark.asyncio
+    async def test_rate_limiter_delegates_to_budget(self, tmp_path):
+        slept = []
+
+        async def sleep(delay):
+            slept.append(delay)
+
+        budget = SharedRateBudget(str(tmp_path / "shared.db"), clock=FakeClock())
+        limiter = RateLimiter(rate=10.0, burst=1, sleep=sleep, budget=budget)
+        await limiter.acquire()
+        await limiter.acquire()
+        assert slept == pytest.approx([0.1])
+
+        await limiter.on_rate_limited(2.0)
+        assert limiter.rate == 5.0
+        await limiter.on_success()
+        assert limiter.rate == 5.5
+
+
+class TestSharedCache:
+    """Test the cross-worker response cache"""
+
+    def test_value_written_by_one_worker_is_read_by_another(self, tmp_path):
+        path = str(tmp_path / "shared.db")
+        clock = FakeClock()
+        SharedCache(path, clock=clock).set("employees", {"page": 1}, {"employees": [1]}, ttl=60)
+
+        other = SharedCache(path, clock=clock)
+        clock.now += 10
+        value, remaining = other.get("employees", {"page": "1"})
+        assert value == {"employees": [1]}
+        assert remaining == pytest.approx(50)
+        assert other.get("employees", {"page": 2}) is None
+
+        clock.now += 51
+        assert other.get("employees", {"page": 1}) is None
+
+    def test_invalidate_matches_nested_endpoints_only(self, tmp_path):
+        cache = SharedCache(str(tmp_path / "shared.db"))
+        for endpoint in ("employees/42", "employees/42/absences", "employees/420"):
+            cache.set(endpoint, None, {"endpoint": endpoint}, ttl=60)
+
+        assert cache.invalidate("employees/42") == 2
+        assert cache.get("employees/42") is None
+        assert cache.get("employees/42/absences") is None
+        assert cache.get("employees/420") is not None
+
+    def test_expired_rows_are_purged(self, tmp_path):
+        path = str(tmp_path / "shared.db")
+        clock = FakeClock()
+        cache = SharedCache(path, clock=clock, purge_every=2)
+        cache.set("account", None, {"a": 1}, ttl=1)
+        clock.now += 2
+        cache.set("departments", None, {"d": 1}, ttl=60)
+        rows = cache._connect().execute("SELECT endpoint FROM response_cache").fetchall()
+        assert rows == [("departments",)]
+
+
+class TestSharedLease:
+    """Test that one worker at a time is elected to refresh"""
+
+    def test_one_holder_until_it_expires(self, tmp_path):
+        path = str(tmp_path / "shared.db")
+        clock = FakeClock()
+        first = SharedLease(path, ttl=60, clock=clock)
+        second = SharedLease(path, ttl=60, clock=clock)
+
+        assert first.renew()
+        assert not second.renew()
+        clock.now += 59
+        assert first.renew()
+        clock.now += 59
+        assert not second.renew()
+
+        # The holder stopped renewing, so the other worker takes over
+        clock.now += 61
+        assert second.renew()
+        assert not first.renew()
+
+    def test_release_hands_over_straight_away(self, tmp_path):
+        path = str(tmp_path / "shared.db")
+        first, second = SharedLease(path), SharedLease(path)
+        assert first.renew()
+        first.release()
+        assert not first.held
+        assert second.renew()
+
+
+class TestSharedDatasets:
+    """Test that published datasets reach other workers with their age"""
+
+    def test_publish_and_fetch(self, tmp_path):
+        path = str(tmp_path / "shared.db")
+        clock = FakeClock()
+        publisher = SharedDatasets(path, clock=clock)
+        reader = SharedDatasets(path, clock=clock)
+
+        assert reader.fetch("employees") is None
+        publisher.publish("employees", [{"id": 7}])
+        clock.now += 30
+        assert reader.fetch("employees") == ([{"id": 7}], 30.0)
@@ -0,0 +1,97 @@
+"""Tests for request coalescing"""
+
+import asyncio
+
+import pytest
+
+from breathe_hr_mcp.singleflight import SingleFlight
+
+
+class TestSingleFlight:
+    """Test concurrent calls sharing a key are deduplicated"""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_calls_share_result(self):
+        flight = SingleFlight()
+        calls = 0
+
+        async def fetch():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return {"id": 1}
+
+        results = await asyncio.gather(*(flight.do("employees/1", fetch) for _ in range(10)))
+
+        assert calls == 1
+        assert all(result == {"id": 1} for result in results)
+        assert flight.stats() == {"executions": 1, "deduplicated": 9, "in_flight": 0}
+
+    @pytest.mark.asyncio
+    async def test_concurrent_calls_share_error(self):
+        flight = SingleFlight()
+
+        async def fetch():
+            await asyncio.sleep(0.01)
+            raise RuntimeError("Resource not found: employees/1")
+
+        results = await asyncio.gather(
+            *(flight.do("employees/1", fetch) for _ in range(3)), return_exceptions=True
+        )
+
+        assert all(isinstance(result, RuntimeError) for result in results)
+        assert flight.executions == 1
+
+    @pytest.mark.asyncio
+    async def test_sequential_calls_are_not_deduplicated(self):
+        flight = SingleFlight()
+
+        async def fetch():
+            return 1
+
+        await flight.do("departments", fetch)
+        await flight.do("departments", fetch)
+
+        assert flight.executions == 2
+        assert flight.deduplicated == 0
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_does_not_cancel_shared_call(self):
+        flight = SingleFlight()
+        release = asyncio.Event()
+
+        async def fetch():
+            await release.wait()
+            return "done"
+
+        leader = asyncio.ensure_future(flight.do("account", fetch))
+        follower = asyncio.ensure_future(flight.do("account", fetch))
+        await asyncio.sleep(0)
+        leader.cancel()
+        release.set()
+
+        assert await follower == "done"
+
+    @pytest.mark.asyncio
+    async def test_detached_call_is_not_joined(self):
+        flight = SingleFlight()
+        release = asyncio.Event()
+        calls = 0
+
+        async def fetch():
+            nonlocal calls
+            calls += 1
+            call = calls
+            await release.wait()
+            return call
+
+        first = asyncio.ensure_future(flight.do(("absences", ()), fetch))
+        await asyncio.sleep(0)
+        assert flight.detach(lambda key: key[0] == "absences") == 1
+        second = asyncio.ensure_future(flight.do(("absences", ()), fetch))
+        await asyncio.sleep(0)
+        release.set()
+
+        assert await first == 1
+        assert await second == 2
+        assert flight.in_flight == 0
@@ -0,0 +1,70 @@
+"""Tests for the on-disk snapshot store"""
+
+import os
+import sqlite3
+
+from breathe_hr_mcp.snapshot import SnapshotStore
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1_700_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestSnapshotStore:
+    """Test persistence, metadata and staleness limits"""
+
+    def test_round_trip_with_metadata(self, tmp_path):
+        path = str(tmp_path / "snapshots.db")
+        clock = FakeClock()
+        store = SnapshotStore(path, clock=clock)
+        store.save("departments", {"departments": [{"id": 1}]}, etag='"abc"', last_modified="Mon")
+        store.close()
+
+        clock.now += 30
+        snapshot = SnapshotStore(path, clock=clock).load("departments")
+        assert snapshot.value == {"departments": [{"id": 1}]}
+        assert snapshot.etag == '"abc"'
+        assert snapshot.last_modified == "Mon"
+        assert snapshot.age(clock()) == 30
+
+    def test_opened_lazily(self, tmp_path):
+        path = tmp_path / "nested" / "snapshots.db"
+        store = SnapshotStore(str(path))
+        assert not path.exists()
+        assert store.load("employees") is None
+        assert path.exists()
+
+    def test_too_stale_snapshots_are_ignored(self, tmp_path):
+        clock = FakeClock()
+        store = SnapshotStore(str(tmp_path / "s.db"), max_stale=100, clock=clock)
+        store.save("account", {"name": "Acme"})
+        clock.now += 101
+        assert store.load("account") is None
+
+    def test_save_replaces_and_delete_removes(self, tmp_path):
+        store = SnapshotStore(str(tmp_path / "s.db"))
+        store.save("account", {"name": "Old"})
+        store.save("account", {"name": "New"})
+        assert store.load("account").value == {"name": "New"}
+        store.delete("account")
+        assert store.load("account") is None
+
+    def test_corrupt_body_is_ignored(self, tmp_path):
+        path = str(tmp_path / "s.db")
+        store = SnapshotStore(path)
+        store.save("account", {"name": "Acme"})
+        store.close()
+        with sqlite3.connect(path) as conn:
+            conn.execute("UPDATE snapshots SET body = '{not json'")
+        assert SnapshotStore(path).load("account") is None
+
+    def test_from_env(self, tmp_path, monkeypatch):
+        monkeypatch.delenv("BREATHE_HR_SNAPSHOT_PATH", raising=False)
+        assert SnapshotStore.from_env() is None
+        monkeypatch.setenv("BREATHE_HR_SNAPSHOT_PATH", os.fspath(tmp_path / "s.db"))
+        monkeypatch.setenv("BREATHE_HR_SNAPSHOT_MAX_STALE", "60")
+        assert SnapshotStore.from_env().max_stale == 60
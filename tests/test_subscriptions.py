@@ -0,0 +1,105 @@
+"""Tests for resource subscriptions and update notifications"""
+
+import gc
+
+import pytest
+
+from breathe_hr_mcp.subscriptions import Subscriptions
+
+
+class FakeSession:
+    """Session recording the resource-updated notifications it is sent"""
+
+    def __init__(self, broken=False):
+        self.updated = []
+        self.broken = broken
+
+    async def send_resource_updated(self, uri):
+        if self.broken:
+            raise ConnectionError("session closed")
+        self.updated.append(str(uri))
+
+
+class TestSubscriptions:
+    """Test subscribing, notifying and dropping sessions"""
+
+    @pytest.mark.asyncio
+    async def test_notify_reaches_only_subscribers(self):
+        subscriptions = Subscriptions()
+        alice, bob = FakeSession(), FakeSession()
+        subscriptions.subscribe("breathe://departments", alice)
+        subscriptions.subscribe("breathe://employees/7", alice)
+        subscriptions.subscribe("breathe://employees/7", bob)
+
+        sent = await subscriptions.notify(["breathe://employees/7", "breathe://account"])
+
+        assert sent == 2
+        assert alice.updated == ["breathe://employees/7"]
+        assert bob.updated == ["breathe://employees/7"]
+        assert subscriptions.stats() == {
+            "resources": 2, "subscriptions": 3, "notifications": 2, "failures": 0,
+        }
+
+    @pytest.mark.asyncio
+    async def test_unsubscribe(self):
+        subscriptions = Subscriptions()
+        session = FakeSession()
+        subscriptions.subscribe("breathe://departments", session)
+        subscriptions.unsubscribe("breathe://departments", session)
+        subscriptions.unsubscribe("breathe://account", session)
+
+        assert await subscriptions.notify(["breathe://departments"]) == 0
+        assert subscriptions.subscribers("breathe://departments") == 0
+
+    @pytest.mark.asyncio
+    async def test_broken_sessions_are_dropped(self):
+        subscriptions = Subscriptions()
+        healthy, broken = FakeSession(), FakeSession(broken=True)
+        subscriptions.subscribe("breathe://departments", healthy)
+        subscriptions.subscribe("breathe://departments", broken)
+
+        assert await subscriptions.notify(["breathe://departments"]) == 1
+        assert subscriptions.subscribers("breathe://departments") == 1
+        assert subscriptions.stats()["failures"] == 1
+
+    def test_sessions_are_held_weakly(self):
+        subscriptions = Subscriptions()
+        session = FakeSession()
+        subscriptions.subscribe("breathe://departments", session)
+        del session
+        gc.collect()
+
+        assert subscriptions.subscribers("breathe://departments") == 0
+
+
+class TestInstall:
+    """Test the handlers installed on FastMCP's private low-level server
+
+    These fail loudly if a FastMCP upgrade moves the API that ``install``
+    patches, rather than letting subscriptions silently stop working.
+    """
+
+    def test_registers_handlers_and_capability(self):
+        from fastmcp import FastMCP
+        from mcp import types
+        from mcp.server.lowlevel import NotificationOptions
+
+        server = FastMCP("test")
+
+        @server.resource("test://thing")
+        def thing() -> str:
+            return "thing"
+
+        Subscriptions().install(server)
+        low_level = server._mcp_server
+        assert types.SubscribeRequest in low_level.request_handlers
+        assert types.UnsubscribeRequest in low_level.request_handlers
+        capabilities = low_level.get_capabilities(NotificationOptions(), {})
+        assert capabilities.resources.subscribe
+
+    def test_missing_low_level_api_raises(self):
+        class Server:
+            _mcp_server = object()
+
+        with pytest.raises(RuntimeError, match="subscribe_resource"):
+            Subscriptions().install(Server())
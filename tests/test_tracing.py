@@ -0,0 +1,123 @@
+"""Tests for spans, phase timing and the slow-call log"""
+
+import httpx
+import pytest
+
+from breathe_hr_mcp.tracing import (
+    InMemoryExporter, SlowCallLog, Span, Tracer, _PhaseTimer, current_span, params_shape,
+)
+
+
+class TestTracer:
+    """Test span nesting, errors and exporters"""
+
+    def test_spans_nest_and_share_a_trace(self):
+        exporter = InMemoryExporter()
+        tracer = Tracer(exporters=[exporter])
+
+        with tracer.span("tool", tool="get_employee") as tool:
+            with tracer.span("upstream", endpoint="employees/{id}") as upstream:
+                assert current_span() is upstream
+            assert current_span() is tool
+        assert current_span() is None
+
+        assert [span.name for span in exporter.spans] == ["upstream", "tool"]
+        assert upstream.parent is tool
+        assert upstream.trace_id == tool.trace_id
+        assert upstream.to_dict()["parent_id"] == tool.span_id
+        assert tool.duration >= upstream.duration
+
+    def test_errors_are_recorded(self):
+        exporter = InMemoryExporter()
+        tracer = Tracer(exporters=[exporter])
+
+        with pytest.raises(RuntimeError):
+            with tracer.span("upstream"):
+                raise RuntimeError("Breathe HR API error: 503")
+
+        assert exporter.spans[0].status == "error"
+        assert exporter.spans[0].error == "RuntimeError: Breathe HR API error: 503"
+
+    def test_disabled_tracer_records_nothing(self):
+        exporter = InMemoryExporter()
+        tracer = Tracer(enabled=False, exporters=[exporter])
+
+        with tracer.span("tool") as span:
+            assert span is None
+        assert exporter.spans == []
+        assert tracer.event_hooks() == {}
+
+    def test_opentelemetry_spans_are_mirrored(self):
+        exporter = InMemoryExporter()
+        tracer = Tracer(exporters=[exporter], otel=True)
+
+        with tracer.span("tool", tool="get_departments"):
+            with tracer.span("upstream", params={"page": "int"}) as span:
+                span.add_phase("wait", 0.01)
+
+        assert all(span.otel is not None for span in exporter.spans)
+
+    def test_params_shape_hides_values(self):
+        assert params_shape({"per_page": 50, "department": "Sales"}) == {
+            "department": "str", "per_page": "int",
+        }
+        assert params_shape(None) == {}
+
+
+class TestPhaseTiming:
+    """Test phase timing through httpx event hooks and httpcore trace events"""
+
+    @pytest.mark.asyncio
+    async def test_trace_events_become_phases(self):
+        span = Span("upstream", {})
+        timer = _PhaseTimer(span, queued_at=span.start)
+        for step in ("connect_tcp", "start_tls"):
+            await timer(f"connection.{step}.started", {})
+            await timer(f"connection.{step}.complete", {})
+        for step in ("send_request_headers", "send_request_body",
+                     "receive_response_headers", "receive_response_body"):
+            await timer(f"http11.{step}.started", {})
+            await timer(f"http11.{step}.complete", {})
+        await timer("http11.response_closed.started", {})
+
+        assert set(span.phases) == {"pool", "connect", "tls", "send", "wait", "receive"}
+
+    @pytest.mark.asyncio
+    async def test_event_hooks_attach_a_trace_callback(self):
+        tracer = Tracer()
+        seen = []
+
+        def handler(request):
+            seen.append(request.extensions.get("trace"))
+            return httpx.Response(200, json={})
+
+        async with httpx.AsyncClient(
+            transport=httpx.MockTransport(handler), event_hooks=tracer.event_hooks()
+        ) as client:
+            await client.get("https://api.example.com/v1/account")
+            with tracer.span("upstream") as span:
+                await client.get("https://api.example.com/v1/account")
+
+        assert seen[0] is None
+        assert isinstance(seen[1], _PhaseTimer)
+        assert span.attributes["http_version"] == "HTTP/1.1"
+
+
+class TestSlowCallLog:
+    """Test the ring buffer of slow upstream calls"""
+
+    def test_logs_slow_upstream_calls_newest_first(self):
+        log = SlowCallLog(capacity=2, threshold=0.5)
+        tool = Span("tool", {"tool": "list_all_employees"})
+        for index, duration in enumerate((0.6, 0.1, 0.7, 0.8)):
+            span = Span("upstream", {"index": index}, parent=tool)
+            span.end = span.start + duration
+            log.export(span)
+        tool.end = tool.start + 5
+        log.export(tool)
+
+        entries = log.entries()
+        assert [entry["attributes"]["index"] for entry in entries] == [3, 2]
+        assert entries[0]["tool"] == "list_all_employees"
+        assert entries[0]["duration_ms"] == pytest.approx(800)
+        assert log.recorded == 3